@@ -1,13 +1,116 @@
-import argparse
-
-def parse_args():
-    """Command-line arguments parser"""
-    parser = argparse.ArgumentParser(description="DOCSTRING2PDF: "
-                                                 "Get python-docstrings as PDF-file")
-    parser.add_argument('fromobject', type=str, help="path to python module or module's objects. "
-                                                     "Examples: /d1/module or /d1/module.Class, or "
-                                                     "/d1/module.Class.func, "
-                                                     "etc.")
-    parser.add_argument('--to', type=str, default='results/', help="path to save PDF file. Default: "
-                                                                   "results/")
-    return parser.parse_args()
+import os
+import sys
+import argparse
+
+COMMANDS = ('extract', 'render', 'merge')
+ENGINES = ('ast', 'tokens')
+OBJECT_STREAMS_HELP = ("write PDF 1.5 files with objects packed into compressed object streams and a "
+                       "cross-reference stream, smaller but not readable by PDF 1.4 readers")
+ENGINE_HELP = ("how modules are read: 'ast' parses whole modules, 'tokens' scans them and parses only "
+               "definitions' headers and docstrings, falling back to 'ast' when it can't. Default: ast")
+
+
+def parse_args(argv=None):
+    """Command-line arguments parser"""
+    argv = sys.argv[1:] if argv is None else argv
+    # A module named like a command in the working directory is documented as before
+    if argv and argv[0] in COMMANDS and not os.path.exists(argv[0] + '.py'):
+        return _parse_command(argv)
+    parser = argparse.ArgumentParser(description="DOCSTRING2PDF: "
+                                                 "Get python-docstrings as PDF-file",
+                                     epilog="commands: 'extract' saves extracted info of sources as IR, "
+                                            "'render' makes PDF files of IR, see 'extract -h' and 'render -h'")
+    parser.add_argument('fromobject', type=str, nargs='*', help="paths to python modules, module's objects, "
+                                                                "packages or directories. "
+                                                                "Examples: /d1/module or /d1/module.Class, or "
+                                                                "/d1/module.Class.func, /d1/package, "
+                                                                "etc.")
+    parser.add_argument('--to', type=str, default='results/', help="path to save PDF file. Default: "
+                                                                   "results/")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help="number of worker processes, 0 means "
+                                                                  "one per CPU. Default: 1")
+    parser.add_argument('--cache-dir', type=str, default=None, help="directory to cache extracted module "
+                                                                     "info between runs. Default: no cache")
+    parser.add_argument('--cache-size', type=int, default=256, help="cache size limit in megabytes. "
+                                                                    "Default: 256")
+    parser.add_argument('--engine', type=str, default='ast', choices=ENGINES, help=ENGINE_HELP)
+    parser.add_argument('--force', action='store_true', help="regenerate PDF files even if their sources "
+                                                             "haven't changed")
+    parser.add_argument('--compress-level', type=int, default=None, choices=range(10),
+                        help="zlib compression level of page contents, 0 disables compression. "
+                             "Default: compress large pages only")
+    parser.add_argument('--object-streams', action='store_true', help=OBJECT_STREAMS_HELP)
+    parser.add_argument('--book', type=str, default=None, help="save all objects as chapters of one PDF file "
+                                                                "with the name and an outline, every run "
+                                                                "rebuilds it. Default: a PDF file per object")
+    parser.add_argument('--shard', type=_shard, default=None, metavar='I/N',
+                        help="document only the I-th of N parts of the objects, balanced by source size, "
+                             "from 1 to N. Outputs of the parts are combined by the merge command")
+    parser.add_argument('--watch', action='store_true', help="keep running and document the objects of "
+                                                             "changed sources again. Extracted info of "
+                                                             "unchanged modules is kept in memory")
+    parser.add_argument('--profile', type=str, default=None, help="save per-stage timing and counters of "
+                                                                   "every module as trace events to the file")
+    parser.add_argument('--serve', type=str, default=None, metavar='ADDRESS',
+                        help="serve PDF files over HTTP on PORT or HOST:PORT or on a Unix socket path, "
+                             "e.g. GET /render?object=/d1/module.Class.func. Extracted module info is kept "
+                             "in memory, requests are handled by --jobs threads")
+    args = parser.parse_args(argv)
+    if not args.fromobject and args.serve is None:
+        parser.error('the following arguments are required: fromobject')
+    if args.shard is not None and args.book is not None:
+        parser.error('--book and --shard can\'t be used together')
+    args.command = None
+    return args
+
+
+def _parse_command(argv):
+    """Arguments of the extract and render commands"""
+    parser = argparse.ArgumentParser(prog='docstring2pdf.py', description="DOCSTRING2PDF: "
+                                                                          "Get python-docstrings as PDF-file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    extract = commands.add_parser('extract', help="save extracted info of python objects as IR")
+    extract.add_argument('fromobject', type=str, nargs='+', help="paths to python modules, module's objects, "
+                                                                 "packages or directories")
+    extract.add_argument('--output', '-o', type=str, required=True, help="path to save the IR file")
+    extract.add_argument('--binary', action='store_true', help="save the compact binary IR instead of "
+                                                               "JSON lines")
+    extract.add_argument('--jobs', '-j', type=int, default=1, help="number of worker processes, 0 means "
+                                                                   "one per CPU. Default: 1")
+    extract.add_argument('--cache-dir', type=str, default=None, help="directory to cache extracted module "
+                                                                      "info between runs. Default: no cache")
+    extract.add_argument('--cache-size', type=int, default=256, help="cache size limit in megabytes. "
+                                                                     "Default: 256")
+    extract.add_argument('--engine', type=str, default='ast', choices=ENGINES, help=ENGINE_HELP)
+
+    render = commands.add_parser('render', help="make PDF files of IR files")
+    render.add_argument('ir', type=str, nargs='+', help="paths to IR files made by extract")
+    render.add_argument('--to', type=str, default='results/', help="path to save PDF files. Default: "
+                                                                   "results/")
+    render.add_argument('--jobs', '-j', type=int, default=1, help="number of worker processes, 0 means "
+                                                                  "one per CPU. Default: 1")
+    render.add_argument('--compress-level', type=int, default=None, choices=range(10),
+                        help="zlib compression level of page contents, 0 disables compression. "
+                             "Default: compress large pages only")
+    render.add_argument('--object-streams', action='store_true', help=OBJECT_STREAMS_HELP)
+    render.add_argument('--book', type=str, default=None, help="save all documents as chapters of one PDF "
+                                                               "file with the name")
+
+    merge = commands.add_parser('merge', help="combine the outputs of --shard runs")
+    merge.add_argument('shards', type=str, nargs='+', help="output directories of all the shards")
+    merge.add_argument('--to', type=str, default='results/', help="path to save PDF files and the combined "
+                                                                  "manifest. Default: results/")
+    return parser.parse_args(argv)
+
+
+def _shard(text):
+    """Shard index and count of 'I/N'"""
+    index, _, count = text.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected I/N, e.g. 1/4")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError("I must be from 1 to N")
+    return index, count
@@ -3,13 +3,95 @@ Module get info from modules,
 classes, functions and other data
 """
 
+import re
 import ast
-from collections import namedtuple
+from sys import intern
 
+# Bump when the extracted info changes to invalidate cached results
+EXTRACTOR_VERSION = 2
 
-ModuleInfo = namedtuple('ModuleInfo', 'name docstrings classes functions')
-ClassInfo = namedtuple('ClassInfo', 'name docstrings functions')
-FuncInfo = namedtuple('FuncInfo', 'name signature docstrings')
+
+class _Record:
+    """
+    Compact record with the read API of a namedtuple.
+    Records are treated as immutable: names are interned
+    and sequences are stored as tuples, so records are hashable.
+    """
+
+    __slots__ = ()
+
+    @property
+    def _fields(self):
+        return self.__slots__
+
+    def __iter__(self):
+        for field in self.__slots__:
+            yield getattr(self, field)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__,
+                               ', '.join('{}={!r}'.format(field, value) for field, value in zip(self.__slots__, self)))
+
+    def __reduce__(self):
+        return type(self), tuple(self)
+
+    def _asdict(self):
+        return dict(zip(self.__slots__, self))
+
+    def _replace(self, **fields):
+        values = self._asdict()
+        values.update(fields)
+        return type(self)(**values)
+
+
+def _tuple(items):
+    return items if items is None or type(items) == tuple else tuple(items)
+
+
+class ModuleInfo(_Record):
+    """Module's name, docstrings, ClassInfo and FuncInfo instances"""
+
+    __slots__ = ('name', 'docstrings', 'classes', 'functions')
+
+    def __init__(self, name, docstrings, classes, functions):
+        self.name = intern(name)
+        self.docstrings = docstrings
+        self.classes = _tuple(classes)
+        self.functions = _tuple(functions)
+
+
+class ClassInfo(_Record):
+    """
+    Class' name, docstrings, FuncInfo instances of its methods and ClassInfo
+    instances of its nested classes, functions is None for namedtuples
+    """
+
+    __slots__ = ('name', 'docstrings', 'functions', 'classes')
+
+    def __init__(self, name, docstrings, functions, classes=()):
+        self.name = intern(name)
+        self.docstrings = docstrings
+        self.functions = _tuple(functions)
+        self.classes = _tuple(classes)
+
+
+class FuncInfo(_Record):
+    """Function's name, args names and docstrings"""
+
+    __slots__ = ('name', 'signature', 'docstrings')
+
+    def __init__(self, name, signature, docstrings):
+        self.name = intern(name)
+        self.signature = tuple(map(intern, signature))
+        self.docstrings = docstrings
 
 
 class ModuleLister:
@@ -20,6 +102,7 @@ class ModuleLister:
         self.module_name = module_name
         self.module_node = module_node
         self._module_info = None
+        self._symbol_index = None
         self._set_module_info()
 
     @property
@@ -27,30 +110,300 @@ class ModuleLister:
         """Return module_info list which save ModuleInfo instance"""
         return self._module_info
 
+    @property
+    def symbol_index(self):
+        """Return SymbolIndex of the module_info"""
+        return self._symbol_index
+
     def _set_module_info(self):
         name = self.module_name
 
         docstrings = ast.get_docstring(self.module_node)
 
-        class_lister = ClassLister()
-        for child in ast.iter_child_nodes(self.module_node):
-            if type(child) == ast.ClassDef or type(child) == ast.Assign:
-                class_lister.visit(child)
-        classes = class_lister.classes_info
-
-        function_lister = FuncLister()
-        for child in ast.iter_child_nodes(self.module_node):
-            if type(child) == ast.FunctionDef:
-                function_lister.visit(child)
-        functions = function_lister.functions_info
+        classes = []
+        functions = []
+        for child in self.module_node.body:
+            child_type = type(child)
+            if child_type == ast.ClassDef:
+                classes.append(_class_info(child))
+            elif child_type == ast.Assign:
+                namedtuple_info = _namedtuple_info(child)
+                if namedtuple_info is not None:
+                    classes.append(namedtuple_info)
+            elif child_type in _FUNCTION_TYPES:
+                functions.append(_func_info(child))
 
         info = ModuleInfo(name, docstrings, classes, functions)
 
         self._module_info = info
-
-
-class ClassLister(ast.NodeVisitor):
-    """Going through classes with NodeVisitor to get info"""
+        self._symbol_index = SymbolIndex(info)
+
+
+# Fields of statements and handlers that hold statements
+_BLOCK_FIELDS = ('body', 'handlers', 'orelse', 'finalbody', 'cases')
+# Defaults that can't hold lambdas with their own args
+_LEAF_DEFAULTS = (ast.Constant, ast.Name)
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _class_info(class_node):
+    """
+    ClassInfo of the class node with its nested classes. Functions and classes
+    are found in the class body and its nested blocks, without going into functions,
+    namedtuples only in the body. Nested classes are listed with an explicit stack
+    like _IterativeVisitor uses.
+    """
+    # Iterators of the blocks of the class being listed, its functions and classes
+    blocks = [iter(class_node.body)]
+    functions = []
+    classes = []
+    # The same of the classes the listed class is nested in
+    parents = []
+    while True:
+        node = next(blocks[-1], None)
+        if node is None:
+            blocks.pop()
+            if blocks:
+                continue
+            info = ClassInfo(class_node.name, ast.get_docstring(class_node), functions, classes)
+            if not parents:
+                return info
+            class_node, blocks, functions, classes = parents.pop()
+            classes.append(info)
+            continue
+        node_type = type(node)
+        if node_type in _FUNCTION_TYPES:
+            functions.append(_func_info(node))
+        elif node_type == ast.ClassDef:
+            parents.append((class_node, blocks, functions, classes))
+            class_node, blocks, functions, classes = node, [iter(node.body)], [], []
+        elif node_type == ast.Assign:
+            if len(blocks) == 1:
+                namedtuple_info = _namedtuple_info(node)
+                if namedtuple_info is not None:
+                    classes.append(namedtuple_info)
+        else:
+            for field in reversed(_BLOCK_FIELDS):
+                block = getattr(node, field, None)
+                if block:
+                    blocks.append(iter(block))
+
+
+def _func_info(node):
+    """FuncInfo of the function node, as FuncLister.visit_FunctionDef makes it"""
+    return FuncInfo(node.name, _signature(node.args), ast.get_docstring(node))
+
+
+def _signature(arguments):
+    """Names of the args in the order ArgLister visits them"""
+    # Nodes built by hand may lack posonlyargs, ArgLister skips missing fields
+    names = [arg.arg for arg in getattr(arguments, 'posonlyargs', ())]
+    names.extend(arg.arg for arg in arguments.args)
+    if arguments.vararg is not None:
+        names.append(arguments.vararg.arg)
+    names.extend(arg.arg for arg in arguments.kwonlyargs)
+    _default_args(arguments.kw_defaults, names)
+    if arguments.kwarg is not None:
+        names.append(arguments.kwarg.arg)
+    _default_args(arguments.defaults, names)
+    return names
+
+
+def _default_args(defaults, names):
+    """ArgLister also picks up args of lambdas in default values"""
+    for default in defaults:
+        if default is not None and not isinstance(default, _LEAF_DEFAULTS):
+            arg_lister = ArgLister()
+            arg_lister.visit(default)
+            names.extend(arg_lister.args)
+
+
+def _namedtuple_info(node):
+    """ClassInfo of the assign node if it defines a namedtuple, otherwise None"""
+    if type(node.value) == ast.Call:
+        if hasattr(node.value.func, 'id'):
+            if node.value.func.id == 'namedtuple':
+                name = node.targets[0].id
+                args = node.value.args
+                call_name = args[0].s
+                call_args = args[1]
+                try:
+                    if type(call_args) == ast.List:
+                        call_args = ' '.join(ast.literal_eval(call_args))
+                    else:
+                        try:
+                            call_args = args[1].s
+                        except ValueError:
+                            call_args = None
+                    docstrings = '{}({})'.format(call_name,
+                                                 ', '.join([a.replace(',', '') for a in call_args.split()]))
+                except AttributeError:
+                    docstrings = None
+
+                return ClassInfo(name, docstrings=docstrings, functions=None)
+    return None
+
+
+class SymbolIndex:
+    """
+    Index of module's classes and functions by dotted names,
+    e.g. 'Class', 'func' or 'Class.method'.
+    Classes shadow functions of the same name, the first
+    definition of a name wins like in a linear search.
+    """
+
+    def __init__(self, module_info):
+        """Constructor gets ModuleInfo instance and indexes it"""
+        self.module_info = module_info
+        self._symbols = {}
+        stack = [((), module_info)]
+        while stack:
+            prefix, info = stack.pop()
+            for member in getattr(info, 'classes', None) or []:
+                path = prefix + (member.name,)
+                if path not in self._symbols:
+                    self._symbols[path] = member
+                    stack.append((path, member))
+            for member in getattr(info, 'functions', None) or []:
+                path = prefix + (member.name,)
+                if path not in self._symbols:
+                    self._symbols[path] = member
+
+    def lookup(self, name):
+        """Return ClassInfo or FuncInfo by a dotted name or a sequence of names, None if missing"""
+        if isinstance(name, str):
+            name = name.split('.')
+        return self._symbols.get(tuple(name))
+
+    def __contains__(self, name):
+        return self.lookup(name) is not None
+
+    def __len__(self):
+        return len(self._symbols)
+
+
+def find_object_info(code, names):
+    """
+    Get ClassInfo or FuncInfo of one object by its names, e.g. ['Class', 'method'],
+    without listing the whole module. Only the source of the top-level definition
+    is parsed when it can be cut out safely, otherwise the module is parsed and
+    only its top-level statements are walked. Return None if there is no such object.
+    """
+    node = _parse_definition(code, names[0])
+    if node is None:
+        node = _find_definition(ast.parse(code), names[0])
+    if node is None:
+        return None
+
+    if type(node) in _FUNCTION_TYPES:
+        return _func_info(node) if len(names) == 1 else None
+    if type(node) == ast.Assign:
+        return _namedtuple_info(node) if len(names) == 1 else None
+
+    class_info = _class_info(node)
+    if len(names) == 1:
+        return class_info
+    return SymbolIndex(ModuleInfo('', None, (class_info,), ())).lookup(names)
+
+
+def _namedtuple_name(node):
+    value = node.value
+    if type(value) == ast.Call and getattr(value.func, 'id', None) == 'namedtuple':
+        return getattr(node.targets[0], 'id', None)
+    return None
+
+
+def _find_definition(module_node, name):
+    """Top-level class, namedtuple or function, classes shadow functions"""
+    function = None
+    for node in module_node.body:
+        if type(node) == ast.ClassDef and node.name == name:
+            return node
+        if type(node) == ast.Assign and _namedtuple_name(node) == name:
+            return node
+        if function is None and type(node) in _FUNCTION_TYPES and node.name == name:
+            function = node
+    return function
+
+
+_TOP_LEVEL_LINE = re.compile(r'^[^\s#)\]}]', re.M)
+# Strings and comments, string prefixes don't change where a string ends
+_SKIPPED = re.compile(r'''
+    \'\'\'[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*\'\'\'
+  | """[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""
+  | '[^'\\\n]*(?:\\.[^'\\\n]*)*'
+  | "[^"\\\n]*(?:\\.[^"\\\n]*)*"
+  | \#[^\n]*''', re.S | re.X)
+
+
+def _code_starts(code, matches):
+    """Starts of the matches that are in code, not in strings or comments"""
+    skipped = _SKIPPED.finditer(code)
+    skip = next(skipped, None)
+    for match in matches:
+        start = match.start()
+        while skip is not None and skip.end() <= start:
+            skip = next(skipped, None)
+        if skip is None or skip.start() > start:
+            yield start
+
+
+def _parse_definition(code, name):
+    """
+    Parse only the source of the top-level definition of the name.
+    Return None when it can't be found or cut out safely.
+    """
+    pattern = re.escape(name)
+    class_matches = re.finditer(r'^(?:class\s+{0}\b|{0}\s*=\s*namedtuple\s*\()'.format(pattern), code, re.M)
+    function_matches = re.finditer(r'^(?:async\s+)?def\s+{}\s*\('.format(pattern), code, re.M)
+    start = next(_code_starts(code, class_matches), None)
+    if start is None:
+        start = next(_code_starts(code, function_matches), None)
+    if start is None:
+        return None
+    line_end = code.find('\n', start)
+    end = len(code)
+    if line_end != -1:
+        next_statement = _TOP_LEVEL_LINE.search(code, line_end + 1)
+        if next_statement is not None:
+            end = next_statement.start()
+    try:
+        tree = ast.parse(code[start:end])
+    except SyntaxError:
+        return None
+    if len(tree.body) != 1:
+        return None
+    node = tree.body[0]
+    if type(node) == ast.ClassDef or type(node) in _FUNCTION_TYPES:
+        found = node.name
+    elif type(node) == ast.Assign:
+        found = _namedtuple_name(node)
+    else:
+        found = None
+    return node if found == name else None
+
+
+class _IterativeVisitor(ast.NodeVisitor):
+    """
+    NodeVisitor visiting nodes in the same order with an explicit stack,
+    so deeply nested generated code can't exceed the recursion limit.
+    Nodes with a visit_ method are passed to it and not descended into.
+    """
+
+    def visit(self, node):
+        """Visit the node and its descendants"""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            method = getattr(self, 'visit_' + type(node).__name__, None)
+            if method is not None:
+                method(node)
+            else:
+                stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+
+class ClassLister(_IterativeVisitor):
+    """Going through classes to get info, nested classes are in the ClassInfo of their class"""
 
     def __init__(self):
         self._classes_info = []
@@ -62,49 +415,20 @@ class ClassLister(ast.NodeVisitor):
 
     def visit_ClassDef(self, node):
         """Visit class and append it to self.classes_info"""
-        name = node.name
-        docstrings = ast.get_docstring(node)
-
-        func_lister = FuncLister()
-        func_lister.visit(node)
-        functions = func_lister.functions_info
-
-        class_info = ClassInfo(name, docstrings, functions)
-
-        self._classes_info.append(class_info)
+        self._classes_info.append(_class_info(node))
 
     def visit_Assign(self, node):
         """
         Visit assignes that define
         namedtuples and add it to class_info.
         """
-        if type(node.value) == ast.Call:
-            if hasattr(node.value.func, 'id'):
-                if node.value.func.id == 'namedtuple':
-                    name = node.targets[0].id
-                    args = node.value.args
-                    call_name = args[0].s
-                    call_args = args[1]
-                    try:
-                        if type(call_args) == ast.List:
-                            call_args = ' '.join(ast.literal_eval(call_args))
-                        else:
-                            try:
-                                call_args = args[1].s
-                            except ValueError:
-                                call_args = None
-                        docstrings = '{}({})'.format(call_name,
-                                                     ', '.join([a.replace(',', '') for a in call_args.split()]))
-                    except AttributeError:
-                        docstrings = None
-
-                    namedtuple_info = ClassInfo(name, docstrings=docstrings, functions=None)
-
-                    self._classes_info.append(namedtuple_info)
-
-
-class FuncLister(ast.NodeVisitor):
-    """Going through functions with NodeVisitor to get info"""
+        namedtuple_info = _namedtuple_info(node)
+        if namedtuple_info is not None:
+            self._classes_info.append(namedtuple_info)
+
+
+class FuncLister(_IterativeVisitor):
+    """Going through functions and async functions to get info"""
 
     def __init__(self):
         self._functions_info = []
@@ -132,9 +456,11 @@ class FuncLister(ast.NodeVisitor):
 
         self._functions_info.append(func_info)
 
+    visit_AsyncFunctionDef = visit_FunctionDef
+
 
-class ArgLister(ast.NodeVisitor):
-    """Going through ast.arg class with NodeVisitor"""
+class ArgLister(_IterativeVisitor):
+    """Going through ast.arg class"""
 
     def __init__(self):
         self._args = []
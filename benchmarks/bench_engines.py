@@ -0,0 +1,61 @@
+"""
+Benchmark of the extraction engines: reading and parsing whole modules
+for ModuleLister against scanning memory mapped sources with ModuleScanner,
+on the standard library or on given directories. The extracted info
+of every module is checked to be identical.
+
+Usage: python3 benchmarks/bench_engines.py [directory ...]
+"""
+
+import os
+import sys
+import ast
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from astlister import ModuleLister
+from tokenlister import ModuleScanner, read_module
+import corpus
+
+
+def ast_engine(path):
+    return ModuleLister('module', ast.parse(corpus.read(path)))
+
+
+def timed(extract, paths, repeat=3):
+    """Best time and (lister type, module info) of every path, ASTs aren't kept"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        listers = []
+        for path in paths:
+            lister = extract(path)
+            listers.append((type(lister), lister.module_info))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, listers
+
+
+def main():
+    args = corpus.argument_parser('Benchmark of the extraction engines').parse_args()
+    paths = [path for path, _ in corpus.parsed_modules(args.directories)]
+    ast_time, ast_listers = timed(ast_engine, paths)
+    tokens_time, token_listers = timed(lambda path: read_module('module', path), paths)
+    mismatches = [path for path, old, new in zip(paths, ast_listers, token_listers)
+                  if old[1] != new[1]]
+    scanned = sum(1 for lister_type, _ in token_listers if lister_type is ModuleScanner)
+
+    print('modules:       {}'.format(len(paths)))
+    print('ast:           {:.3f} s'.format(ast_time))
+    print('tokens:        {:.3f} s'.format(tokens_time))
+    print('speedup:       {:.2f}x'.format(ast_time / tokens_time))
+    print('fallbacks:     {}'.format(len(paths) - scanned))
+    print('mismatches:    {}'.format(len(mismatches)))
+    for path in mismatches:
+        print('  ' + path)
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
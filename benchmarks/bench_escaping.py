@@ -0,0 +1,91 @@
+"""
+Benchmark of the text encoding: escaping every line with chained replace,
+as the layout did before textencoding, against escaping and encoding
+a docstring at once, on the docstrings of the standard library or of given
+directories and on the same docstrings with Cyrillic letters.
+Escaping alone and the whole layout of the pdf-code bytes are timed.
+
+Usage: python3 benchmarks/bench_escaping.py [directory ...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import fontmetrics
+import pdfformater
+import textencoding
+import corpus
+from bench_layout import load_docstrings
+
+SHIFT = 2 * pdfformater.HORIZONTAL_SHIFT
+CYRILLIC = str.maketrans('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ',
+                         'абцдефгхийклмнопярстуввхызАБЦДЕФГХИЙКЛМНОПЯРСТУВВХЫЗ')
+
+
+def replace_escape(string):
+    """Escaping before textencoding, with the backslash it lacked"""
+    return string.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def replace_lines(text, current_shift):
+    """Layout before textencoding: every wrapped line is escaped, the pdf-code is written in UTF-8"""
+    width = pdfformater.PAGE_WIDTH - pdfformater.RIGHT_MARGIN - current_shift - pdfformater.HORIZONTAL_SHIFT
+    dx = pdfformater.HORIZONTAL_SHIFT
+    for line in text.split('\n'):
+        for string in fontmetrics.TIMES_ROMAN.wrap(line, width, pdfformater.FONT_SIZE_SMALL):
+            yield '/FClassic 12 Tf\n{} -25 Td\n({}) Tj\n'.format(dx, replace_escape(string))
+            dx = 0
+
+
+def escape_replace(docstrings):
+    for docstring in docstrings:
+        '\n'.join(replace_escape(line) for line in docstring.split('\n')).encode('utf-8')
+
+
+def escape_textencoding(docstrings):
+    for docstring in docstrings:
+        textencoding.encode(textencoding.escape(docstring))
+
+
+def layout_replace(docstrings):
+    for docstring in docstrings:
+        ''.join(replace_lines(docstring, SHIFT)).encode('utf-8')
+
+
+def layout_textencoding(docstrings):
+    for docstring in docstrings:
+        textencoding.encode(''.join(pdfformater.text_lines(docstring, SHIFT)))
+
+
+def timed(function, docstrings, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(docstrings)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    args = corpus.argument_parser('Benchmark of the text encoding').parse_args()
+    docstrings = load_docstrings(args.directories)
+    corpora = (('latin', docstrings), ('cyrillic', [docstring.translate(CYRILLIC) for docstring in docstrings]))
+    font = textencoding.unicode_font()
+    print('docstrings: {}, characters: {}, unicode font: {}'.format(
+        len(docstrings), sum(map(len, docstrings)), font.font.name if font is not None else None))
+    print('{:<10} {:<8} {:>10} {:>14} {:>9}'.format('corpus', 'stage', 'replace s', 'textencoding s', 'speedup'))
+    for language, texts in corpora:
+        for stage, old, new in (('escape', escape_replace, escape_textencoding),
+                                ('layout', layout_replace, layout_textencoding)):
+            old_time = timed(old, texts)
+            new_time = timed(new, texts)
+            print('{:<10} {:<8} {:>10.3f} {:>14.3f} {:>8.2f}x'.format(language, stage, old_time, new_time,
+                                                                    old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
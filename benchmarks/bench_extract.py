@@ -0,0 +1,212 @@
+"""
+Benchmark of ModuleLister against the recursive NodeVisitor listers
+it replaced, kept here as they were, on the standard library or on given
+directories. The extracted info of every module is checked to be identical
+on the fields both produce: the legacy listers put methods of nested classes
+into their class. Modules with async functions, which the legacy listers
+skip, are counted but not compared.
+
+Usage: python3 benchmarks/bench_extract.py [directory ...]
+"""
+
+import os
+import sys
+import ast
+import time
+from collections import namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from astlister import ModuleLister, ClassInfo
+import corpus
+
+LegacyModuleInfo = namedtuple('ModuleInfo', 'name docstrings classes functions')
+LegacyClassInfo = namedtuple('ClassInfo', 'name docstrings functions')
+LegacyFuncInfo = namedtuple('FuncInfo', 'name signature docstrings')
+
+
+class LegacyClassLister(ast.NodeVisitor):
+    """Going through classes with NodeVisitor to get info"""
+
+    def __init__(self):
+        self._classes_info = []
+
+    @property
+    def classes_info(self):
+        """Return classes_info list which save ClassInfo instances"""
+        return self._classes_info
+
+    def visit_ClassDef(self, node):
+        """Visit class and append it to self.classes_info"""
+        name = node.name
+        docstrings = ast.get_docstring(node)
+
+        func_lister = LegacyFuncLister()
+        func_lister.visit(node)
+        functions = func_lister.functions_info
+
+        class_info = LegacyClassInfo(name, docstrings, functions)
+
+        self._classes_info.append(class_info)
+
+    def visit_Assign(self, node):
+        """
+        Visit assignes that define
+        namedtuples and add it to class_info.
+        """
+        if type(node.value) == ast.Call:
+            if hasattr(node.value.func, 'id'):
+                if node.value.func.id == 'namedtuple':
+                    name = node.targets[0].id
+                    args = node.value.args
+                    call_name = args[0].s
+                    call_args = args[1]
+                    try:
+                        if type(call_args) == ast.List:
+                            call_args = ' '.join(ast.literal_eval(call_args))
+                        else:
+                            try:
+                                call_args = args[1].s
+                            except ValueError:
+                                call_args = None
+                        docstrings = '{}({})'.format(call_name,
+                                                     ', '.join([a.replace(',', '') for a in call_args.split()]))
+                    except AttributeError:
+                        docstrings = None
+
+                    namedtuple_info = LegacyClassInfo(name, docstrings=docstrings, functions=None)
+
+                    self._classes_info.append(namedtuple_info)
+
+
+class LegacyFuncLister(ast.NodeVisitor):
+    """Going through functions with NodeVisitor to get info"""
+
+    def __init__(self):
+        self._functions_info = []
+
+    @property
+    def functions_info(self):
+        """Return functions_info list which save FuncInfo instances"""
+        return self._functions_info
+
+    @staticmethod
+    def get_func_signature(func_node):
+        if hasattr(func_node, 'args'):
+            arg_lister = LegacyArgLister()
+            arg_lister.visit(func_node.args)
+            signature = arg_lister.args
+            return signature
+        return []
+
+    def visit_FunctionDef(self, node):
+        """Visit function and append it to self.functions_info"""
+        name = node.name
+        docstrings = ast.get_docstring(node)
+        signature = self.get_func_signature(node)
+        func_info = LegacyFuncInfo(name, signature, docstrings)
+
+        self._functions_info.append(func_info)
+
+
+class LegacyArgLister(ast.NodeVisitor):
+    """Going through ast.arg class with NodeVisitor"""
+
+    def __init__(self):
+        self._args = []
+
+    @property
+    def args(self):
+        """Args"""
+        return self._args
+
+    def visit_arg(self, node):
+        """Visit the arg node"""
+        self._args.append(node.arg)
+
+
+def legacy_module_info(module_name, module_node):
+    """Two passes over the module with the legacy ClassLister and FuncLister"""
+    docstrings = ast.get_docstring(module_node)
+
+    class_lister = LegacyClassLister()
+    for child in ast.iter_child_nodes(module_node):
+        if type(child) == ast.ClassDef or type(child) == ast.Assign:
+            class_lister.visit(child)
+
+    function_lister = LegacyFuncLister()
+    for child in ast.iter_child_nodes(module_node):
+        if type(child) == ast.FunctionDef:
+            function_lister.visit(child)
+
+    return LegacyModuleInfo(module_name, docstrings, class_lister.classes_info, function_lister.functions_info)
+
+
+def _functions(functions):
+    return sorted((func.name, tuple(func.signature), func.docstrings or '') for func in functions)
+
+
+def _flat_functions(class_info):
+    """Functions of the class and of its nested classes, as the legacy FuncLister finds them"""
+    functions = []
+    stack = [class_info]
+    while stack:
+        info = stack.pop()
+        functions.extend(info.functions)
+        stack.extend(nested for nested in info.classes if nested.functions is not None)
+    return functions
+
+
+def comparable(info):
+    """Fields of the module info both listers produce, methods are compared in any order"""
+    classes = []
+    for class_info in info.classes:
+        if class_info.functions is None:
+            functions = None
+        elif isinstance(class_info, ClassInfo):
+            functions = _functions(_flat_functions(class_info))
+        else:
+            functions = _functions(class_info.functions)
+        classes.append((class_info.name, class_info.docstrings, functions))
+    return info.name, info.docstrings, classes, [(func.name, tuple(func.signature), func.docstrings)
+                                                 for func in info.functions]
+
+
+def has_async(tree):
+    return any(type(node) == ast.AsyncFunctionDef for node in ast.walk(tree))
+
+
+def timed(extract, trees):
+    results = []
+    start = time.perf_counter()
+    for name, tree in trees:
+        try:
+            results.append(extract(name, tree))
+        except Exception as e:
+            results.append(type(e))
+    return time.perf_counter() - start, results
+
+
+def main():
+    args = corpus.argument_parser('Benchmark of ModuleLister against the legacy listers').parse_args()
+    trees = [(corpus.module_name(path), tree) for path, tree in corpus.parsed_modules(args.directories)]
+    legacy_time, legacy = timed(legacy_module_info, trees)
+    single_time, single = timed(lambda name, tree: ModuleLister(name, tree).module_info, trees)
+    with_async = [has_async(tree) for _, tree in trees]
+    mismatches = [name for (name, _), old, new, skipped in zip(trees, legacy, single, with_async)
+                  if not skipped and (isinstance(old, type) or isinstance(new, type) or
+                                      comparable(old) != comparable(new))]
+
+    print('modules:       {}'.format(len(trees)))
+    print('legacy:        {:.3f} s'.format(legacy_time))
+    print('single-pass:   {:.3f} s'.format(single_time))
+    print('speedup:       {:.2f}x'.format(legacy_time / single_time))
+    print('with async:    {} (not compared)'.format(sum(with_async)))
+    print('mismatches:    {}'.format(len(mismatches)))
+    for name in mismatches:
+        print('  ' + name)
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Benchmark of text layout throughput in characters per second
+on the docstrings of the standard library or of given directories.
+Layout with wrapping is timed with a cold and a warm word width
+memo against emitting the lines as they are.
+
+Usage: python3 benchmarks/bench_layout.py [directory ...]
+"""
+
+import os
+import sys
+import ast
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import fontmetrics
+import pdfformater
+import corpus
+
+SHIFT = 2 * pdfformater.HORIZONTAL_SHIFT
+
+
+def load_docstrings(directories):
+    docstrings = []
+    for _, tree in corpus.parsed_modules(directories):
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                docstring = ast.get_docstring(node)
+                if docstring:
+                    docstrings.append(docstring)
+    return docstrings
+
+
+def unwrapped_lines(text, current_shift):
+    """Lines as they are, like the layout before wrapping"""
+    splited_text = pdfformater.replace_spec_symbols(text).split('\n')
+    yield '/FClassic 12 Tf\n{} -25 Td\n({}) Tj\n'.format(pdfformater.HORIZONTAL_SHIFT, splited_text[0])
+    for string in splited_text[1:]:
+        yield '/FClassic 12 Tf\n0 -25 Td\n({}) Tj\n'.format(string)
+
+
+def timed(layout, docstrings):
+    lines = 0
+    start = time.perf_counter()
+    for docstring in docstrings:
+        for _ in layout(docstring, SHIFT):
+            lines += 1
+    return time.perf_counter() - start, lines
+
+
+def main():
+    args = corpus.argument_parser('Benchmark of text layout throughput').parse_args()
+    docstrings = load_docstrings(args.directories)
+    chars = sum(map(len, docstrings))
+
+    print('docstrings: {}, characters: {}'.format(len(docstrings), chars))
+    print('{:<12} {:>10} {:>10} {:>16}'.format('layout', 'lines', 'seconds', 'chars per second'))
+    fontmetrics.TIMES_ROMAN._word_widths.clear()
+    for name, layout in (('unwrapped', unwrapped_lines),
+                         ('wrap, cold', pdfformater.text_lines),
+                         ('wrap, warm', pdfformater.text_lines)):
+        elapsed, lines = timed(layout, docstrings)
+        print('{:<12} {:>10} {:>10.3f} {:>16,.0f}'.format(name, lines, elapsed, chars / elapsed))
+
+
+if __name__ == '__main__':
+    main()
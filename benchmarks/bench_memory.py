@@ -0,0 +1,80 @@
+"""
+Benchmark of memory held by extracted module info
+of the standard library or of given directories:
+the former namedtuples with lists against the compact records.
+Strings are shared by both, so only the containers are measured.
+
+Usage: python3 benchmarks/bench_memory.py [directory ...]
+"""
+
+import os
+import sys
+import gc
+import tracemalloc
+from collections import namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from astlister import ModuleLister, ModuleInfo, ClassInfo, FuncInfo
+import corpus
+
+LegacyModuleInfo = namedtuple('ModuleInfo', 'name docstrings classes functions')
+LegacyClassInfo = namedtuple('ClassInfo', 'name docstrings functions')
+LegacyFuncInfo = namedtuple('FuncInfo', 'name signature docstrings')
+
+
+def extract_all(directories):
+    infos = []
+    for path, tree in corpus.parsed_modules(directories):
+        try:
+            infos.append(ModuleLister(corpus.module_name(path), tree).module_info)
+        except (AttributeError, IndexError):
+            continue
+    return infos
+
+
+def to_legacy(info):
+    if isinstance(info, ModuleInfo):
+        return LegacyModuleInfo(info.name, info.docstrings,
+                                [to_legacy(c) for c in info.classes], [to_legacy(f) for f in info.functions])
+    if isinstance(info, ClassInfo):
+        functions = None if info.functions is None else [to_legacy(f) for f in info.functions]
+        return LegacyClassInfo(info.name, info.docstrings, functions)
+    return LegacyFuncInfo(info.name, list(info.signature), info.docstrings)
+
+
+def to_compact(info):
+    if isinstance(info, LegacyModuleInfo):
+        return ModuleInfo(info.name, info.docstrings,
+                          [to_compact(c) for c in info.classes], [to_compact(f) for f in info.functions])
+    if isinstance(info, LegacyClassInfo):
+        functions = None if info.functions is None else [to_compact(f) for f in info.functions]
+        return ClassInfo(info.name, info.docstrings, functions)
+    return FuncInfo(info.name, info.signature, info.docstrings)
+
+
+def measure(build, source):
+    gc.collect()
+    tracemalloc.start()
+    result = [build(info) for info in source]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def main():
+    args = corpus.argument_parser('Benchmark of memory held by extracted module info').parse_args()
+    infos = extract_all(args.directories)
+    # Both representations share the strings, only the containers are measured
+    legacy_size, legacy = measure(to_legacy, infos)
+    del infos
+    compact_size, compact = measure(to_compact, legacy)
+
+    print('modules:             {}'.format(len(legacy)))
+    print('namedtuples + lists: {:.1f} MB'.format(legacy_size / 2 ** 20))
+    print('compact records:     {:.1f} MB'.format(compact_size / 2 ** 20))
+    print('saving:              {:.0%}'.format(1 - compact_size / legacy_size))
+
+
+if __name__ == '__main__':
+    main()
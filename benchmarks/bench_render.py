@@ -0,0 +1,50 @@
+"""
+Benchmark of rendering modules with a growing number of members.
+Time per member should stay flat when rendering is linear.
+
+Usage: python3 benchmarks/bench_render.py
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import pdfformater
+from astlister import ModuleInfo, ClassInfo, FuncInfo
+from pdfdocrepr import PDF_Doc_Repr
+
+SIZES = [500, 1000, 2000, 4000, 8000, 16000]
+DOCSTRING = 'Summary line of the member\n\nLonger description of (what) the member does.\nReturns something.'
+
+
+def make_module_info(members):
+    """ModuleInfo with the given number of functions and as many methods in classes"""
+    functions = [FuncInfo('func_{}'.format(i), ['a', 'b', 'c'], DOCSTRING) for i in range(members)]
+    classes = [ClassInfo('Class{}'.format(i), DOCSTRING,
+                         [FuncInfo('method_{}'.format(j), ['self', 'x'], DOCSTRING) for j in range(10)])
+               for i in range(members // 10)]
+    return ModuleInfo('synthetic', DOCSTRING, classes, functions)
+
+
+def bench(members):
+    module_info = make_module_info(members)
+    start = time.perf_counter()
+    pdf = PDF_Doc_Repr().module_to_pdf(module_info)
+    pages = sum(1 for _ in pdfformater.paginate(pdf))
+    elapsed = time.perf_counter() - start
+    return elapsed, pages
+
+
+def main():
+    argparse.ArgumentParser(description='Benchmark of rendering modules with a growing number of members').parse_args()
+    print('{:>8} {:>8} {:>10} {:>14}'.format('members', 'pages', 'seconds', 'us per member'))
+    for members in SIZES:
+        elapsed, pages = bench(members)
+        print('{:>8} {:>8} {:>10.3f} {:>14.2f}'.format(members, pages, elapsed, elapsed / members * 1e6))
+
+
+if __name__ == '__main__':
+    main()
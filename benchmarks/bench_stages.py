@@ -0,0 +1,168 @@
+"""
+Benchmark suite timing every stage of making a PDF-file separately:
+reading, ast.parse, ModuleLister, PDF_Doc_Repr rendering,
+pagination with writing to memory, and _save_pdf.
+Cases are synthetic modules of increasing size and real corpora.
+Results are saved as JSON and can be compared with a previous run.
+
+Usage:
+    python3 benchmarks/bench_stages.py --output new.json
+    python3 benchmarks/bench_stages.py --stdlib --compare old.json
+"""
+
+import os
+import io
+import sys
+import ast
+import json
+import time
+import platform
+import argparse
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import astlister
+import pdfformater
+import pdfwriter
+import docstring2pdf
+from pdfdocrepr import PDF_Doc_Repr
+import corpus
+from synthetic import SHAPES, make_source
+
+STAGES = ['read', 'parse', 'extract', 'render_module', 'render_classes', 'render_functions',
+          'paginate_write', 'save']
+
+
+def _timed(timings, stage, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+    return result
+
+
+def run_file(path, out_dir, timings):
+    """Time all stages for one module, adding to timings"""
+    renderer = PDF_Doc_Repr()
+    module_name = os.path.basename(path)[:-3]
+    code = _timed(timings, 'read', corpus.read, path)
+    tree = _timed(timings, 'parse', ast.parse, code)
+    info = _timed(timings, 'extract', lambda: astlister.ModuleLister(module_name, tree).module_info)
+    pdf = _timed(timings, 'render_module', renderer.module_to_pdf, info)
+    _timed(timings, 'render_classes',
+           lambda: [renderer.class_to_pdf(cls, module_name) for cls in info.classes if cls.functions is not None])
+    _timed(timings, 'render_functions',
+           lambda: [renderer.function_to_pdf(fnc, None, module_name) for fnc in info.functions])
+    _timed(timings, 'paginate_write',
+           lambda: pdfwriter.write_document(io.BytesIO(), pdfformater.paginate(pdf)))
+    _timed(timings, 'save', docstring2pdf._save_pdf, out_dir, module_name, pdf)
+
+
+def run_case(name, paths, repeat):
+    """Best of repeat runs over the files of the case"""
+    best = None
+    with tempfile.TemporaryDirectory() as out_dir:
+        for _ in range(repeat):
+            timings = {}
+            for path in paths:
+                run_file(path, out_dir, timings)
+            if best is None:
+                best = timings
+            else:
+                best = {stage: min(best[stage], timings[stage]) for stage in best}
+    size = sum(os.path.getsize(path) for path in paths)
+    lines = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            lines += f.read().count(b'\n')
+    return {'name': name, 'files': len(paths), 'bytes': size, 'lines': lines,
+            'stages': {stage: best.get(stage, 0.0) for stage in STAGES}}
+
+
+def corpus_files(directory):
+    paths = []
+    for path, tree in corpus.parsed_modules([directory], corpus.SKIPPED_DIRECTORIES + ('test', 'tests')):
+        try:
+            astlister.ModuleLister('module', tree)
+        except (AttributeError, IndexError):
+            continue
+        paths.append(path)
+    return paths
+
+
+def compare(results, baseline, threshold):
+    """Return stages that got slower than the baseline by more than threshold"""
+    regressions = []
+    old_cases = {case['name']: case for case in baseline['cases']}
+    for case in results['cases']:
+        old = old_cases.get(case['name'])
+        if old is None:
+            continue
+        for stage, seconds in case['stages'].items():
+            old_seconds = old['stages'].get(stage)
+            if old_seconds and seconds > old_seconds * (1 + threshold) and seconds - old_seconds > 0.001:
+                regressions.append((case['name'], stage, old_seconds, seconds))
+    return regressions
+
+
+def print_results(results):
+    header = '{:<16}'.format('case') + ''.join('{:>17}'.format(stage) for stage in STAGES)
+    print(header)
+    for case in results['cases']:
+        print('{:<16}'.format(case['name']) +
+              ''.join('{:>17.4f}'.format(case['stages'][stage]) for stage in STAGES))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark stages of docstring2pdf')
+    parser.add_argument('--shapes', type=str, default=','.join(SHAPES),
+                        help='comma separated synthetic shapes, empty for none. Default: all')
+    parser.add_argument('--stdlib', action='store_true', help='add the standard library as a corpus')
+    parser.add_argument('--corpus', type=str, action='append', default=[], help='add a directory as a corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case, the best is kept. Default: 3')
+    parser.add_argument('--output', type=str, default=None, help='save results as JSON to the file')
+    parser.add_argument('--compare', type=str, default=None, help='compare with results saved before')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='slowdown ratio reported as a regression. Default: 0.2')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = {'meta': {'python': platform.python_version(),
+                        'platform': platform.platform(),
+                        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'repeat': args.repeat},
+               'cases': []}
+
+    with tempfile.TemporaryDirectory() as source_dir:
+        for name in filter(None, args.shapes.split(',')):
+            path = os.path.join(source_dir, 'synthetic_{}.py'.format(name.replace('-', '_')))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(make_source(SHAPES[name]))
+            results['cases'].append(run_case(name, [path], args.repeat))
+
+    corpora = list(args.corpus)
+    if args.stdlib:
+        corpora.append(corpus.stdlib())
+    for directory in corpora:
+        name = 'stdlib' if directory == corpus.stdlib() else os.path.basename(directory.rstrip('/'))
+        results['cases'].append(run_case(name, corpus_files(directory), args.repeat))
+
+    print_results(results)
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, stage, old, new in regressions:
+            print('REGRESSION {} {}: {:.4f} s -> {:.4f} s'.format(name, stage, old, new))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Python modules of real corpora for benchmarks:
+the standard library or given directories
+"""
+
+import os
+import ast
+import argparse
+import sysconfig
+
+SKIPPED_DIRECTORIES = ('__pycache__', 'site-packages')
+
+
+def stdlib():
+    """Directory of the standard library"""
+    return sysconfig.get_paths()['stdlib']
+
+
+def argument_parser(description):
+    """Parser of the directories of the corpus, the standard library if none are given"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('directories', type=str, nargs='*', metavar='directory', default=[stdlib()],
+                        help='directories of python modules. Default: the standard library')
+    return parser
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parsed_modules(directories, skipped=SKIPPED_DIRECTORIES):
+    """Path and AST-node of every parsable module in the directories, in a stable order"""
+    for directory in directories:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = sorted(d for d in dirnames if d not in skipped)
+            for filename in sorted(filenames):
+                if not filename.endswith('.py'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    tree = ast.parse(read(path))
+                except (SyntaxError, UnicodeDecodeError, ValueError):
+                    continue
+                yield path, tree
+
+
+def module_name(path):
+    return os.path.basename(path)[:-3]
@@ -0,0 +1,50 @@
+"""
+Generator of synthetic python modules for benchmarks
+"""
+
+from collections import namedtuple
+
+Shape = namedtuple('Shape', 'classes methods functions doc_lines body_lines')
+
+# Shapes of increasing size, from a small script to a generated stub module
+SHAPES = {
+    'tiny': Shape(classes=2, methods=3, functions=5, doc_lines=2, body_lines=2),
+    'small': Shape(classes=20, methods=8, functions=40, doc_lines=4, body_lines=4),
+    'medium': Shape(classes=200, methods=10, functions=400, doc_lines=6, body_lines=6),
+    'large': Shape(classes=1000, methods=12, functions=2000, doc_lines=8, body_lines=8),
+    'long-docs': Shape(classes=100, methods=10, functions=200, doc_lines=60, body_lines=2),
+}
+
+
+def _docstring(indent, name, doc_lines):
+    lines = ['{}"""Summary of {} (generated)'.format(indent, name), '']
+    lines.extend('{}Line {} of the description of {}, with some words in it.'.format(indent, i, name)
+                 for i in range(doc_lines))
+    lines.append('{}"""'.format(indent))
+    return lines
+
+
+def _function(indent, name, args, shape):
+    lines = ['{}def {}({}):'.format(indent, name, ', '.join(args))]
+    lines.extend(_docstring(indent + '    ', name, shape.doc_lines))
+    lines.extend('{}    value_{} = {} * 2'.format(indent, i, i) for i in range(shape.body_lines))
+    lines.append('{}    return None'.format(indent))
+    lines.append('')
+    return lines
+
+
+def make_source(shape):
+    """Source code of a module of the shape"""
+    lines = list(_docstring('', 'the synthetic module', shape.doc_lines))
+    lines.extend(['', 'from collections import namedtuple', ''])
+    lines.append("Point = namedtuple('Point', 'x y z')")
+    lines.append('')
+    for c in range(shape.classes):
+        lines.append('class Class{}(object):'.format(c))
+        lines.extend(_docstring('    ', 'Class{}'.format(c), shape.doc_lines))
+        lines.append('')
+        for m in range(shape.methods):
+            lines.extend(_function('    ', 'method_{}'.format(m), ['self', 'a', 'b=1', '*args', '**kwargs'], shape))
+    for f in range(shape.functions):
+        lines.extend(_function('', 'function_{}'.format(f), ['x', 'y', 'z=None'], shape))
+    return '\n'.join(lines) + '\n'
@@ -1,110 +1,550 @@
-"""
-Get python-docstrings in PDF-format
-"""
-
-import os
-import sys
-import ast
-import astlister
-import argparser
-from collections import namedtuple
-from os.path import basename
-from pdfdocrepr import PDF_Doc_Repr
-
-Object = namedtuple('Object', 'file_path module_name first_obj second_obj')
-
-
-def main():
-    args = argparser.parse_args()
-    pdf_doc = PDF_Doc()
-    pdf = pdf_doc.get_pdf_doc(args.fromobject)
-    if args.to == 'results/':
-        _save_pdf('results/', pdf_doc.full_name, pdf)
-    else:
-        _save_pdf(args.to, pdf_doc.full_name, pdf)
-
-
-def _save_pdf(directory, name, pdf):
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    with open(directory + '/' + name + '.pdf', 'w', encoding='utf-8') as f:
-        f.write(pdf)
-
-
-class PDF_Doc:
-    """
-    Get info and docstrings from python-file
-    """
-
-    def __init__(self):
-        self.full_name = ''
-
-    def _parse_object_name(self, object_path):
-        path_list = object_path.split('/')
-        self.full_name = path_list[-1]
-        split_name = path_list[-1].split('.')
-        length = len(split_name)
-
-        if len(path_list) > 1:
-            file_path = '/'.join(path_list[:-1]) + '/' + split_name[0] + '.py'
-        else:
-            file_path = split_name[0] + '.py'
-        module_name = basename(file_path).split('.')[0]
-
-        first_obj = None
-        if length >= 2:
-            first_obj = split_name[1]
-
-        second_obj = None
-        if length == 3:
-            second_obj = split_name[2]
-
-        return Object(file_path, module_name, first_obj, second_obj)
-
-    @staticmethod
-    def _extract_classes_info(obj_info, class_name):
-        for cls in obj_info.classes:
-            if cls.name == class_name:
-                return cls
-        return None
-
-    @staticmethod
-    def _extract_functions_info(obj_info, fnc_name):
-        for fnc in obj_info.functions:
-            if fnc.name == fnc_name:
-                return fnc
-        return None
-
-    def get_pdf_doc(self, filename):
-        """Get pdf-docstrings to Object"""
-        obj = self._parse_object_name(filename)
-        try:
-            with open(obj.file_path, 'r', encoding='utf-8') as f:
-                code = f.read()
-        except (FileNotFoundError, AttributeError):
-            sys.stderr.write("No such module, class or function. Read help.\n")
-            sys.exit()
-
-        tree = ast.parse(code)
-        lister = astlister.ModuleLister(obj.module_name, tree)
-        pdf_doc = PDF_Doc_Repr()
-
-        mod_info = lister.module_info
-
-        if obj.first_obj is not None and obj.second_obj is None:
-            cls_info = self._extract_classes_info(mod_info, obj.first_obj)
-            if cls_info is None:
-                fnc_info = self._extract_functions_info(mod_info, obj.first_obj)
-                return pdf_doc.function_to_pdf(fnc_info, None, obj.module_name)
-            else:
-                return pdf_doc.class_to_pdf(cls_info, obj.module_name)
-        elif obj.second_obj is not None:
-            cls_info = self._extract_classes_info(mod_info, obj.first_obj)
-            fnc_info = self._extract_functions_info(cls_info, obj.second_obj)
-            return pdf_doc.function_to_pdf(fnc_info, obj.first_obj, obj.module_name)
-        else:
-            return pdf_doc.module_to_pdf(mod_info)
-
-
-if __name__ == "__main__":
-    main()
+"""
+Get python-docstrings in PDF-format
+"""
+
+import os
+import sys
+import ast
+import signal
+import astlister
+import argparser
+import infocache
+import ir
+import manifest
+import pdfwriter
+import pdfformater
+import profiler
+import server
+import sharding
+import tokenlister
+import watcher
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from os.path import basename
+from pdfdocrepr import PDF_Doc_Repr, FragmentCache
+
+Object = namedtuple('Object', 'file_path module_name first_obj second_obj')
+Target = namedtuple('Target', 'object_path name document', defaults=(None,))
+Result = namedtuple('Result', 'target error events', defaults=((),))
+BuildOptions = namedtuple('BuildOptions', 'directory cache compress_level profile engine object_streams fragments',
+                          defaults=(False, 'ast', False, None))
+
+
+class DocError(LookupError):
+    """Module, class or function can't be documented"""
+
+
+def main():
+    args = argparser.parse_args()
+    if args.command == 'render':
+        try:
+            failed = _render_ir(args)
+        except (OSError, ir.IRError) as e:
+            sys.exit('{}: {}'.format(type(e).__name__, e))
+        if failed:
+            sys.exit(1)
+        return
+
+    if args.command == 'merge':
+        try:
+            merged = sharding.merge(args.to, args.shards)
+        except sharding.MergeError as e:
+            sys.exit('{}: {}'.format(type(e).__name__, e))
+        sys.stderr.write('Merged {} PDF files of {} shards.\n'.format(len(merged.entries), len(args.shards)))
+        return
+
+    cache = None
+    if args.cache_dir is not None:
+        cache = infocache.ModuleInfoCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    if args.command == 'extract':
+        if _extract_ir(args, cache):
+            sys.exit(1)
+        return
+    if args.serve is not None:
+        options = BuildOptions(None, infocache.MemoryInfoCache(cache), args.compress_level, engine=args.engine,
+                               object_streams=args.object_streams, fragments=FragmentCache())
+        _serve(args.serve, options, args.jobs or os.cpu_count() or 1)
+        return
+
+    options = BuildOptions(args.to, cache, args.compress_level, args.profile is not None, args.engine,
+                           args.object_streams)
+    if args.watch:
+        # Extracted info and rendered members of unchanged modules are reused by the rebuilds
+        options = options._replace(cache=infocache.MemoryInfoCache(cache), fragments=FragmentCache())
+    recorder = profiler.Profiler() if args.profile is not None else profiler.NULL_PROFILER
+    failed = _run(args, options, recorder, jobs=args.jobs)
+    if args.watch:
+        _watch(args, options, recorder)
+    elif failed:
+        sys.exit(1)
+
+
+def _run(args, options, recorder, changed=None, jobs=1):
+    """
+    Document the objects of the arguments, only the ones
+    with the changed sources if the set of paths is given.
+    Return the failed results.
+    """
+    targets, duplicates = _split_duplicates(_discover_targets(args.fromobject))
+    if args.shard is not None:
+        index, count = args.shard
+        targets = sharding.select(targets, [_source_size(target) for target in targets], index, count)
+    if args.book is not None:
+        results = _build_book(targets, options, jobs, args.book, recorder)
+        removed = []
+    else:
+        outputs = manifest.Manifest(args.to)
+        if changed is None:
+            outdated = _select_outdated(targets, outputs, args.force, _output_options(options))
+        else:
+            outdated = [target for target in targets if os.path.abspath(_source_path(target)) in changed]
+        results = _build(outdated, options, jobs)
+        _update_manifest(outputs, results, _output_options(options))
+        removed = outputs.remove_orphans()
+        if args.shard is not None:
+            # Objects of other shards may have been here when the partition was different
+            removed += outputs.retain(target.name for target in targets)
+            outputs.shard = {'index': args.shard[0], 'count': args.shard[1]}
+        else:
+            outputs.shard = None
+        outputs.save()
+
+    if args.profile is not None:
+        for result in results:
+            for event in result.events:
+                recorder.record(event)
+        recorder.save(args.profile)
+
+    return _report(targets + [result.target for result in duplicates], results + duplicates, removed,
+                   changed is not None)
+
+
+def _report(targets, results, removed=(), summary=False):
+    """Write the failures and, for many targets, the summary to stderr, return the failed results"""
+    failed = [result for result in results if result.error is not None]
+    for result in failed:
+        sys.stderr.write('{}: {}\n'.format(result.target.object_path, result.error))
+    if len(targets) > 1 or summary:
+        sys.stderr.write('Documented {} of {} objects, {} up to date, {} failed, {} removed.\n'
+                         .format(len(results) - len(failed), len(targets), len(targets) - len(results),
+                                 len(failed), len(removed)))
+    return failed
+
+
+def _extract_ir(args, cache):
+    """Save ir.Document of every object to the IR-file, return the failed results"""
+    targets, duplicates = _split_duplicates(_discover_targets(args.fromobject))
+    results = []
+
+    def documents():
+        for result, document in _map(_extract, targets, BuildOptions(None, cache, None, engine=args.engine), args.jobs):
+            results.append(result)
+            if document is not None:
+                yield document
+
+    with open(args.output, 'wb') as f:
+        ir.write(f, documents(), args.binary)
+    return _report(targets + [result.target for result in duplicates], results + duplicates)
+
+
+def _render_ir(args):
+    """Render the documents of the IR-files as PDF-files, return the failed results"""
+    targets = []
+    for path in args.ir:
+        with open(path, 'rb') as f:
+            targets.extend(Target(document.object_path, document.name, document) for document in ir.read(f))
+    options = BuildOptions(args.to, None, args.compress_level, object_streams=args.object_streams)
+    if args.book is not None:
+        results = _build_book(targets, options, args.jobs, args.book)
+    else:
+        results = _build(targets, options, args.jobs)
+    return _report(targets, results)
+
+
+def _watch(args, options, recorder):
+    """Document the objects of changed sources again until interrupted"""
+    directories = [path for path in args.fromobject if os.path.isdir(path)]
+    files = [_source_path(target)
+             for target in _discover_targets([path for path in args.fromobject if not os.path.isdir(path)])]
+    with watcher.make_watcher(directories, files) as watch:
+        sys.stderr.write('Watching for changes, press Ctrl-C to stop.\n')
+        try:
+            while True:
+                changed = watch.wait()
+                _forget_removed(options.cache, changed)
+                # One process, so the extracted info in memory is reused
+                _run(args, options, recorder, changed)
+        except KeyboardInterrupt:
+            pass
+
+
+def _forget_removed(cache, changed):
+    """Drop the extracted info of the changed sources that were deleted or moved"""
+    for path in changed:
+        if not os.path.exists(path):
+            cache.forget(path)
+
+
+def _serve(address, options, jobs):
+    """
+    Serve PDF-files of objects until interrupted, keeping extracted info
+    in options.cache and rendered members in options.fragments
+    """
+    cache = options.cache
+
+    def render(object_path):
+        return _render_pdf(object_path, cache, options.compress_level, options.engine, options.object_streams,
+                           options.fragments)
+
+    def stats():
+        return {'modules': len(cache), 'hits': cache.hits, 'misses': cache.misses,
+                'fragments': options.fragments.stats()}
+
+    # Stop on SIGTERM like on Ctrl-C, so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with server.make_server(address, render, stats, jobs) as render_server:
+        sys.stderr.write('Serving on {}\n'.format(server.parse_address(address)))
+        try:
+            render_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _render_pdf(object_path, cache=None, compress_level=None, engine='ast', object_streams=False, fragments=None):
+    """PDF-file of the object as bytes"""
+    pdf = PDF_Doc(cache, engine=engine, fragments=fragments).get_pdf_doc(object_path)
+    return PDF_Doc_Repr.make_pdf(pdf, compress_level, object_streams)
+
+
+def _source_path(target):
+    return PDF_Doc()._parse_object_name(target.object_path).file_path
+
+
+def _source_size(target):
+    try:
+        return os.path.getsize(_source_path(target))
+    except OSError:
+        return 0
+
+
+def _select_outdated(targets, outputs, force=False, output_options=None):
+    """Targets whose PDF-files are missing or made from other sources or with other options"""
+    if force:
+        return list(targets)
+    return [target for target in targets
+            if not outputs.is_up_to_date(target.name, target.object_path, _source_path(target), output_options)]
+
+
+def _output_options(options):
+    """Options of the build that change the PDF-files, as the manifest records them"""
+    return {'compress_level': options.compress_level, 'object_streams': options.object_streams}
+
+
+def _update_manifest(outputs, results, output_options=None):
+    for result in results:
+        target = result.target
+        if result.error is None:
+            outputs.record(target.name, target.object_path, _source_path(target), output_options)
+        else:
+            outputs.forget(target.name)
+
+
+def _discover_targets(paths):
+    """Expand directories and packages to the modules they contain"""
+    targets = []
+    for path in paths:
+        if os.path.isdir(path):
+            targets.extend(_walk_directory(path))
+        elif path.endswith('.py') and os.path.isfile(path):
+            targets.append(Target(path[:-3], basename(path[:-3])))
+        else:
+            targets.append(Target(path, basename(path)))
+    return targets
+
+
+def _split_duplicates(targets):
+    """
+    Targets with distinct names and failed results of the targets whose name,
+    and so the PDF-file, is taken by another object. Repeated targets are kept once.
+    """
+    first_targets = {}
+    unique = []
+    duplicates = []
+    for target in targets:
+        first = first_targets.setdefault(target.name, target)
+        if first is target:
+            unique.append(target)
+        elif first != target:
+            error = DocError('{}.pdf is already made of {}'.format(target.name, first.object_path))
+            duplicates.append(Result(target, _error_message(error)))
+    return unique, duplicates
+
+
+def _walk_directory(directory):
+    directory = os.path.normpath(directory)
+    root_name = basename(os.path.abspath(directory))
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != '__pycache__')
+        package = os.path.relpath(dirpath, directory).replace(os.sep, '.')
+        for filename in sorted(filenames):
+            if not filename.endswith('.py'):
+                continue
+            module_name = filename[:-3]
+            name_parts = [root_name] + ([] if package == '.' else [package]) + [module_name]
+            yield Target(os.path.join(dirpath, module_name), '.'.join(name_parts))
+
+
+def _build(targets, options, jobs=1):
+    """Document every target, in parallel when jobs isn't 1"""
+    return list(_map(_document, targets, options, jobs))
+
+
+def _build_book(targets, options, jobs=1, name='book', recorder=profiler.NULL_PROFILER):
+    """Document every target as a chapter of one PDF-file, return the results"""
+    results = []
+
+    def chapters():
+        for result, pdf in _map(_render_chapter, targets, options, jobs):
+            results.append(result)
+            if pdf is not None:
+                yield result.target.name, pdf
+
+    if not os.path.exists(options.directory):
+        os.makedirs(options.directory)
+    with recorder.stage('write', name):
+        size = _replace_file(options.directory + '/' + name + '.pdf',
+                             lambda f: pdfwriter.write_book(f, chapters(), options.compress_level,
+                                                            options.object_streams))
+    recorder.count('bytes', name, size)
+    return results
+
+
+def _map(function, targets, options, jobs):
+    """Yield function(target, options) of the targets in order, in worker processes when jobs isn't 1"""
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(targets))
+    if jobs <= 1:
+        for target in targets:
+            yield function(target, options)
+        return
+    chunksize = max(1, len(targets) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(function, targets, [options] * len(targets), chunksize=chunksize)
+
+
+def _document(target, options):
+    recorder = profiler.Profiler() if options.profile else profiler.NULL_PROFILER
+    try:
+        doc = PDF_Doc(options.cache, recorder, options.engine, options.fragments)
+        pdf = _target_pdf(doc, target)
+        with recorder.stage('write', doc.full_name):
+            size = _save_pdf(options.directory, target.name, pdf, options.compress_level, options.object_streams)
+        recorder.count('bytes', doc.full_name, size)
+    except Exception as e:
+        return Result(target, _error_message(e), tuple(recorder.events))
+    return Result(target, None, tuple(recorder.events))
+
+
+def _render_chapter(target, options):
+    """Result and pdf-code of the target, the pdf-code is None on failure"""
+    recorder = profiler.Profiler() if options.profile else profiler.NULL_PROFILER
+    try:
+        pdf = _target_pdf(PDF_Doc(options.cache, recorder, options.engine, options.fragments), target)
+    except Exception as e:
+        return Result(target, _error_message(e), tuple(recorder.events)), None
+    return Result(target, None, tuple(recorder.events)), pdf
+
+
+def _extract(target, options):
+    """Result and ir.Document of the target, the document is None on failure"""
+    try:
+        document = PDF_Doc(options.cache, engine=options.engine).get_document(target.object_path, target.name)
+    except Exception as e:
+        return Result(target, _error_message(e)), None
+    return Result(target, None), document
+
+
+def _target_pdf(doc, target):
+    """Pdf-code of the target's document if it's already extracted, otherwise of its object"""
+    if target.document is not None:
+        return doc.render_document(target.document)
+    return doc.get_pdf_doc(target.object_path)
+
+
+def _error_message(error):
+    return '{}: {}'.format(type(error).__name__, error)
+
+
+def _save_pdf(directory, name, pdf, compress_level=None, object_streams=False):
+    """Write the pdf-code as a PDF-file, return its size"""
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    return _replace_file(directory + '/' + name + '.pdf',
+                         lambda f: pdfwriter.write_document(f, pdfformater.paginate(pdf), compress_level,
+                                                            object_streams))
+
+
+def _replace_file(path, write):
+    """
+    Replace the file with the one write(f) makes, return what write returns.
+    The new file gets a new inode, so readers and hardlinks of merged shards
+    keep the old file whole.
+    """
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            result = write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return result
+
+
+class PDF_Doc:
+    """
+    Get info and docstrings from python-file
+    """
+
+    def __init__(self, cache=None, recorder=None, engine='ast', fragments=None):
+        """
+        Constructor gets an optional infocache.ModuleInfoCache, profiler.Profiler,
+        the engine reading modules, 'ast' or 'tokens', and an optional
+        pdfdocrepr.FragmentCache of rendered members
+        """
+        self.full_name = ''
+        self.cache = cache
+        self.engine = engine
+        self.fragments = fragments
+        self.profiler = recorder if recorder is not None else profiler.NULL_PROFILER
+
+    def _parse_object_name(self, object_path):
+        path_list = object_path.split('/')
+        self.full_name = path_list[-1]
+        split_name = path_list[-1].split('.')
+        length = len(split_name)
+
+        if len(path_list) > 1:
+            file_path = '/'.join(path_list[:-1]) + '/' + split_name[0] + '.py'
+        else:
+            file_path = split_name[0] + '.py'
+        module_name = basename(file_path).split('.')[0]
+
+        first_obj = None
+        if length >= 2:
+            first_obj = split_name[1]
+
+        second_obj = None
+        if length == 3:
+            second_obj = split_name[2]
+
+        return Object(file_path, module_name, first_obj, second_obj)
+
+    @staticmethod
+    def _extract_classes_info(obj_info, class_name):
+        for cls in obj_info.classes:
+            if cls.name == class_name:
+                return cls
+        return None
+
+    @staticmethod
+    def _extract_functions_info(obj_info, fnc_name):
+        for fnc in obj_info.functions:
+            if fnc.name == fnc_name:
+                return fnc
+        return None
+
+    def _extract_symbol_index(self, module_name, code):
+        if self.engine == 'tokens':
+            with self.profiler.stage('extract', self.full_name):
+                return tokenlister.list_module(module_name, code).symbol_index
+        with self.profiler.stage('parse', self.full_name):
+            tree = ast.parse(code)
+        if self.profiler.enabled:
+            self.profiler.count('nodes', self.full_name, sum(1 for _ in ast.walk(tree)))
+        with self.profiler.stage('extract', self.full_name):
+            return astlister.ModuleLister(module_name, tree).symbol_index
+
+    def _read_source(self, obj):
+        try:
+            with self.profiler.stage('read', self.full_name):
+                with open(obj.file_path, 'r', encoding='utf-8') as f:
+                    return f.read()
+        except (FileNotFoundError, AttributeError):
+            raise DocError("No such module, class or function. Read help.")
+
+    def _get_symbol_index(self, obj):
+        if self.cache is not None:
+            try:
+                with self.profiler.stage('cache', self.full_name):
+                    return self.cache.get_module_info(obj.file_path, obj.module_name, self._extract_symbol_index)
+            except FileNotFoundError:
+                raise DocError("No such module, class or function. Read help.")
+        if self.engine == 'tokens':
+            try:
+                with self.profiler.stage('extract', self.full_name):
+                    return tokenlister.read_module(obj.module_name, obj.file_path).symbol_index
+            except FileNotFoundError:
+                raise DocError("No such module, class or function. Read help.")
+        return self._extract_symbol_index(obj.module_name, self._read_source(obj))
+
+    def _get_object_info(self, obj, members):
+        if self.cache is not None or self.engine == 'tokens':
+            return self._get_symbol_index(obj).lookup(members)
+        # Without a cache there's no use in listing the whole module with ast
+        code = self._read_source(obj)
+        with self.profiler.stage('extract', self.full_name):
+            return astlister.find_object_info(code, members)
+
+    def get_document(self, filename, name=None):
+        """Get ir.Document of Object, the PDF-file name defaults to the object's name"""
+        obj = self._parse_object_name(filename)
+        members = self.full_name.split('.')[1:]
+        class_name = None
+        if not members:
+            info = self._get_symbol_index(obj).module_info
+        else:
+            info = self._get_object_info(obj, members)
+            if isinstance(info, astlister.FuncInfo):
+                class_name = '.'.join(members[:-1]) or None
+            elif not isinstance(info, astlister.ClassInfo):
+                raise DocError("No such class or function: {}".format('.'.join(members)))
+        return ir.Document(name or basename(filename), filename, obj.module_name, class_name, info)
+
+    def render_document(self, document):
+        """Get pdf-docstrings of ir.Document"""
+        self.full_name = document.object_path.split('/')[-1]
+        info = document.info
+        with self.profiler.stage('render', self.full_name):
+            pdf_doc = PDF_Doc_Repr(self.fragments)
+            if isinstance(info, astlister.ModuleInfo):
+                pdf = pdf_doc.module_to_pdf(info)
+            elif isinstance(info, astlister.ClassInfo):
+                pdf = pdf_doc.class_to_pdf(info, document.module_name)
+            else:
+                pdf = pdf_doc.function_to_pdf(info, document.class_name, document.module_name)
+        if self.profiler.enabled:
+            self.profiler.count('members', self.full_name, _count_members(info))
+            self.profiler.count('lines', self.full_name, pdf.lines)
+        return pdf
+
+    def get_pdf_doc(self, filename):
+        """Get pdf-docstrings to Object"""
+        return self.render_document(self.get_document(filename))
+
+
+def _count_members(info):
+    count = 0
+    stack = [info]
+    while stack:
+        member = stack.pop()
+        count += 1
+        stack.extend(getattr(member, 'classes', None) or ())
+        stack.extend(getattr(member, 'functions', None) or ())
+    return count
+
+
+if __name__ == "__main__":
+    main()
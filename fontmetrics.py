@@ -0,0 +1,166 @@
+"""
+Module measures text set in the standard Times fonts
+"""
+
+# Widths of the glyphs in 1/1000 of the font size, from the Adobe Core 14 AFM files:
+# Copyright (c) 1985, 1987, 1989, 1990, 1993, 1997 Adobe Systems Incorporated. All Rights Reserved.
+# Times is a trademark of Linotype-Hell AG and/or its subsidiaries.
+# Tables hold the characters from ' ' to '\xff', the _EXTRA ones are the rest of WinAnsiEncoding.
+
+_TIMES_ROMAN = (
+    250, 333, 408, 500, 500, 833, 778, 180, 333, 333, 500, 564, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 278, 278, 564, 564, 564, 444,
+    921, 722, 667, 667, 722, 611, 556, 722, 722, 333, 389, 722, 611, 889, 722, 722,
+    556, 722, 667, 556, 611, 722, 722, 944, 722, 722, 611, 333, 278, 333, 469, 500,
+    333, 444, 500, 444, 500, 444, 333, 500, 500, 278, 278, 500, 278, 778, 500, 500,
+    500, 500, 333, 389, 278, 500, 500, 722, 500, 500, 444, 480, 200, 480, 541, 500,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+    250, 333, 500, 500, 500, 500, 200, 500, 333, 760, 276, 500, 564, 333, 760, 333,
+    400, 564, 300, 300, 333, 500, 453, 250, 333, 300, 310, 500, 750, 750, 750, 444,
+    722, 722, 722, 722, 722, 722, 889, 667, 611, 611, 611, 611, 333, 333, 333, 333,
+    722, 722, 722, 722, 722, 722, 722, 564, 722, 722, 722, 722, 722, 722, 556, 500,
+    444, 444, 444, 444, 444, 444, 667, 444, 444, 444, 444, 444, 278, 278, 278, 278,
+    500, 500, 500, 500, 500, 500, 500, 564, 500, 500, 500, 500, 500, 500, 500, 500,
+)
+_TIMES_ROMAN_EXTRA = {'€': 500, '‚': 333, 'ƒ': 500, '„': 444, '…': 1000, '†': 500, '‡': 500, 'ˆ': 333, '‰': 1000, 'Š': 556, '‹': 333, 'Œ': 889, 'Ž': 611, '‘': 333, '’': 333, '“': 444, '”': 444, '•': 350, '–': 500, '—': 1000, '˜': 333, '™': 980, 'š': 389, '›': 333, 'œ': 722, 'ž': 444, 'Ÿ': 722}
+
+_TIMES_BOLD = (
+    250, 333, 555, 500, 500, 1000, 833, 278, 333, 333, 500, 570, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 570, 570, 570, 500,
+    930, 722, 667, 722, 722, 667, 611, 778, 778, 389, 500, 778, 667, 944, 722, 778,
+    611, 778, 722, 556, 667, 722, 722, 1000, 722, 722, 667, 333, 278, 333, 581, 500,
+    333, 500, 556, 444, 556, 444, 333, 500, 556, 278, 333, 556, 278, 833, 556, 500,
+    556, 556, 444, 389, 333, 556, 500, 722, 500, 500, 444, 394, 220, 394, 520, 500,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+    250, 333, 500, 500, 500, 500, 220, 500, 333, 747, 300, 500, 570, 333, 747, 333,
+    400, 570, 300, 300, 333, 556, 540, 250, 333, 300, 330, 500, 750, 750, 750, 500,
+    722, 722, 722, 722, 722, 722, 1000, 722, 667, 667, 667, 667, 389, 389, 389, 389,
+    722, 722, 778, 778, 778, 778, 778, 570, 778, 722, 722, 722, 722, 722, 611, 556,
+    500, 500, 500, 500, 500, 500, 722, 444, 444, 444, 444, 444, 278, 278, 278, 278,
+    500, 556, 500, 500, 500, 500, 500, 570, 500, 556, 556, 556, 556, 500, 556, 500,
+)
+_TIMES_BOLD_EXTRA = {'€': 500, '‚': 333, 'ƒ': 500, '„': 500, '…': 1000, '†': 500, '‡': 500, 'ˆ': 333, '‰': 1000, 'Š': 556, '‹': 333, 'Œ': 1000, 'Ž': 667, '‘': 333, '’': 333, '“': 500, '”': 500, '•': 350, '–': 500, '—': 1000, '˜': 333, '™': 1000, 'š': 389, '›': 333, 'œ': 722, 'ž': 444, 'Ÿ': 722}
+
+_TIMES_ITALIC = (
+    250, 333, 420, 500, 500, 833, 778, 214, 333, 333, 500, 675, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 675, 675, 675, 500,
+    920, 611, 611, 667, 722, 611, 611, 722, 722, 333, 444, 667, 556, 833, 667, 722,
+    611, 722, 611, 500, 556, 722, 611, 833, 611, 556, 556, 389, 278, 389, 422, 500,
+    333, 500, 500, 444, 500, 444, 278, 500, 500, 278, 278, 444, 278, 722, 500, 500,
+    500, 500, 389, 389, 278, 500, 444, 667, 444, 444, 389, 400, 275, 400, 541, 500,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+    250, 389, 500, 500, 500, 500, 275, 500, 333, 760, 276, 500, 675, 333, 760, 333,
+    400, 675, 300, 300, 333, 500, 523, 250, 333, 300, 310, 500, 750, 750, 750, 500,
+    611, 611, 611, 611, 611, 611, 889, 667, 611, 611, 611, 611, 333, 333, 333, 333,
+    722, 667, 722, 722, 722, 722, 722, 675, 722, 722, 722, 722, 722, 556, 611, 500,
+    500, 500, 500, 500, 500, 500, 667, 444, 444, 444, 444, 444, 278, 278, 278, 278,
+    500, 500, 500, 500, 500, 500, 500, 675, 500, 500, 500, 500, 500, 444, 500, 444,
+)
+_TIMES_ITALIC_EXTRA = {'€': 500, '‚': 333, 'ƒ': 500, '„': 556, '…': 889, '†': 500, '‡': 500, 'ˆ': 333, '‰': 1000, 'Š': 500, '‹': 333, 'Œ': 944, 'Ž': 556, '‘': 333, '’': 333, '“': 556, '”': 556, '•': 350, '–': 500, '—': 889, '˜': 333, '™': 980, 'š': 389, '›': 333, 'œ': 667, 'ž': 389, 'Ÿ': 556}
+
+# Word widths kept per font before the memo is cleared
+MEMO_SIZE = 1 << 16
+
+
+class _Widths(dict):
+    """Widths by character, unknown characters get the default width"""
+
+    def __init__(self, widths, default):
+        super().__init__(widths)
+        self.default = default
+
+    def __missing__(self, char):
+        return self.default
+
+
+class FontMetrics:
+    """
+    Widths of the text in a standard font, in 1/1000 of the font size.
+    Widths of words are memoized, so measuring the same words again is cheap.
+    """
+
+    def __init__(self, name, table, extra):
+        """Constructor gets the font name, the widths from ' ' to '\\xff' and other widths by character"""
+        self.name = name
+        widths = {chr(code): width for code, width in enumerate(table, 32)}
+        widths.update(extra)
+        self._widths = _Widths(widths, widths['n'])
+        self.space_width = widths[' ']
+        self.max_width = max(widths.values())
+        self._word_widths = {}
+
+    def char_width(self, char):
+        """Width of the character"""
+        return self._widths[char]
+
+    def word_width(self, word):
+        """Width of the word, memoized"""
+        width = self._word_widths.get(word)
+        if width is None:
+            width = sum(map(self._widths.__getitem__, word))
+            if len(self._word_widths) >= MEMO_SIZE:
+                self._word_widths.clear()
+            self._word_widths[word] = width
+        return width
+
+    def text_width(self, text):
+        """Width of the text"""
+        return sum(map(self._widths.__getitem__, text))
+
+    def wrap(self, line, width, size):
+        """
+        Split the line into lines not wider than width points at the font size.
+        Lines are broken at spaces, words wider than a line are broken anywhere.
+        Continuation lines keep the indentation of the line.
+        """
+        limit = width * 1000 / size
+        if len(line) * self.max_width <= limit or self.text_width(line) <= limit:
+            return [line]
+
+        indent = line[:len(line) - len(line.lstrip(' '))]
+        indent_width = self.space_width * len(indent)
+        if indent_width * 2 > limit:
+            indent, indent_width = '', 0
+        space = self.space_width
+        lines = []
+        current = []
+        current_width = 0
+        for word in line[len(indent):].split(' '):
+            word_width = self.word_width(word)
+            if current and current_width + space + word_width > limit:
+                lines.append(' '.join(current))
+                current = []
+            if not current:
+                current = [indent + word]
+                current_width = indent_width + word_width
+            else:
+                current.append(word)
+                current_width += space + word_width
+            while current_width > limit and len(current) == 1:
+                head, tail = self._split_word(current[0], limit)
+                if not tail:
+                    break
+                lines.append(head)
+                current = [indent + tail]
+                current_width = indent_width + self.word_width(tail)
+        if current:
+            lines.append(' '.join(current))
+        return lines
+
+    def _split_word(self, word, limit):
+        """Longest head of the word not wider than the limit, at least one character, and the rest"""
+        width = 0
+        for i, char in enumerate(word):
+            width += self._widths[char]
+            if width > limit:
+                i = max(i, 1)
+                return word[:i], word[i:]
+        return word, ''
+
+
+TIMES_ROMAN = FontMetrics('Times-Roman', _TIMES_ROMAN, _TIMES_ROMAN_EXTRA)
+TIMES_BOLD = FontMetrics('Times-Bold', _TIMES_BOLD, _TIMES_BOLD_EXTRA)
+TIMES_ITALIC = FontMetrics('Times-Italic', _TIMES_ITALIC, _TIMES_ITALIC_EXTRA)
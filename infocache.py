@@ -0,0 +1,222 @@
+"""
+Module keeps extracted module info on disk
+so unchanged sources aren't parsed again
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+import astlister
+from lrucache import LRUCache
+
+CACHE_FORMAT = 3
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+EVICT_RATIO = 0.9
+DEFAULT_MAX_ENTRIES = 4096
+ENTRY_SUFFIX = '.info'
+
+
+def content_hash(data):
+    """Hash of the source file content"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ModuleInfoCache:
+    """
+    On-disk cache of extracted module info.
+    An entry is keyed by the source file path and is valid while
+    the file's mtime and size or its content hash are unchanged and
+    it was made by the same extractor version. Least recently used
+    entries are evicted when the cache grows over max_size bytes.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        """Constructor gets the cache directory and its size limit in bytes"""
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._total_size = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_total_size'] = None
+        return state
+
+    def get_module_info(self, file_path, module_name, extract):
+        """
+        Return extracted info of the file from the cache or
+        build it with extract(module_name, code) and store it
+        """
+        stat = os.stat(file_path)
+        entry_path = self._entry_path(file_path)
+        entry = self._load(entry_path)
+        key = (CACHE_FORMAT, astlister.EXTRACTOR_VERSION, os.path.abspath(file_path), module_name)
+
+        if entry is not None and entry['key'] == key:
+            if entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                self._touch(entry_path)
+                self.hits += 1
+                return entry['info']
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        digest = content_hash(data)
+
+        if entry is not None and entry['key'] == key and entry['hash'] == digest:
+            info = entry['info']
+            self.hits += 1
+        else:
+            info = extract(module_name, data.decode('utf-8'))
+            self.misses += 1
+
+        self._store(entry_path, {'key': key,
+                                 'mtime': stat.st_mtime_ns,
+                                 'size': stat.st_size,
+                                 'hash': digest,
+                                 'info': info})
+        return info
+
+    def _entry_path(self, file_path):
+        name = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + ENTRY_SUFFIX)
+
+    @staticmethod
+    def _load(entry_path):
+        try:
+            with open(entry_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Broken or foreign entries are rebuilt
+            return None
+
+    @staticmethod
+    def _touch(entry_path):
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+    def _store(self, entry_path, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path = '{}.{}.tmp'.format(entry_path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        try:
+            old_size = os.path.getsize(entry_path)
+        except OSError:
+            old_size = 0
+        os.replace(tmp_path, entry_path)
+
+        if self._total_size is None:
+            self._total_size = self._scan_size()
+        else:
+            self._total_size += len(data) - old_size
+        if self._total_size > self.max_size:
+            self._evict()
+
+    def _entries(self):
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(ENTRY_SUFFIX) and entry.is_file():
+                    yield entry
+
+    def _scan_size(self):
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _evict(self):
+        """Remove least recently used entries down to EVICT_RATIO of max_size"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_size * EVICT_RATIO
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._total_size = total
+
+
+class MemoryInfoCache(LRUCache):
+    """
+    In-memory cache of extracted module info for long-running processes,
+    optionally in front of a ModuleInfoCache. An entry is valid while
+    the file's mtime and size are unchanged. Least recently used entries
+    are dropped above max_entries. It can be used from threads,
+    a module is extracted once even if many threads ask for it at once.
+    """
+
+    def __init__(self, fallback=None, max_entries=DEFAULT_MAX_ENTRIES):
+        """Constructor gets an optional ModuleInfoCache used on misses and the maximal number of kept modules"""
+        super().__init__(max_entries)
+        self.fallback = fallback
+        self._key_locks = {}
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['fallback'] = self.fallback
+        return state
+
+    def get_module_info(self, file_path, module_name, extract):
+        """
+        Return extracted info of the file from memory or
+        build it with extract(module_name, code) and keep it
+        """
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), module_name)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            info = self._lookup(key, version)
+            if info is not None:
+                return info
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                with self._lock:
+                    # Another thread may have extracted it meanwhile
+                    info = self._lookup(key, version)
+                if info is not None:
+                    return info
+                if self.fallback is not None:
+                    info = self.fallback.get_module_info(file_path, module_name, extract)
+                else:
+                    with open(file_path, 'rb') as f:
+                        info = extract(module_name, f.read().decode('utf-8'))
+                with self._lock:
+                    self.misses += 1
+                    self._put(key, (version, info))
+            return info
+        finally:
+            with self._lock:
+                # Waiting threads hold the lock already, later ones find the entry
+                if self._key_locks.get(key) is key_lock:
+                    del self._key_locks[key]
+
+    def forget(self, file_path):
+        """Drop the entries of the file"""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+    def _lookup(self, key, version):
+        entry = self._get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        return None
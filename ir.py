@@ -0,0 +1,287 @@
+"""
+Module saves extracted info as an intermediate representation,
+so sources can be extracted in one place and rendered in another.
+Documents are stored as JSON lines or in a compact binary form.
+"""
+
+import json
+import zlib
+import itertools
+from collections import namedtuple
+from astlister import ModuleInfo, ClassInfo, FuncInfo
+
+FORMAT_NAME = 'docstring2pdf-ir'
+# Bump when the stored documents change, readers accept the versions up to their own
+IR_VERSION = 2
+BINARY_MAGIC = b'D2PIR\x00'
+# Compressed bytes of the binary form read at once
+READ_SIZE = 64 * 1024
+
+# Info of a module, a class or a function to render as the PDF-file with the name
+Document = namedtuple('Document', 'name object_path module_name class_name info')
+
+_KINDS = {ModuleInfo: 'module', ClassInfo: 'class', FuncInfo: 'function'}
+_RECORDS = {kind: record for record, kind in _KINDS.items()}
+
+_NONE = 0
+_NEW_STRING = 1
+_STRING = 2
+_LIST = 3
+_RECORD = 4
+_DOCUMENT = 5
+_KIND_CODES = {'module': 0, 'class': 1, 'function': 2}
+_CODE_KINDS = {code: kind for kind, code in _KIND_CODES.items()}
+
+
+class IRError(ValueError):
+    """Data isn't a supported intermediate representation"""
+
+
+def write(stream, documents, binary=False):
+    """Write the documents to the binary stream, return their number"""
+    if binary:
+        return _write_binary(stream, documents)
+    return _write_json_lines(stream, documents)
+
+
+def read(stream):
+    """Iterate over the documents of the binary stream in either form, the stream is read lazily"""
+    head = stream.read(len(BINARY_MAGIC))
+    if head == BINARY_MAGIC:
+        return _read_binary(stream)
+    return _read_json_lines(itertools.chain([head + stream.readline()], stream))
+
+
+def encode_info(info):
+    """Info record as JSON-compatible data"""
+    if isinstance(info, (list, tuple)) and type(info) not in _KINDS:
+        return [encode_info(item) for item in info]
+    if type(info) not in _KINDS:
+        return info
+    data = {'type': _KINDS[type(info)]}
+    for field, value in zip(info._fields, info):
+        data[field] = encode_info(value)
+    return data
+
+
+def decode_info(data):
+    """Info record of the data made by encode_info"""
+    if isinstance(data, list):
+        return [decode_info(item) for item in data]
+    if not isinstance(data, dict):
+        return data
+    fields = dict(data)
+    record = _RECORDS.get(fields.pop('type', None))
+    if record is None:
+        raise IRError('Unknown record type {!r}'.format(data.get('type')))
+    try:
+        return record(**{field: decode_info(value) for field, value in fields.items()})
+    except TypeError as e:
+        raise IRError('Broken {} record: {}'.format(data['type'], e))
+
+
+def _write_json_lines(stream, documents):
+    stream.write(_json_line({'format': FORMAT_NAME, 'version': IR_VERSION}))
+    count = 0
+    for document in documents:
+        data = document._asdict()
+        data['info'] = encode_info(document.info)
+        stream.write(_json_line(data))
+        count += 1
+    return count
+
+
+def _json_line(data):
+    line = json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n'
+    try:
+        return line.encode('utf-8')
+    except UnicodeEncodeError:
+        # Lone surrogates of string escapes are kept as JSON escapes
+        return (json.dumps(data, separators=(',', ':')) + '\n').encode('ascii')
+
+
+def _read_json_lines(lines):
+    lines = iter(lines)
+    try:
+        header = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise IRError('No IR header')
+    _check_version(header.get('format') == FORMAT_NAME, header.get('version'))
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            info = decode_info(data.pop('info'))
+            yield Document(info=info, **data)
+        except (ValueError, KeyError, TypeError) as e:
+            raise IRError('Broken document: {}'.format(e))
+
+
+def _check_version(known_format, version):
+    if not known_format:
+        raise IRError('Not a {} file'.format(FORMAT_NAME))
+    if not isinstance(version, int) or not 1 <= version <= IR_VERSION:
+        raise IRError('Unsupported IR version {}, supported up to {}'.format(version, IR_VERSION))
+
+
+class _BinaryEncoder:
+    """
+    Tagged values with varint lengths. Every string is written once,
+    later occurrences refer to it by its index.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self._strings = {}
+
+    def value(self, value):
+        if value is None:
+            self.chunks.append(bytes((_NONE,)))
+        elif isinstance(value, str):
+            index = self._strings.get(value)
+            if index is None:
+                self._strings[value] = len(self._strings)
+                data = value.encode('utf-8', 'surrogatepass')
+                self.chunks.append(bytes((_NEW_STRING,)) + _varint(len(data)) + data)
+            else:
+                self.chunks.append(bytes((_STRING,)) + _varint(index))
+        elif type(value) in _KINDS:
+            self.chunks.append(bytes((_RECORD, _KIND_CODES[_KINDS[type(value)]])) + _varint(len(value._fields)))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, (list, tuple)):
+            self.chunks.append(bytes((_LIST,)) + _varint(len(value)))
+            for item in value:
+                self.value(item)
+        else:
+            raise TypeError('Unsupported IR value {!r}'.format(value))
+
+    def document(self, document):
+        self.chunks.append(bytes((_DOCUMENT,)) + _varint(len(document)))
+        for item in document:
+            self.value(item)
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _write_binary(stream, documents):
+    stream.write(BINARY_MAGIC + _varint(IR_VERSION))
+    compressor = zlib.compressobj(9)
+    encoder = _BinaryEncoder()
+    count = 0
+    for document in documents:
+        encoder.document(document)
+        stream.write(compressor.compress(encoder.take()))
+        count += 1
+    stream.write(compressor.flush())
+    return count
+
+
+def _varint(number):
+    data = bytearray()
+    while number > 0x7f:
+        data.append(number & 0x7f | 0x80)
+        number >>= 7
+    data.append(number)
+    return bytes(data)
+
+
+class _BinaryDecoder:
+    """Reader of the values written by _BinaryEncoder"""
+
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+        self._strings = []
+
+    def varint(self):
+        number = shift = 0
+        while True:
+            byte = self.data[self.position]
+            self.position += 1
+            number |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return number
+            shift += 7
+
+    def value(self):
+        tag = self.data[self.position]
+        self.position += 1
+        if tag == _NONE:
+            return None
+        if tag == _NEW_STRING:
+            length = self.varint()
+            if self.position + length > len(self.data):
+                raise IndexError('string out of data')
+            value = self.data[self.position:self.position + length].decode('utf-8', 'surrogatepass')
+            self.position += length
+            self._strings.append(value)
+            return value
+        if tag == _STRING:
+            return self._strings[self.varint()]
+        if tag == _LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == _RECORD:
+            kind = _CODE_KINDS[self.data[self.position]]
+            self.position += 1
+            # Records of older versions may have fewer fields
+            return _RECORDS[kind](*[self.value() for _ in range(self.varint())])
+        raise IRError('Unknown tag {} at {}'.format(tag, self.position - 1))
+
+    def document(self):
+        if self.data[self.position] != _DOCUMENT:
+            raise IRError('No document at {}'.format(self.position))
+        self.position += 1
+        return Document(*[self.value() for _ in range(self.varint())])
+
+
+def _read_binary(stream):
+    """Documents decoded as the compressed data is read, READ_SIZE bytes at a time"""
+    version = _read_varint(stream)
+    _check_version(True, version)
+    decompressor = zlib.decompressobj()
+    decoder = _BinaryDecoder(b'')
+    finished = False
+    while True:
+        if decoder.position < len(decoder.data):
+            position, strings = decoder.position, len(decoder._strings)
+            try:
+                yield decoder.document()
+                continue
+            except IndexError as e:
+                if finished:
+                    raise IRError('Broken binary IR: {}'.format(e))
+                # The document goes on in the data not read yet
+                decoder.position = position
+                del decoder._strings[strings:]
+            except (KeyError, TypeError, UnicodeDecodeError) as e:
+                raise IRError('Broken binary IR: {}'.format(e))
+        elif finished:
+            return
+        chunk = stream.read(READ_SIZE)
+        try:
+            data = decompressor.decompress(chunk) if chunk else decompressor.flush()
+        except zlib.error as e:
+            raise IRError('Broken binary IR: {}'.format(e))
+        if not chunk:
+            if not decompressor.eof:
+                raise IRError('Broken binary IR: truncated data')
+            finished = True
+        decoder.data = decoder.data[decoder.position:] + data
+        decoder.position = 0
+
+
+def _read_varint(stream):
+    number = shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            raise IRError('Broken binary IR: no version')
+        number |= (byte[0] & 0x7f) << shift
+        if byte[0] < 0x80:
+            return number
+        shift += 7
@@ -0,0 +1,65 @@
+"""
+Module keeps values in memory for long-running processes,
+dropping the least recently used ones above a number of entries
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    In-memory cache of values by key. Least recently used entries
+    are dropped above max_entries. It can be used from threads.
+    Subclasses keep their entries with _get and _put under _lock.
+    """
+
+    def __init__(self, max_entries):
+        """Constructor gets the maximal number of kept entries"""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        # Worker processes start with an empty cache
+        return {'max_entries': self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def get(self, key, make):
+        """Return the value of the key, made by make() and kept if it's missing"""
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+        value = make()
+        with self._lock:
+            self.misses += 1
+            self._put(key, value)
+        return value
+
+    def stats(self):
+        """Counters as a dict"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def _get(self, key):
+        """Value of the key or None, marked as recently used, _lock is held by the caller"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value):
+        """Keep the value dropping the least recently used entries, _lock is held by the caller"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
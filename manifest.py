@@ -0,0 +1,137 @@
+"""
+Module keeps track of generated PDF-files
+to rebuild only the ones with changed sources
+"""
+
+import os
+import json
+import astlister
+import infocache
+
+MANIFEST_NAME = 'manifest.json'
+
+# Bump when generated PDF-files change for the same source
+GENERATOR_VERSION = '5.{}'.format(astlister.EXTRACTOR_VERSION)
+
+
+def fingerprint(file_path, known=None):
+    """
+    Return the file's fingerprint as a dict with mtime, size and hash.
+    The hash of the known fingerprint is reused if mtime and size match.
+    """
+    stat = os.stat(file_path)
+    if known is not None and known.get('mtime') == stat.st_mtime_ns and known.get('size') == stat.st_size:
+        return known
+    with open(file_path, 'rb') as f:
+        digest = infocache.content_hash(f.read())
+    return {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'hash': digest}
+
+
+class Manifest:
+    """
+    Records the source fingerprint, the object path, the generator
+    version and the output options for every PDF-file in the directory.
+    Manifests of sharded runs also record the shard as
+    a dict with its index, from 1, and the count of shards.
+    """
+
+    def __init__(self, directory):
+        """Constructor gets the directory of the PDF-files and loads its manifest"""
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.entries = {}
+        self.generator = None
+        self.shard = None
+        self._fingerprints = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('outputs', {})
+            self.generator = data.get('generator')
+            self.shard = data.get('shard')
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def output_path(self, name):
+        """Path to the PDF-file with the name"""
+        return os.path.join(self.directory, name + '.pdf')
+
+    def is_up_to_date(self, name, object_path, file_path, options=None):
+        """
+        Check if the PDF-file was made from the same source by the same generator
+        with the same output options, a dict of JSON values
+        """
+        entry = self.entries.get(name)
+        try:
+            current = fingerprint(file_path, entry['source_fingerprint'] if entry else None)
+        except OSError:
+            return False
+        self._fingerprints[name] = current
+        if entry is None or not os.path.exists(self.output_path(name)):
+            return False
+        if entry['source'] != os.path.abspath(file_path) or entry['object'] != object_path:
+            return False
+        if entry['generator'] != GENERATOR_VERSION:
+            return False
+        if entry.get('options', {}) != (options or {}):
+            return False
+        if entry['source_fingerprint']['hash'] != current['hash']:
+            return False
+        # Keep the fast mtime check working after a touch
+        entry['source_fingerprint'] = current
+        return True
+
+    def record(self, name, object_path, file_path, options=None):
+        """Save the entry of a PDF-file freshly generated with the output options"""
+        current = self._fingerprints.pop(name, None)
+        if current is None:
+            current = fingerprint(file_path)
+        self.entries[name] = {'source': os.path.abspath(file_path),
+                              'source_fingerprint': current,
+                              'object': object_path,
+                              'generator': GENERATOR_VERSION,
+                              'options': options or {}}
+
+    def forget(self, name):
+        """Drop the entry so the PDF-file is generated next time"""
+        self.entries.pop(name, None)
+        self._fingerprints.pop(name, None)
+
+    def remove_orphans(self):
+        """Delete PDF-files whose sources disappeared, return their names"""
+        removed = []
+        for name, entry in sorted(self.entries.items()):
+            if os.path.exists(entry['source']):
+                continue
+            try:
+                os.remove(self.output_path(name))
+            except FileNotFoundError:
+                pass
+            removed.append(name)
+        for name in removed:
+            del self.entries[name]
+        return removed
+
+    def retain(self, names):
+        """Delete PDF-files of the entries with other names, return their names"""
+        names = set(names)
+        removed = sorted(name for name in self.entries if name not in names)
+        for name in removed:
+            try:
+                os.remove(self.output_path(name))
+            except FileNotFoundError:
+                pass
+            del self.entries[name]
+        return removed
+
+    def save(self):
+        """Write the manifest next to the PDF-files"""
+        os.makedirs(self.directory, exist_ok=True)
+        data = {'generator': GENERATOR_VERSION, 'outputs': self.entries}
+        if self.shard is not None:
+            data['shard'] = self.shard
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.generator = GENERATOR_VERSION
@@ -2,98 +2,149 @@
 Module for representing object's docstrings as pdf-code
 """
 
+import io
 import astlister
 import pdfformater
+import pdfwriter
+from lrucache import LRUCache
 
-CURRENT_SHIFT = pdfformater.HORIZONTAL_SHIFT
+DEFAULT_FRAGMENT_ENTRIES = 64 * 1024
+# Members nested deeper are indented as much, so their text keeps a readable width
+MAX_INDENT_LEVEL = 4
+
+
+class FragmentCache(LRUCache):
+    """
+    In-memory cache of the rendered pdf-code of members, so re-rendering
+    a document after a small edit lays out only the changed members.
+    Least recently used entries are dropped above max_entries.
+    It can be used from threads.
+    """
+
+    def __init__(self, max_entries=DEFAULT_FRAGMENT_ENTRIES):
+        """Constructor gets the maximal number of kept members"""
+        super().__init__(max_entries)
 
 
 class PDF_Doc_Repr:
-    """Representation of object's docstrings as pdf-code"""
+    """
+    Representation of object's docstrings as pdf-code.
+    Layout state lives in the render calls, so one instance
+    can render many documents at the same time from threads.
+    """
 
-    @staticmethod
-    def make_pdf(pdf):
-        """Wrap the base pdf-code in the tags for final use"""
-        return pdfformater.to_page(pdf)
+    def __init__(self, fragments=None):
+        """Constructor gets an optional FragmentCache of rendered members"""
+        self.fragments = fragments
 
     @staticmethod
-    def _members_to_pdf(members, pdf):
-        global CURRENT_SHIFT
+    def make_pdf(pdf, compress_level=None, object_streams=False):
+        """Wrap the base pdf-code in the tags for final use, return bytes"""
+        stream = io.BytesIO()
+        pdfwriter.write_document(stream, pdfformater.paginate(pdf), compress_level, object_streams)
+        return stream.getvalue()
+
+    def _members_to_pdf(self, members, pdf, shift, level=0):
+        indent = min(level, MAX_INDENT_LEVEL)
         for member in members:
             if _is_private_name(member.name):
                 continue
-            if isinstance(member, astlister.ClassInfo):
-                pdf += pdfformater.to_subhead(member.name, CURRENT_SHIFT)
-                CURRENT_SHIFT = 2 * pdfformater.HORIZONTAL_SHIFT
-            if isinstance(member, astlister.FuncInfo):
-                signature = '(' + ', '.join(member.signature) + ')'
-                pdf += pdfformater.to_subhead(member.name + signature, CURRENT_SHIFT)
-                CURRENT_SHIFT = 2 * pdfformater.HORIZONTAL_SHIFT
-            docs = member.docstrings
-            if docs:
-                pdf += pdfformater.to_text(docs, CURRENT_SHIFT)
-                CURRENT_SHIFT += pdfformater.HORIZONTAL_SHIFT
-        return pdf
+            if self.fragments is None:
+                title, fragments, shift = _member_to_pdf(member, shift, indent)
+            else:
+                title, fragments, shift = self.fragments.get(_member_key(member, shift, indent),
+                                                             lambda: _member_to_pdf(member, shift, indent))
+            if title is not None:
+                pdf.mark(level, title)
+            pdf.extend(fragments)
+        return shift
+
+    def _classes_to_pdf(self, classes, pdf, shift, methods=False):
+        """
+        Classes with their nested classes a level deeper, depth-first like the source has them,
+        methods of every class are added if methods is true
+        """
+        stack = [(0, iter(classes))]
+        while stack:
+            level, members = stack[-1]
+            member = next(members, None)
+            if member is None:
+                stack.pop()
+                continue
+            if _is_private_name(member.name):
+                continue
+            shift = self._members_to_pdf((member,), pdf, shift, level)
+            if methods and member.functions:
+                shift = self._members_to_pdf(member.functions, pdf, shift, level + 1)
+            if member.classes:
+                stack.append((level + 1, iter(member.classes)))
+        return shift
 
     def function_to_pdf(self, fnc_info, cls_name, mod_name):
         """PDF-representation of functions' docstrings"""
-        global CURRENT_SHIFT
+        shift = pdfformater.HORIZONTAL_SHIFT
 
         fnc_name = fnc_info.name
         cls_name = cls_name
         mod_name = mod_name
 
-        pdf = ''
+        pdf = pdfformater.Fragments()
+        pdf.append(pdfformater.to_page_description('Docstrings to {} method{}of {} module'
+                                                   .format(fnc_name, ' of {} class '
+                                                           .format(cls_name) if cls_name is not None else ' ',
+                                                           mod_name), pdfformater.PAGE_HEIGHT))
 
         signature = '(' + ', '.join(fnc_info.signature) + ')'
-        pdf += pdfformater.to_head(fnc_name + signature, CURRENT_SHIFT)
-        CURRENT_SHIFT = pdfformater.HORIZONTAL_SHIFT
+        pdf.append(pdfformater.to_head(fnc_name + signature, shift))
+        shift = pdfformater.HORIZONTAL_SHIFT
 
         description = fnc_info.docstrings
         if description:
-            pdf += pdfformater.to_text(description, CURRENT_SHIFT)
-            CURRENT_SHIFT += pdfformater.HORIZONTAL_SHIFT
-
-        pdf = pdfformater.to_page_description('Docstrings to {} method{}of {} module'
-                                              .format(fnc_name, ' of {} class '
-                                                      .format(cls_name) if cls_name is not None else ' ',
-                                                      mod_name), pdfformater.get_page_height(pdf)) + pdf
+            pdf.extend(pdfformater.text_lines(description, shift))
+            shift += pdfformater.HORIZONTAL_SHIFT
 
-        return self.make_pdf(pdf)
+        return pdf
 
     def class_to_pdf(self, class_info, module_name):
         """PDF-representation of class' docstrings"""
-        global CURRENT_SHIFT
+        shift = pdfformater.HORIZONTAL_SHIFT
 
         cls_name = class_info.name
         mod_name = module_name
         description = class_info.docstrings
         functions = class_info.functions
+        classes = class_info.classes
 
         if _is_all_private(functions):
             functions = None
+        if _is_all_private(classes):
+            classes = None
 
-        pdf = ''
-        pdf += pdfformater.to_head('class {}'.format(cls_name), CURRENT_SHIFT)
-        CURRENT_SHIFT = pdfformater.HORIZONTAL_SHIFT
+        pdf = pdfformater.Fragments()
+        pdf.append(pdfformater.to_page_description('Docstrings to {} class of {} module'
+                                                   .format(cls_name, mod_name), pdfformater.PAGE_HEIGHT))
+        pdf.append(pdfformater.to_head('class {}'.format(cls_name), shift))
+        shift = pdfformater.HORIZONTAL_SHIFT
 
         if description:
-            pdf += pdfformater.to_text(description, CURRENT_SHIFT)
-            CURRENT_SHIFT += pdfformater.HORIZONTAL_SHIFT
+            pdf.extend(pdfformater.text_lines(description, shift))
+            shift += pdfformater.HORIZONTAL_SHIFT
 
         if functions:
-            pdf += pdfformater.to_subhead('METHODS:', CURRENT_SHIFT)
-            CURRENT_SHIFT = 2 * pdfformater.HORIZONTAL_SHIFT
-            pdf = self._members_to_pdf(functions, pdf)
+            pdf.append(pdfformater.to_subhead('METHODS:', shift))
+            shift = 2 * pdfformater.HORIZONTAL_SHIFT
+            shift = self._members_to_pdf(functions, pdf, shift)
 
-        pdf = pdfformater.to_page_description('Docstrings to {} class of {} module'
-                                              .format(cls_name, mod_name), pdfformater.get_page_height(pdf)) + pdf
+        if classes:
+            pdf.append(pdfformater.to_subhead('CLASSES:', shift))
+            shift = 2 * pdfformater.HORIZONTAL_SHIFT
+            shift = self._classes_to_pdf(classes, pdf, shift, methods=True)
 
-        return self.make_pdf(pdf)
+        return pdf
 
     def module_to_pdf(self, module_info):
         """PDF-representation of module's docstrings"""
-        global CURRENT_SHIFT
+        shift = pdfformater.HORIZONTAL_SHIFT
 
         mod_name = module_info.name
         description = module_info.docstrings
@@ -103,32 +154,61 @@ class PDF_Doc_Repr:
         if _is_all_private(functions):
             functions = None
 
-        pdf = ''
-        pdf += pdfformater.to_head('NAME', CURRENT_SHIFT)
-        CURRENT_SHIFT = pdfformater.HORIZONTAL_SHIFT
-        pdf += pdfformater.to_subhead(mod_name, CURRENT_SHIFT)
-        CURRENT_SHIFT = 2 * pdfformater.HORIZONTAL_SHIFT
+        pdf = pdfformater.Fragments()
+        pdf.append(pdfformater.to_page_description('Docstrings to {} module'.format(mod_name),
+                                                   pdfformater.PAGE_HEIGHT))
+        pdf.append(pdfformater.to_head('NAME', shift))
+        shift = pdfformater.HORIZONTAL_SHIFT
+        pdf.append(pdfformater.to_subhead(mod_name, shift))
+        shift = 2 * pdfformater.HORIZONTAL_SHIFT
 
         if description:
-            pdf += pdfformater.to_head('DESCRIPTION', CURRENT_SHIFT)
-            CURRENT_SHIFT = pdfformater.HORIZONTAL_SHIFT
-            pdf += pdfformater.to_text(description, CURRENT_SHIFT)
-            CURRENT_SHIFT += pdfformater.HORIZONTAL_SHIFT
+            pdf.append(pdfformater.to_head('DESCRIPTION', shift))
+            shift = pdfformater.HORIZONTAL_SHIFT
+            pdf.extend(pdfformater.text_lines(description, shift))
+            shift += pdfformater.HORIZONTAL_SHIFT
 
         if classes:
-            pdf += pdfformater.to_head('CLASSES', CURRENT_SHIFT)
-            CURRENT_SHIFT = pdfformater.HORIZONTAL_SHIFT
-            pdf = self._members_to_pdf(classes, pdf)
+            pdf.append(pdfformater.to_head('CLASSES', shift))
+            shift = pdfformater.HORIZONTAL_SHIFT
+            shift = self._classes_to_pdf(classes, pdf, shift)
 
         if functions:
-            pdf += pdfformater.to_head('FUNCTIONS', CURRENT_SHIFT)
-            CURRENT_SHIFT = pdfformater.HORIZONTAL_SHIFT
-            pdf = self._members_to_pdf(functions, pdf)
+            pdf.append(pdfformater.to_head('FUNCTIONS', shift))
+            shift = pdfformater.HORIZONTAL_SHIFT
+            shift = self._members_to_pdf(functions, pdf, shift)
+
+        return pdf
 
-        pdf = pdfformater.to_page_description('Docstrings to {} module'.format(mod_name),
-                                              pdfformater.get_page_height(pdf)) + pdf
 
-        return self.make_pdf(pdf)
+def _member_to_pdf(member, shift, level=0):
+    """
+    Outline title or None, pdf-code fragments of the member
+    indented by the level and the shift after them
+    """
+    title = None
+    fragments = []
+    if isinstance(member, astlister.ClassInfo):
+        title = member.name
+        fragments.append(pdfformater.to_subhead(member.name, shift, level))
+        shift = (2 + level) * pdfformater.HORIZONTAL_SHIFT
+    if isinstance(member, astlister.FuncInfo):
+        signature = '(' + ', '.join(member.signature) + ')'
+        fragments.append(pdfformater.to_subhead(member.name + signature, shift, level))
+        shift = (2 + level) * pdfformater.HORIZONTAL_SHIFT
+    docs = member.docstrings
+    if docs:
+        fragments.extend(pdfformater.text_lines(docs, shift))
+        shift += pdfformater.HORIZONTAL_SHIFT
+    return title, tuple(fragments), shift
+
+
+def _member_key(member, shift, level=0):
+    """
+    Fields of the member that _member_to_pdf renders, the shift before it and its level,
+    so a class' entry doesn't change with its methods and nested classes
+    """
+    return type(member), member.name, getattr(member, 'signature', None), member.docstrings, shift, level
 
 
 def _is_private_name(name):
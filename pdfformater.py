@@ -1,85 +1,22 @@
 """Module represents data in pdf-format"""
 
-import math
-
-
-FILE = '''%PDF-1.2
-%вгПУ
-1 0 obj
-<<
-/Type /Catalog
-/Pages 2 0 R
->>
-endobj
-2 0 obj
-<<
-/Type /Pages
-/Kids [3 0 R]
-/Count 1
->>
-endobj
-3 0 obj
-<<
-/Type /Page
-/Parent 2 0 R
-/Resources
-<<
-/Font
-<<
-/FClassic
-<<
-/Type /Font
-/Subtype /Type1
-/BaseFont /Times-Roman
->>
-/FBold
-<<
-/Type /Font
-/Subtype /Type1
-/BaseFont /Times-Bold
->>
-/FItalic
-<<
-/Type /Font
-/Subtype /Type1
-/BaseFont /Times-Italic
->>
->>
->>
-/MediaBox [0 0 600 {}]
-/Contents 4 0 R
->>
-endobj
-4 0 obj
-<<
-/Length {}
->>
-stream
-  BT
-  {}
-  ET
-endstream
-endobj
-xref
-0 5
-0000000000 65535 f
-0000000015 00000 n
-0000000064 00000 n
-0000000121 00000 n
-{} 00000 n
-trailer
-<<
-/Root 1 0 R
-/Size 5
->>
-startxref
-{}
-%%EOF'''
+import fontmetrics
+import textencoding
+
+# Resource names of the fonts used by the pdf-code and their standard Type1 fonts
+FONTS = (('FClassic', 'Times-Roman'),
+         ('FBold', 'Times-Bold'),
+         ('FItalic', 'Times-Italic'))
+# Resource name of the embedded font for the characters the standard fonts don't have
+UNICODE_FONT = 'FUnicode'
 
 HORIZONTAL_SHIFT = 40
 VERTICAL_SHIFT = 25
 PAGE_WIDTH = 600
-PAGE_HEIGHT = None
+PAGE_HEIGHT = 800
+TOP_MARGIN = 20
+BOTTOM_MARGIN = 20
+RIGHT_MARGIN = 40
 
 FONT_SIZE_BIG = 20
 FONT_SIZE_SMALL = 12
@@ -87,52 +24,183 @@ FONT_SIZE_SMALL = 12
 
 def replace_spec_symbols(string):
     """Screening of pdf-symbols in a string"""
-    return string.replace('(', '\\(').replace(')', '\\)')
+    return textencoding.escape(string)
+
+
+def _show(font, size, position, string):
+    """
+    Pdf-code showing the string in the standard font, or in the Unicode font
+    if the string has characters WinAnsiEncoding doesn't have and there is one
+    """
+    if not textencoding.is_win_ansi(string):
+        string = textencoding.replace_surrogates(string)
+        if textencoding.unicode_font() is not None:
+            return '/{} {} Tf\n{} Td\n{} Tj\n'.format(UNICODE_FONT, size, position, textencoding.hex_string(string))
+    return '/{} {} Tf\n{} Td\n({}) Tj\n'.format(font, size, position, textencoding.escape(string))
+
+
+class Fragments:
+    """
+    Append-only builder of pdf-code.
+    Fragments are kept in a list and joined only once,
+    the number of text lines is counted while appending.
+    """
+
+    def __init__(self):
+        self._fragments = []
+        self.lines = 0
+        self.marks = []
+
+    def append(self, fragment):
+        """Add the pdf-code made by to_head, to_subhead, to_text, etc."""
+        self._fragments.append(fragment)
+        self.lines += fragment.count(' Td\n')
+
+    def extend(self, fragments):
+        """Add every fragment of the iterable"""
+        for fragment in fragments:
+            self.append(fragment)
+
+    def mark(self, level, title):
+        """Mark the next fragment as an outline item of the level"""
+        self.marks.append((len(self._fragments), level, title))
+
+    def __iter__(self):
+        return iter(self._fragments)
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def __str__(self):
+        return ''.join(self._fragments)
+
+
+def paginate(pdf, outline=None):
+    """
+    Split the pdf-code, given as a string or as fragments,
+    into the pdf-code of PAGE_HEIGHT high pages.
+    Every page starts with an absolute text position,
+    so the pages can be drawn independently.
+    If the outline list is given, the marks of the fragments
+    are added to it as (page index, y, level, title).
+    """
+    marks = getattr(pdf, 'marks', ()) if outline is not None else ()
+    if isinstance(pdf, str):
+        pdf = (pdf,)
+    page = []
+    pages = 0
+    x = y = 0
+    page_start = True
+    next_mark = 0
+    waiting = []
+    for index, fragment in enumerate(pdf):
+        while next_mark < len(marks) and marks[next_mark][0] <= index:
+            waiting.append(marks[next_mark][1:])
+            next_mark += 1
+        for line in fragment.split('\n'):
+            if not line.endswith(' Td'):
+                if line:
+                    page.append(line)
+                continue
+            dx, dy = line.split()[:2]
+            x += float(dx)
+            y += float(dy)
+            if y < BOTTOM_MARGIN:
+                # The font line of the operation is already on the page
+                font = page.pop() if page and page[-1].endswith(' Tf') else None
+                if page:
+                    yield '\n'.join(page) + '\n'
+                    pages += 1
+                page = [font] if font else []
+                y = PAGE_HEIGHT - TOP_MARGIN
+                page_start = True
+            if page_start:
+                line = '{} {} Td'.format(_number(x), _number(y))
+                page_start = False
+            if waiting:
+                outline.extend((pages, _number(y), level, title) for level, title in waiting)
+                waiting = []
+            page.append(line)
+    if page:
+        yield '\n'.join(page) + '\n'
+
+
+def _number(value):
+    return int(value) if value == int(value) else value
 
 
-def to_page(text):
-    """Wrap the main code in the required tags for use"""
-    page_height = str(get_page_height(text))
-    text_len = str(len(text) + 9)
-    shift_to_text_obj = str(431 + len(page_height))
-    shift_to_text_obj = '0'*(10 - len(shift_to_text_obj)) + shift_to_text_obj
-    shift_to_xref = str(491 + len(page_height) + len(text_len) + len(text))
-    return FILE.format(page_height, text_len, text, shift_to_text_obj, shift_to_xref)
+def to_head(string, current_shift):
+    """Present in the form of a paragraph heading, wrapped to the page width"""
+    return _show_wrapped('FBold', fontmetrics.TIMES_BOLD, 15, HORIZONTAL_SHIFT - current_shift,
+                         PAGE_WIDTH - RIGHT_MARGIN - HORIZONTAL_SHIFT, string)
 
 
-def get_page_height(text):
-    string_count = math.ceil(len(text.split('\n')) / 3)
-    PAGE_HEIGHT = string_count * VERTICAL_SHIFT + 20
-    return PAGE_HEIGHT
+def to_subhead(string, current_shift, level=0):
+    """
+    Present in the form of a subheading of a paragraph wrapped to the page width,
+    nested levels are indented further
+    """
+    indent = (2 + level)*HORIZONTAL_SHIFT
+    return _show_wrapped('FBold', fontmetrics.TIMES_BOLD, 12, indent - current_shift,
+                         PAGE_WIDTH - RIGHT_MARGIN - indent, string)
 
 
-def to_head(string, current_shift):
-    """Present in the form of a paragraph heading"""
-    string = replace_spec_symbols(string)
-    return '/FBold 15 Tf\n{} -25 Td\n({}) Tj\n'.format(HORIZONTAL_SHIFT - current_shift, string)
+def to_page_description(string, page_height):
+    """Provide the first line describing the page, long descriptions go on to the next lines"""
+    lines = _wrap(fontmetrics.TIMES_ITALIC, 12, PAGE_WIDTH - RIGHT_MARGIN - 40, string)
+    code = [_show('FItalic', 12, '40 {}'.format(page_height - TOP_MARGIN), lines[0])]
+    code.extend(_show('FItalic', 12, '0 -25', line) for line in lines[1:])
+    return ''.join(code)
 
 
-def to_subhead(string, current_shift):
-    """Present in the form of a subheading of a paragraph"""
-    string = replace_spec_symbols(string)
-    return '/FBold 12 Tf\n{} -25 Td\n({}) Tj\n'.format(2*HORIZONTAL_SHIFT - current_shift, string)
+def _wrap(metrics, size, width, string):
+    """Lines of the string not wider than width, measured in the Unicode font if it's used"""
+    if not textencoding.is_win_ansi(string):
+        unicode_font = textencoding.unicode_font()
+        if unicode_font is not None:
+            metrics = unicode_font.metrics
+    return metrics.wrap(string, width, size)
 
 
-def to_page_description(string, page_height):
-    """Provide the first line describing the page"""
-    string = replace_spec_symbols(string)
-    return '/FItalic 12 Tf\n40 {} Td\n({}) Tj\n'.format(page_height - 20, string)
+def _show_wrapped(font, metrics, size, dx, width, string):
+    """Pdf-code showing the string like _show does on as many lines as it needs, the first moved by dx"""
+    code = []
+    for line in _wrap(metrics, size, width, string):
+        code.append(_show(font, size, '{} -25'.format(dx), line))
+        dx = 0
+    return ''.join(code)
 
 
 def to_text(text, current_shift):
     """Wrap text in the required for presentation tags"""
-    text = replace_spec_symbols(text)
-    splited_text = text.split('\n')
-    strings_count = len(splited_text)
-    if strings_count == 1:
-        return '/FClassic 12 Tf\n{} -25 Td\n({}) Tj\n'.format(HORIZONTAL_SHIFT, text)
-    else:
-        result = '/FClassic 12 Tf\n{} -25 Td\n({}) Tj\n'.format(HORIZONTAL_SHIFT, splited_text[0])
-        for i in range(1, strings_count):
-            result += '/FClassic 12 Tf\n0 -25 Td\n({}) Tj\n'.format(splited_text[i])
-        return result
+    return ''.join(text_lines(text, current_shift))
+
+
+def text_lines(text, current_shift):
+    """
+    Wrap every line of the text in the required for presentation tags,
+    lines wider than the page are wrapped by the widths of Times-Roman.
+    Lines with characters WinAnsiEncoding doesn't have are set in the Unicode font.
+    """
+    width = PAGE_WIDTH - RIGHT_MARGIN - current_shift - HORIZONTAL_SHIFT
+    dx = HORIZONTAL_SHIFT
+    unicode_font = None
+    if not text.isascii():
+        text = textencoding.replace_surrogates(text)
+        unicode_font = textencoding.unicode_font()
+    # The text is escaped at once, only wrapped lines are escaped again
+    escaped_lines = textencoding.escape(text).split('\n')
+    for index, line in enumerate(text.split('\n')):
+        if unicode_font is not None and not textencoding.is_win_ansi(line):
+            for string in unicode_font.metrics.wrap(line, width, FONT_SIZE_SMALL):
+                yield '/{} 12 Tf\n{} -25 Td\n{} Tj\n'.format(UNICODE_FONT, dx, textencoding.hex_string(string))
+                dx = 0
+            continue
+        strings = fontmetrics.TIMES_ROMAN.wrap(line, width, FONT_SIZE_SMALL)
+        if len(strings) == 1:
+            yield '/FClassic 12 Tf\n{} -25 Td\n({}) Tj\n'.format(dx, escaped_lines[index])
+            dx = 0
+            continue
+        for string in strings:
+            yield '/FClassic 12 Tf\n{} -25 Td\n({}) Tj\n'.format(dx, textencoding.escape(string))
+            dx = 0
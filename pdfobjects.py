@@ -0,0 +1,106 @@
+"""
+Module represents pdf-objects as python values
+and serializes them to bytes: names, references,
+strings, arrays, dictionaries and streams
+"""
+
+import textencoding
+from collections import namedtuple
+
+# Reference to an indirect object, written as 'number generation R'
+Ref = namedtuple('Ref', 'number generation', defaults=(0,))
+# Stream object with the data in memory, /Length is added while writing
+Stream = namedtuple('Stream', 'dictionary data')
+
+_NAME_DELIMITERS = frozenset(b'()<>[]{}/%#')
+_STRING_ESCAPES = {ord('\\'): b'\\\\', ord('('): b'\\(', ord(')'): b'\\)',
+                   ord('\r'): b'\\r', ord('\n'): b'\\n'}
+
+
+class Name(str):
+    """PDF name, e.g. Name('Type') is written as /Type"""
+
+    __slots__ = ()
+
+
+def serialize(value):
+    """
+    Bytes of the value: None, bool, int, float, Name, Ref,
+    str as a text string, bytes as a byte string, list or
+    tuple as an array and dict with str keys as a dictionary
+    """
+    chunks = []
+    _serialize(value, chunks)
+    return b''.join(chunks)
+
+
+def _serialize(value, chunks):
+    if isinstance(value, Name):
+        chunks.append(_name(value))
+    elif isinstance(value, Ref):
+        chunks.append('{} {} R'.format(value.number, value.generation).encode('ascii'))
+    elif isinstance(value, str):
+        chunks.append(text_string(value))
+    elif isinstance(value, dict):
+        chunks.append(b'<<\n')
+        for key, item in value.items():
+            chunks.append(_name(key))
+            # Nested dictionaries start on their own line
+            chunks.append(b'\n' if isinstance(item, dict) else b' ')
+            _serialize(item, chunks)
+            chunks.append(b'\n')
+        chunks.append(b'>>')
+    elif isinstance(value, (list, tuple)):
+        chunks.append(b'[')
+        for index, item in enumerate(value):
+            if index:
+                chunks.append(b' ')
+            _serialize(item, chunks)
+        chunks.append(b']')
+    elif value is None:
+        chunks.append(b'null')
+    elif value is True or value is False:
+        chunks.append(b'true' if value else b'false')
+    elif isinstance(value, int):
+        chunks.append(str(value).encode('ascii'))
+    elif isinstance(value, float):
+        chunks.append(number(value).encode('ascii'))
+    elif isinstance(value, (bytes, bytearray)):
+        chunks.append(byte_string(value))
+    else:
+        raise TypeError('Unsupported pdf value {!r}'.format(value))
+
+
+def number(value):
+    """PDF number, reals have no exponent"""
+    if value == int(value):
+        return str(int(value))
+    return '{:.6f}'.format(value).rstrip('0').rstrip('.')
+
+
+def _name(name):
+    data = bytearray(b'/')
+    for byte in name.encode('utf-8'):
+        if 0x21 <= byte <= 0x7e and byte not in _NAME_DELIMITERS:
+            data.append(byte)
+        else:
+            data.extend('#{:02X}'.format(byte).encode('ascii'))
+    return bytes(data)
+
+
+def text_string(text):
+    """PDF text string, in UTF-16 with a byte order mark if it isn't printable ASCII"""
+    if text.isascii() and text.isprintable():
+        return byte_string(text.encode('ascii'))
+    data = textencoding.replace_surrogates(text).encode('utf-16-be')
+    return b'<FEFF' + data.hex().upper().encode('ascii') + b'>'
+
+
+def byte_string(data):
+    """PDF literal string of the bytes"""
+    return b'(' + b''.join(_STRING_ESCAPES.get(byte, bytes((byte,))) for byte in data) + b')'
+
+
+def indirect_object(number, value, generation=0):
+    """Bytes of the indirect object with the value, not a stream"""
+    return b'%d %d obj\n%s\nendobj\n' % (number, generation, serialize(value))
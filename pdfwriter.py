@@ -0,0 +1,454 @@
+"""
+Module writes pdf-objects to a binary file
+as they are produced
+"""
+
+import zlib
+import pdfformater
+import textencoding
+from pdfobjects import Name, Ref, Stream, serialize, indirect_object
+
+VERSION = '1.2'
+# Object streams and cross-reference streams need PDF 1.5
+OBJECT_STREAMS_VERSION = '1.5'
+BINARY_MARK = b'%\xe2\xe3\xcf\xd3\n'
+CHUNK_SIZE = 64 * 1024
+PAGE_TREE_KIDS = 16
+DEFAULT_COMPRESS_LEVEL = 6
+# Smaller streams aren't worth compressing by default
+COMPRESS_MIN_SIZE = 1024
+# Number of objects packed into one object stream
+OBJECT_STREAM_SIZE = 100
+# Mappings per beginbfchar block of a ToUnicode CMap
+CMAP_BLOCK_SIZE = 100
+
+
+class PDFWriter:
+    """
+    Writer of pdf-objects to a binary file-like object.
+    Byte offsets of the objects are counted while writing,
+    so the file object doesn't have to be seekable.
+    With object_streams objects other than streams are packed
+    into compressed object streams, and the cross-reference table
+    is written as a compressed stream too.
+    """
+
+    def __init__(self, stream, object_streams=False, compress_level=DEFAULT_COMPRESS_LEVEL):
+        """
+        Constructor gets a binary file-like object and writes the header,
+        compress_level is used for object and cross-reference streams
+        """
+        self._stream = stream
+        self._position = 0
+        self._offsets = {}
+        self._next_number = 1
+        self._stream_length = None
+        self._compressor = None
+        self.object_streams = object_streams
+        self.compress_level = compress_level
+        # Objects waiting for their object stream as (number, bytes)
+        self._packed = []
+        # Object stream and index in it by object number
+        self._locations = {}
+        version = OBJECT_STREAMS_VERSION if object_streams else VERSION
+        self._write(b'%PDF-' + version.encode('ascii') + b'\n' + BINARY_MARK)
+
+    @property
+    def position(self):
+        """Number of bytes written so far"""
+        return self._position
+
+    def _write(self, data):
+        self._stream.write(data)
+        self._position += len(data)
+
+    def reserve(self):
+        """Allocate the number of an object that will be written later"""
+        number = self._next_number
+        self._next_number += 1
+        return number
+
+    def write_object(self, number, value):
+        """Write the indirect object with the pdfobjects value or pdfobjects.Stream"""
+        if isinstance(value, Stream):
+            self._write_stream_object(number, value.dictionary, value.data)
+        elif self.object_streams:
+            self._packed.append((number, serialize(value)))
+            if len(self._packed) >= OBJECT_STREAM_SIZE:
+                self._write_object_stream()
+        else:
+            self._offsets[number] = self._position
+            self._write(indirect_object(number, value))
+
+    def _write_stream_object(self, number, dictionary, data, compress_level=0):
+        """Write the stream object with the data in memory and a direct length"""
+        dictionary = dict(dictionary)
+        if compress_level:
+            data = zlib.compress(data, compress_level)
+            dictionary['Filter'] = Name('FlateDecode')
+        dictionary['Length'] = len(data)
+        self._offsets[number] = self._position
+        self._write(b'%d 0 obj\n%s\nstream\n' % (number, serialize(dictionary)))
+        self._write(data)
+        self._write(b'\nendstream\nendobj\n')
+
+    def _write_object_stream(self):
+        """Pack the waiting objects into an object stream"""
+        number = self.reserve()
+        offsets = []
+        bodies = []
+        offset = 0
+        for index, (packed_number, body) in enumerate(self._packed):
+            offsets.append(b'%d %d' % (packed_number, offset))
+            bodies.append(body)
+            offset += len(body) + 1
+            self._locations[packed_number] = (number, index)
+        header = b' '.join(offsets) + b'\n'
+        data = header + b'\n'.join(bodies) + b'\n'
+        dictionary = {'Type': Name('ObjStm'), 'N': len(self._packed), 'First': len(header)}
+        self._packed = []
+        self._write_stream_object(number, dictionary, data, self.compress_level)
+
+    def begin_stream(self, number, dictionary=None, compress_level=0):
+        """
+        Start the stream object, its length is written
+        as a separate indirect object by end_stream.
+        The stream is FlateDecode compressed if compress_level isn't 0.
+        """
+        length_number = self.reserve()
+        header = {'Length': Ref(length_number)}
+        if compress_level:
+            self._compressor = zlib.compressobj(compress_level)
+            header['Filter'] = Name('FlateDecode')
+        header.update(dictionary or {})
+        self._offsets[number] = self._position
+        self._write(b'%d 0 obj\n%s\nstream\n' % (number, serialize(header)))
+        self._stream_length = (length_number, self._position)
+
+    def write_stream(self, data):
+        """Write a part of the stream, strings are encoded by textencoding.encode"""
+        if isinstance(data, str):
+            for i in range(0, len(data), CHUNK_SIZE):
+                self._write_stream_data(textencoding.encode(data[i:i + CHUNK_SIZE]))
+        else:
+            self._write_stream_data(data)
+
+    def _write_stream_data(self, data):
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        if data:
+            self._write(data)
+
+    def end_stream(self):
+        """Finish the stream object and write its length"""
+        if self._compressor is not None:
+            self._write(self._compressor.flush())
+            self._compressor = None
+        length_number, start = self._stream_length
+        length = self._position - start
+        self._write(b'\nendstream\nendobj\n')
+        self.write_object(length_number, length)
+        self._stream_length = None
+
+    def close(self, root):
+        """Write the cross-reference table or stream and the trailer"""
+        if self.object_streams:
+            if self._packed:
+                self._write_object_stream()
+            xref_position = self._write_xref_stream(root)
+        else:
+            xref_position = self._write_xref_table(root)
+        self._write(b'startxref\n%d\n%%%%EOF\n' % xref_position)
+
+    def _write_xref_table(self, root):
+        size = self._next_number
+        xref_position = self._position
+        lines = ['xref', '0 {}'.format(size), '0000000000 65535 f ']
+        for number in range(1, size):
+            lines.append('{:010d} 00000 n '.format(self._offsets.get(number, 0)))
+        self._write(('\n'.join(lines) + '\n').encode('latin-1'))
+        self._write(b'trailer\n' + serialize({'Root': Ref(root), 'Size': size}) + b'\n')
+        return xref_position
+
+    def _write_xref_stream(self, root):
+        """
+        Write the cross-reference stream: entries of type 1 give the offset of an object,
+        entries of type 2 give the object stream of an object and its index in it
+        """
+        number = self.reserve()
+        xref_position = self._position
+        self._offsets[number] = xref_position
+        size = self._next_number
+        entries = [(0, 0, 0xffff)]
+        for entry_number in range(1, size):
+            if entry_number in self._offsets:
+                entries.append((1, self._offsets[entry_number], 0))
+            elif entry_number in self._locations:
+                entries.append((2,) + self._locations[entry_number])
+            else:
+                entries.append((0, 0, 0))
+        widths = [1, _byte_width(max(entry[1] for entry in entries)), _byte_width(max(entry[2] for entry in entries))]
+        data = b''.join(b''.join(field.to_bytes(width, 'big') for field, width in zip(entry, widths))
+                        for entry in entries)
+        dictionary = {'Type': Name('XRef'), 'Size': size, 'W': widths, 'Root': Ref(root)}
+        self._write_stream_object(number, dictionary, data, self.compress_level)
+        return xref_position
+
+
+def _byte_width(value):
+    return max(1, (value.bit_length() + 7) // 8)
+
+
+def resources(unicode_font=None):
+    """Resource dictionary of the fonts of pdfformater, unicode_font is the Ref of the embedded font"""
+    fonts = {name: {'Type': Name('Font'), 'Subtype': Name('Type1'), 'BaseFont': Name(base_font),
+                    'Encoding': Name('WinAnsiEncoding')}
+             for name, base_font in pdfformater.FONTS}
+    if unicode_font is not None:
+        fonts[pdfformater.UNICODE_FONT] = unicode_font
+    return {'Font': fonts}
+
+
+def _start(stream, compress_level, object_streams):
+    """Writer of the document with the catalog and the resources numbers reserved"""
+    writer = PDFWriter(stream, object_streams, _compress_level(compress_level))
+    catalog = writer.reserve()
+    resources_number = writer.reserve()
+    return writer, catalog, resources_number
+
+
+def write_document(stream, pages, compress_level=None, object_streams=False):
+    """
+    Write the document with the pages' pdf-code to the binary stream.
+    Page contents are compressed with compress_level, by default only
+    the ones of at least COMPRESS_MIN_SIZE characters are compressed.
+    With object_streams a PDF 1.5 file with object streams is written.
+    Return the number of bytes written.
+    """
+    writer, catalog, resources_number = _start(stream, compress_level, object_streams)
+    codes = set()
+    page_numbers = _write_contents(writer, pages, compress_level, codes)
+    _write_pages(writer, catalog, resources_number, page_numbers, codes)
+    return writer.position
+
+
+def write_book(stream, chapters, compress_level=None, object_streams=False):
+    """
+    Write one document of the chapters given as (title, pdf-code) pairs.
+    Every chapter starts on a new page, all pages share the font resources,
+    the embedded font has the glyphs of all of them.
+    The outline has an item per chapter with the marks of its fragments under it.
+    Return the number of bytes written.
+    """
+    writer, catalog, resources_number = _start(stream, compress_level, object_streams)
+    page_numbers = []
+    outline = []
+    codes = set()
+    for title, pdf in chapters:
+        marks = []
+        first = len(page_numbers)
+        page_numbers.extend(_write_contents(writer, pdfformater.paginate(pdf, marks), compress_level, codes))
+        if len(page_numbers) == first:
+            continue
+        outline.append((page_numbers[first][0], pdfformater.PAGE_HEIGHT, 0, title))
+        outline.extend((page_numbers[first + page][0], y, level + 1, mark_title)
+                       for page, y, level, mark_title in marks)
+
+    outlines = _write_outline(writer, outline) if outline else None
+    _write_pages(writer, catalog, resources_number, page_numbers, codes, outlines)
+    return writer.position
+
+
+def _write_contents(writer, pages, compress_level, codes):
+    """
+    Write a content stream per page, return the numbers of the pages and their contents.
+    Character codes shown in the Unicode font are added to the codes set.
+    """
+    page_numbers = []
+    for text in pages:
+        if pdfformater.UNICODE_FONT in text:
+            codes.update(textencoding.used_codes(text))
+        contents = writer.reserve()
+        writer.begin_stream(contents, compress_level=_stream_compress_level(text, compress_level))
+        writer.write_stream(b'BT\n')
+        writer.write_stream(text)
+        writer.write_stream(b'ET')
+        writer.end_stream()
+        page_numbers.append((writer.reserve(), contents))
+    return page_numbers
+
+
+def _write_pages(writer, catalog, resources_number, page_numbers, codes, outlines=None):
+    """Write the resources, the page objects, the page tree, the catalog and close the document"""
+    unicode_font = _write_unicode_font(writer, codes) if codes else None
+    writer.write_object(resources_number, resources(unicode_font))
+    if not page_numbers:
+        contents = writer.reserve()
+        writer.write_object(contents, Stream({}, b''))
+        page_numbers.append((writer.reserve(), contents))
+
+    root, parents = _write_page_tree(writer, [page for page, _ in page_numbers])
+    media_box = [0, 0, pdfformater.PAGE_WIDTH, pdfformater.PAGE_HEIGHT]
+    for page, contents in page_numbers:
+        writer.write_object(page, {'Type': Name('Page'), 'Parent': Ref(parents[page]),
+                                   'Resources': Ref(resources_number), 'MediaBox': media_box,
+                                   'Contents': Ref(contents)})
+    catalog_dictionary = {'Type': Name('Catalog'), 'Pages': Ref(root)}
+    if outlines is not None:
+        catalog_dictionary.update({'Outlines': Ref(outlines), 'PageMode': Name('UseOutlines')})
+    writer.write_object(catalog, catalog_dictionary)
+    writer.close(catalog)
+
+
+def _write_unicode_font(writer, codes):
+    """
+    Write the Type0 font showing the character codes in the glyphs of textencoding.unicode_font(),
+    with a subset of the TrueType font embedded. Return the Ref of the font, None if there is no font.
+    """
+    unicode_font = textencoding.unicode_font()
+    if unicode_font is None:
+        return None
+    font = unicode_font.font
+    codes = sorted(codes)
+    glyph_ids = [font.glyph_ids.get(chr(code), 0) for code in codes]
+    # Subsets are named by a tag of six capital letters
+    tag = zlib.crc32(repr(glyph_ids).encode('ascii'))
+    base_font = Name(''.join(chr(ord('A') + tag // 26 ** i % 26) for i in range(6)) + '+' + font.name)
+
+    type0, cid_font, descriptor, font_file, cid_to_gid, to_unicode = (writer.reserve() for _ in range(6))
+    data = font.subset(glyph_ids)
+    writer.write_object(font_file, _stream({'Length1': len(data)}, data, writer.compress_level))
+    writer.write_object(descriptor, {
+        'Type': Name('FontDescriptor'), 'FontName': base_font,
+        # Nonsymbolic, italic
+        'Flags': 32 | (64 if font.italic_angle else 0),
+        'FontBBox': font.bbox, 'ItalicAngle': font.italic_angle, 'Ascent': font.ascent, 'Descent': font.descent,
+        'CapHeight': font.cap_height, 'StemV': 80, 'FontFile2': Ref(font_file)})
+
+    cid_to_gid_map = bytearray(2 * (codes[-1] + 1))
+    widths = []
+    for code, gid in zip(codes, glyph_ids):
+        cid_to_gid_map[2 * code:2 * code + 2] = gid.to_bytes(2, 'big')
+        if widths and widths[-2] + len(widths[-1]) == code:
+            widths[-1].append(font.widths[gid])
+        else:
+            widths.extend((code, [font.widths[gid]]))
+    writer.write_object(cid_to_gid, _stream({}, bytes(cid_to_gid_map), writer.compress_level))
+    writer.write_object(cid_font, {
+        'Type': Name('Font'), 'Subtype': Name('CIDFontType2'), 'BaseFont': base_font,
+        'CIDSystemInfo': {'Registry': 'Adobe', 'Ordering': 'Identity', 'Supplement': 0},
+        'FontDescriptor': Ref(descriptor), 'DW': font.widths[0], 'W': widths, 'CIDToGIDMap': Ref(cid_to_gid)})
+    writer.write_object(to_unicode, _stream({}, _to_unicode_cmap(codes), writer.compress_level))
+    writer.write_object(type0, {
+        'Type': Name('Font'), 'Subtype': Name('Type0'), 'BaseFont': base_font, 'Encoding': Name('Identity-H'),
+        'DescendantFonts': [Ref(cid_font)], 'ToUnicode': Ref(to_unicode)})
+    return Ref(type0)
+
+
+def _to_unicode_cmap(codes):
+    """CMap of the UTF-16 character codes to Unicode, for copying and searching the text"""
+    # Halves of surrogate pairs aren't characters
+    codes = [code for code in codes if not 0xd800 <= code <= 0xdfff]
+    lines = ['/CIDInit /ProcSet findresource begin', '12 dict begin', 'begincmap',
+             '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def',
+             '/CMapName /Adobe-Identity-UCS def', '/CMapType 2 def',
+             '1 begincodespacerange', '<0000> <FFFF>', 'endcodespacerange']
+    for i in range(0, len(codes), CMAP_BLOCK_SIZE):
+        block = codes[i:i + CMAP_BLOCK_SIZE]
+        lines.append('{} beginbfchar'.format(len(block)))
+        lines.extend('<{0:04X}> <{0:04X}>'.format(code) for code in block)
+        lines.append('endbfchar')
+    lines.extend(['endcmap', 'CMapName currentdict /CMap defineresource pop', 'end', 'end'])
+    return ('\n'.join(lines) + '\n').encode('ascii')
+
+
+def _stream(dictionary, data, compress_level):
+    """pdfobjects.Stream of the data, FlateDecode compressed if compress_level isn't 0"""
+    if compress_level:
+        dictionary = dict(dictionary, Filter=Name('FlateDecode'))
+        data = zlib.compress(data, compress_level)
+    return Stream(dictionary, data)
+
+
+def _compress_level(compress_level):
+    return DEFAULT_COMPRESS_LEVEL if compress_level is None else compress_level
+
+
+def _stream_compress_level(text, compress_level):
+    if compress_level is not None:
+        return compress_level
+    return DEFAULT_COMPRESS_LEVEL if len(text) >= COMPRESS_MIN_SIZE else 0
+
+
+def _write_page_tree(writer, pages):
+    """
+    Write a balanced tree of /Pages nodes with at most PAGE_TREE_KIDS kids
+    each over the pages. Return the root node and the parents of the objects.
+    """
+    parents = {}
+    nodes = []
+    level = [(page, 1) for page in pages]
+    while True:
+        next_level = []
+        for i in range(0, len(level), PAGE_TREE_KIDS):
+            kids = level[i:i + PAGE_TREE_KIDS]
+            number = writer.reserve()
+            count = sum(kid_count for _, kid_count in kids)
+            for kid, _ in kids:
+                parents[kid] = number
+            nodes.append((number, [kid for kid, _ in kids], count))
+            next_level.append((number, count))
+        if len(next_level) == 1:
+            break
+        level = next_level
+
+    root = next_level[0][0]
+    for number, kids, count in nodes:
+        node = {'Type': Name('Pages')}
+        if number != root:
+            node['Parent'] = Ref(parents[number])
+        node['Kids'] = [Ref(kid) for kid in kids]
+        node['Count'] = count
+        writer.write_object(number, node)
+    return root, parents
+
+
+def _write_outline(writer, marks):
+    """
+    Write the outline tree of the (page object, y, level, title) marks,
+    an item is nested in the last item of a lower level before it.
+    Items with kids are closed. Return the number of the outline dictionary.
+    """
+    root = {'number': writer.reserve(), 'level': -1, 'kids': []}
+    stack = [root]
+    items = []
+    for page, y, level, title in marks:
+        while stack[-1]['level'] >= level:
+            stack.pop()
+        item = {'number': writer.reserve(), 'level': level, 'kids': [], 'parent': stack[-1],
+                'index': len(stack[-1]['kids']), 'page': page, 'y': y, 'title': title}
+        stack[-1]['kids'].append(item)
+        stack.append(item)
+        items.append(item)
+
+    for item in reversed(items):
+        item['count'] = sum(1 + kid['count'] for kid in item['kids'])
+    for item in items:
+        siblings = item['parent']['kids']
+        outline_item = {'Title': item['title'], 'Parent': Ref(item['parent']['number'])}
+        index = item['index']
+        if index > 0:
+            outline_item['Prev'] = Ref(siblings[index - 1]['number'])
+        if index < len(siblings) - 1:
+            outline_item['Next'] = Ref(siblings[index + 1]['number'])
+        if item['kids']:
+            outline_item.update({'First': Ref(item['kids'][0]['number']), 'Last': Ref(item['kids'][-1]['number']),
+                                 'Count': -item['count']})
+        top = min(item['y'] + pdfformater.VERTICAL_SHIFT, pdfformater.PAGE_HEIGHT)
+        outline_item['Dest'] = [Ref(item['page']), Name('XYZ'), 0, top, None]
+        writer.write_object(item['number'], outline_item)
+
+    kids = root['kids']
+    writer.write_object(root['number'], {'Type': Name('Outlines'), 'First': Ref(kids[0]['number']),
+                                         'Last': Ref(kids[-1]['number']), 'Count': len(kids)})
+    return root['number']
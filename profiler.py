@@ -0,0 +1,125 @@
+"""
+Module records time of the stages of making PDF-files
+and counters per module, and saves them as trace events
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import nullcontext
+
+
+class _Stage:
+    """Context manager timing one stage"""
+
+    __slots__ = ('_profiler', '_name', '_module', '_wall', '_cpu')
+
+    def __init__(self, profiler, name, module):
+        self._profiler = profiler
+        self._name = name
+        self._module = module
+
+    def __enter__(self):
+        self._wall = time.perf_counter_ns()
+        self._cpu = time.thread_time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        wall = time.perf_counter_ns() - self._wall
+        cpu = time.thread_time_ns() - self._cpu
+        self._profiler.record({'type': 'stage', 'name': self._name, 'module': self._module,
+                               'start': self._wall // 1000, 'wall': wall // 1000, 'cpu': cpu // 1000,
+                               'pid': os.getpid(), 'tid': threading.get_ident()})
+        return False
+
+
+class Profiler:
+    """
+    Recorder of per-stage wall and CPU time, in microseconds,
+    and of counters per module. Hooks added with add_hook
+    are called with every event as it is recorded.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+        self._hooks = []
+
+    def add_hook(self, hook):
+        """Call hook(event) for every recorded event"""
+        self._hooks.append(hook)
+
+    def stage(self, name, module):
+        """Context manager timing the stage of the module"""
+        return _Stage(self, name, module)
+
+    def count(self, name, module, value):
+        """Record a counter of the module, e.g. nodes visited or bytes written"""
+        self.record({'type': 'count', 'name': name, 'module': module, 'value': value,
+                     'start': time.perf_counter_ns() // 1000, 'pid': os.getpid(), 'tid': threading.get_ident()})
+
+    def record(self, event):
+        """Add the event, e.g. one recorded by a profiler in another process"""
+        self.events.append(event)
+        for hook in self._hooks:
+            hook(event)
+
+    def summary(self):
+        """Totals of stage times and counters per module"""
+        modules = {}
+        for event in self.events:
+            module = modules.setdefault(event['module'], {'stages': {}, 'counters': {}})
+            if event['type'] == 'stage':
+                stage = module['stages'].setdefault(event['name'], {'wall': 0, 'cpu': 0})
+                stage['wall'] += event['wall']
+                stage['cpu'] += event['cpu']
+            else:
+                module['counters'][event['name']] = module['counters'].get(event['name'], 0) + event['value']
+        return modules
+
+    def trace_events(self):
+        """Events in the Trace Event Format of trace viewers"""
+        trace = []
+        for event in self.events:
+            if event['type'] == 'stage':
+                trace.append({'name': event['name'], 'cat': 'stage', 'ph': 'X',
+                              'ts': event['start'], 'dur': event['wall'],
+                              'pid': event['pid'], 'tid': event['tid'],
+                              'args': {'module': event['module'], 'cpu_us': event['cpu']}})
+            else:
+                trace.append({'name': event['name'], 'cat': 'counter', 'ph': 'C',
+                              'ts': event['start'], 'pid': event['pid'], 'tid': event['tid'],
+                              'args': {event['module']: event['value']}})
+        return trace
+
+    def save(self, path):
+        """Save trace events and the per-module summary as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms',
+                       'summary': self.summary()}, f)
+
+
+class _NullProfiler:
+    """Profiler that records nothing, used when profiling is off"""
+
+    enabled = False
+    events = ()
+
+    _stage = nullcontext()
+
+    def add_hook(self, hook):
+        pass
+
+    def stage(self, name, module):
+        return self._stage
+
+    def count(self, name, module, value):
+        pass
+
+    def record(self, event):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
@@ -0,0 +1,155 @@
+"""
+Module serves PDF-files of python objects over HTTP
+on localhost or on a Unix socket
+"""
+
+import os
+import json
+import stat
+import socket
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+DEFAULT_HOST = '127.0.0.1'
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """
+    GET /render?object=/d1/module.Class.func returns the PDF-file,
+    GET /stats returns the server's counters as JSON
+    """
+
+    server_version = 'docstring2pdf'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/stats':
+            self._send(200, json.dumps(self.server.stats()).encode('utf-8'), 'application/json')
+            return
+        if url.path != '/render':
+            self._send_text(404, 'Unknown path {}'.format(url.path))
+            return
+        objects = parse_qs(url.query).get('object')
+        if not objects:
+            self._send_text(400, 'The object parameter is required')
+            return
+        try:
+            data = self.server.render(objects[0])
+        except LookupError as e:
+            self._send_text(404, str(e))
+        except Exception as e:
+            self._send_text(500, '{}: {}'.format(type(e).__name__, e))
+        else:
+            self._send(200, data, 'application/pdf')
+
+    def _send_text(self, code, text):
+        self._send(code, (text + '\n').encode('utf-8'), 'text/plain; charset=utf-8')
+
+    def _send(self, code, data, content_type):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Clients of Unix sockets have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _PoolMixIn:
+    """Handle requests in a fixed pool of worker threads"""
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+
+
+class RenderServer(_PoolMixIn, HTTPServer):
+    """HTTP server of PDF-files on a TCP address"""
+
+
+class UnixRenderServer(_PoolMixIn, socketserver.UnixStreamServer):
+    """HTTP server of PDF-files on a Unix socket"""
+
+    _bound = False
+
+    def server_bind(self):
+        # A socket left by a stopped server is replaced
+        if _is_socket(self.server_address) and not _is_listening(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+        self._bound = True
+
+    def server_close(self):
+        super().server_close()
+        if self._bound and _is_socket(self.server_address):
+            os.remove(self.server_address)
+
+
+def _is_socket(path):
+    try:
+        return stat.S_ISSOCK(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+def _is_listening(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def parse_address(address):
+    """
+    Return a (host, port) pair for 'PORT' or 'HOST:PORT' addresses,
+    any other address is a path to a Unix socket
+    """
+    host, _, port = address.rpartition(':')
+    if port.isdigit() and '/' not in host:
+        return host or DEFAULT_HOST, int(port)
+    return address
+
+
+def make_server(address, render, stats=None, jobs=4, verbose=False):
+    """
+    Create the server on the address, it handles requests in jobs threads.
+    render(object_path) returns the PDF-file as bytes and raises
+    LookupError if there is no such object, stats() returns a dict.
+    """
+    address = parse_address(address)
+    if isinstance(address, tuple):
+        server = RenderServer(address, RenderHandler, bind_and_activate=False)
+    else:
+        server = UnixRenderServer(address, RenderHandler, bind_and_activate=False)
+    server.render = render
+    server.stats = stats or dict
+    server.verbose = verbose
+    server.pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        server.server_bind()
+        server.server_activate()
+    except BaseException:
+        server.server_close()
+        raise
+    return server
@@ -0,0 +1,106 @@
+"""
+Module splits the documented objects between runs on
+many machines and merges the PDF-files they produce
+"""
+
+import os
+import heapq
+import shutil
+import manifest
+
+
+class MergeError(ValueError):
+    """Shard outputs can't be merged"""
+
+
+def partition(items, sizes, count):
+    """
+    Split the items into count lists of about the same total size,
+    larger items are placed first into the least loaded list.
+    The result depends only on the items and their sizes.
+    """
+    shards = [[] for _ in range(count)]
+    loads = [(0, index) for index in range(count)]
+    for size, position in sorted(((size, position) for position, size in enumerate(sizes)),
+                                 key=lambda pair: (-pair[0], pair[1])):
+        load, index = heapq.heappop(loads)
+        shards[index].append(position)
+        heapq.heappush(loads, (load + size, index))
+    # Keep the order of the items inside every shard
+    return [[items[position] for position in sorted(shard)] for shard in shards]
+
+
+def select(items, sizes, index, count):
+    """Items of the shard with the index from 1 to count"""
+    return partition(items, sizes, count)[index - 1]
+
+
+def merge(directory, shard_directories):
+    """
+    Put the PDF-files of the shards' outputs into the directory and
+    write the combined manifest. PDF-files of the previous merge that
+    no shard has made are removed. Return the combined manifest.
+    """
+    shards = [manifest.Manifest(shard_directory) for shard_directory in shard_directories]
+    _check_shards(shards)
+
+    combined = manifest.Manifest(directory)
+    previous = set(combined.entries)
+    combined.entries = {}
+    owners = {}
+    for shard in shards:
+        for name, entry in shard.entries.items():
+            if name in owners:
+                raise MergeError('{} is made by both {} and {}'.format(name, owners[name].directory,
+                                                                       shard.directory))
+            owners[name] = shard
+            combined.entries[name] = entry
+
+    os.makedirs(directory, exist_ok=True)
+    for name in sorted(combined.entries):
+        source = owners[name].output_path(name)
+        if not os.path.exists(source):
+            raise MergeError('{} is missing in {}'.format(name, owners[name].directory))
+        _place(source, combined.output_path(name))
+    for name in sorted(previous - set(combined.entries)):
+        try:
+            os.remove(combined.output_path(name))
+        except FileNotFoundError:
+            pass
+    combined.shard = None
+    combined.save()
+    return combined
+
+
+def _check_shards(shards):
+    count = None
+    indexes = set()
+    for shard in shards:
+        if shard.shard is None:
+            raise MergeError('{} has no shard manifest'.format(shard.directory))
+        if shard.generator != manifest.GENERATOR_VERSION:
+            raise MergeError('{} is made by generator {}, not {}'.format(shard.directory, shard.generator,
+                                                                         manifest.GENERATOR_VERSION))
+        if count is None:
+            count = shard.shard['count']
+        if shard.shard['count'] != count:
+            raise MergeError('{} is a shard of {} runs, not of {}'.format(shard.directory,
+                                                                          shard.shard['count'], count))
+        if shard.shard['index'] in indexes:
+            raise MergeError('Shard {} is given twice'.format(shard.shard['index']))
+        indexes.add(shard.shard['index'])
+    missing = sorted(set(range(1, (count or 0) + 1)) - indexes)
+    if missing:
+        raise MergeError('Shards {} of {} are missing'.format(', '.join(map(str, missing)), count))
+
+
+def _place(source, destination):
+    """Link the file to the destination, or copy it across file systems"""
+    if os.path.abspath(source) == os.path.abspath(destination):
+        return
+    tmp_path = '{}.{}.tmp'.format(destination, os.getpid())
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
@@ -0,0 +1,33 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import argparser
+
+
+class TestCommands(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_command(self):
+        args = argparser.parse_args(['render', 'package.ir'])
+        self.assertEqual('render', args.command)
+
+    def test_module_named_like_command(self):
+        open('render.py', 'w').close()
+        args = argparser.parse_args(['render'])
+        self.assertEqual(['render'], args.fromobject)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import sys
 import os
 import ast
+import pickle
 import unittest
 from unittest import TestCase
 
@@ -10,6 +11,10 @@ from astlister import ArgLister
 from astlister import FuncLister, FuncInfo
 from astlister import ClassLister, ClassInfo
 from astlister import ModuleLister, ModuleInfo
+from astlister import SymbolIndex
+from astlister import find_object_info
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
 
 
 class TestArgListerForFuncWithoutArgs(TestCase):
@@ -323,5 +328,232 @@ def another_module_func(a, b, c, d):
         self.assertEqual(correct_module_info, self.module_lister.module_info)
 
 
+class TestNestedClasses(TestCase):
+    def setUp(self):
+        self.tree = ast.parse('''
+class Outer:
+    """Outer docstrings"""
+
+    Pair = namedtuple('Pair', 'a b')
+
+    def method(self):
+        class InMethod:
+            pass
+
+    async def fetch(self, url):
+        """Fetch docstrings"""
+
+    class Inner:
+        def inner_method(self):
+            pass
+
+        class Deepest:
+            async def deepest(self):
+                pass
+
+    if True:
+        Hidden = namedtuple('Hidden', 'a')
+
+        class Conditional:
+            pass
+
+    def last(self):
+        pass
+
+
+async def coroutine(a):
+    pass
+''')
+        deepest = ClassInfo('Deepest', None, [FuncInfo('deepest', ['self'], None)])
+        inner = ClassInfo('Inner', None, [FuncInfo('inner_method', ['self'], None)], [deepest])
+        self.outer = ClassInfo('Outer', 'Outer docstrings',
+                               [FuncInfo('method', ['self'], None),
+                                FuncInfo('fetch', ['self', 'url'], 'Fetch docstrings'),
+                                FuncInfo('last', ['self'], None)],
+                               [ClassInfo('Pair', 'Pair(a, b)', None), inner, ClassInfo('Conditional', None, [])])
+
+    def test_module_lister(self):
+        info = ModuleLister('module', self.tree).module_info
+        self.assertEqual([self.outer], list(info.classes))
+        self.assertEqual([FuncInfo('coroutine', ['a'], None)], list(info.functions))
+
+    def test_class_lister(self):
+        class_lister = ClassLister()
+        class_lister.visit(self.tree)
+        self.assertEqual([self.outer], class_lister.classes_info)
+
+    def test_func_lister(self):
+        func_lister = FuncLister()
+        func_lister.visit(self.tree)
+        self.assertEqual(['method', 'fetch', 'inner_method', 'deepest', 'last', 'coroutine'],
+                         [func.name for func in func_lister.functions_info])
+
+    def test_symbol_index(self):
+        index = ModuleLister('module', self.tree).symbol_index
+        self.assertEqual('deepest', index.lookup(['Outer', 'Inner', 'Deepest', 'deepest']).name)
+        self.assertIsNone(index.lookup(['Outer', 'InMethod']))
+
+
+class TestGeneratedCode(TestCase):
+    """Machine-generated code nested deeper than the recursion limit allows to visit recursively"""
+
+    def test_deeply_nested_classes(self):
+        depth = 90
+        code = ''.join('{}class C{}:\n'.format('    ' * level, level) for level in range(depth))
+        code += '    ' * depth + 'def method(self, x=' + ' + '.join(['a'] * 2000) + '):\n'
+        code += '    ' * (depth + 1) + 'pass\n'
+        info = ModuleLister('module', ast.parse(code)).module_info
+        names = []
+        classes = info.classes
+        while classes:
+            names.append(classes[0].name)
+            functions = classes[0].functions
+            classes = classes[0].classes
+        self.assertEqual(['C{}'.format(level) for level in range(depth)], names)
+        self.assertEqual([FuncInfo('method', ['self', 'x'], None)], list(functions))
+        self.assertEqual(functions[0], find_object_info(code, names + ['method']))
+
+    def test_long_expressions(self):
+        tree = ast.parse('def f(x=' + ' + '.join(['(lambda y: y)'] * 2000) + '):\n    pass\n')
+        func_lister = FuncLister()
+        func_lister.visit(tree)
+        self.assertEqual(['x'] + ['y'] * 2000, list(func_lister.functions_info[0].signature))
+        arg_lister = ArgLister()
+        arg_lister.visit(tree)
+        self.assertEqual(2001, len(arg_lister.args))
+
+
+class TestInfoRecords(TestCase):
+    def setUp(self):
+        self.func_info = FuncInfo('func', ['a', 'b'], 'Func docstrings')
+        self.class_info = ClassInfo('Class', None, [self.func_info])
+
+    def test_namedtuple_api(self):
+        name, signature, docstrings = self.func_info
+        self.assertEqual(('func', ('a', 'b'), 'Func docstrings'), (name, signature, docstrings))
+        self.assertEqual(('name', 'signature', 'docstrings'), self.func_info._fields)
+        self.assertEqual({'name': 'Class', 'docstrings': None, 'functions': (self.func_info,), 'classes': ()},
+                         self.class_info._asdict())
+        self.assertEqual(FuncInfo('other', ['a', 'b'], 'Func docstrings'), self.func_info._replace(name='other'))
+        self.assertEqual("FuncInfo(name='func', signature=('a', 'b'), docstrings='Func docstrings')",
+                         repr(self.func_info))
+
+    def test_hash_and_equality(self):
+        same = ClassInfo('Class', None, (FuncInfo('func', ('a', 'b'), 'Func docstrings'),))
+        self.assertEqual(self.class_info, same)
+        self.assertEqual(hash(self.class_info), hash(same))
+        self.assertNotEqual(self.class_info, ClassInfo('Class', None, None))
+
+    def test_pickle(self):
+        module_info = ModuleInfo('module', None, [self.class_info], [self.func_info])
+        self.assertEqual(module_info, pickle.loads(pickle.dumps(module_info)))
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(self.func_info, '__dict__'))
+
+
+class TestSymbolIndex(TestCase):
+    def setUp(self):
+        self.method = FuncInfo(name='method', signature=['self'], docstrings=None)
+        self.cls = ClassInfo(name='Class', docstrings=None, functions=[self.method])
+        self.shadowed = FuncInfo(name='Class', signature=[], docstrings=None)
+        self.func = FuncInfo(name='func', signature=[], docstrings=None)
+        self.duplicate = FuncInfo(name='func', signature=['a'], docstrings=None)
+        module_info = ModuleInfo(name='module', docstrings=None, classes=[self.cls],
+                                 functions=[self.shadowed, self.func, self.duplicate])
+        self.index = SymbolIndex(module_info)
+
+    def test_lookup(self):
+        self.assertIs(self.cls, self.index.lookup('Class'))
+        self.assertIs(self.method, self.index.lookup('Class.method'))
+        self.assertIs(self.method, self.index.lookup(['Class', 'method']))
+        self.assertIs(self.func, self.index.lookup('func'))
+
+    def test_missing(self):
+        self.assertIsNone(self.index.lookup('Class.missing'))
+        self.assertIsNone(self.index.lookup('func.method'))
+        self.assertNotIn('missing', self.index)
+
+    def test_module_lister_index(self):
+        lister = ModuleLister('module', ast.parse('class A:\n    def f(self):\n        pass\n'))
+        self.assertEqual(('self',), lister.symbol_index.lookup('A.f').signature)
+        self.assertIs(lister.module_info, lister.symbol_index.module_info)
+
+
+class TestFindObjectInfo(TestCase):
+    def setUp(self):
+        self.module = '''
+"""
+Example:
+
+class Documented:
+    pass
+"""
+
+from collections import namedtuple
+
+
+def Shadowed():
+    pass
+
+class Shadowed:
+    """Class docstrings"""
+
+    def method(self, a):
+        """Method docstrings"""
+        x = (
+1)
+
+Point = namedtuple('Point', 'x y')
+
+class Documented:
+    """Real class"""
+
+    class Inner:
+        async def fetch(self, url):
+            """Inner method docstrings"""
+
+        class Deepest:
+            def method(self):
+                pass
+'''
+
+    def test_same_as_module_lister(self):
+        for filename in sorted(os.listdir(ROOT)) + [None]:
+            if filename is None:
+                code = self.module
+            elif filename.endswith('.py'):
+                with open(os.path.join(ROOT, filename), 'r', encoding='utf-8') as f:
+                    code = f.read()
+            else:
+                continue
+            index = ModuleLister('module', ast.parse(code)).symbol_index
+            for name in index._symbols:
+                self.assertEqual(index.lookup(name), find_object_info(code, list(name)))
+
+    def test_class_shadows_function(self):
+        self.assertEqual('Class docstrings', find_object_info(self.module, ['Shadowed']).docstrings)
+
+    def test_definition_in_docstring(self):
+        self.assertEqual('Real class', find_object_info(self.module, ['Documented']).docstrings)
+
+    def test_definition_in_docstring_after_quotes_in_string(self):
+        code = 's = \'"""\'\nexample = """\nclass Fake:\n    pass\n"""\n\n\ndef f():\n    pass\n'
+        self.assertIsNone(ModuleLister('module', ast.parse(code)).symbol_index.lookup('Fake'))
+        self.assertIsNone(find_object_info(code, ['Fake']))
+        self.assertEqual('f', find_object_info(code, ['f']).name)
+
+    def test_nested(self):
+        self.assertEqual('Inner method docstrings',
+                         find_object_info(self.module, ['Documented', 'Inner', 'fetch']).docstrings)
+        self.assertEqual('Deepest', find_object_info(self.module, ['Documented', 'Inner', 'Deepest']).name)
+
+    def test_missing(self):
+        self.assertIsNone(find_object_info(self.module, ['Missing']))
+        self.assertIsNone(find_object_info(self.module, ['Shadowed', 'missing']))
+        self.assertIsNone(find_object_info(self.module, ['Point', 'x']))
+        self.assertIsNone(find_object_info(self.module, ['Documented', 'Inner', 'fetch', 'x']))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,13 +1,15 @@
 import sys
 import os
+import tempfile
 import unittest
 from unittest import TestCase
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
 
 import docstring2pdf
-from docstring2pdf import Object
+from docstring2pdf import Object, Target
 from astlister import ModuleInfo, ClassInfo, FuncInfo
+from infocache import MemoryInfoCache
 
 
 class TestPDFDoc(TestCase):
@@ -101,5 +103,68 @@ class TestPDFDoc(TestCase):
         self.assertEqual(correct_info, self.doc2pdf._extract_functions_info(class_info, 'some_func'))
 
 
+class TestDiscoverTargets(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'pkg')
+        os.makedirs(os.path.join(self.root, 'sub'))
+        os.makedirs(os.path.join(self.root, '__pycache__'))
+        for path in ['__init__.py', 'mod.py', 'notes.txt', 'sub/inner.py', '__pycache__/mod.py']:
+            open(os.path.join(self.root, path), 'w').close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_directory(self):
+        correct_targets = [Target(os.path.join(self.root, '__init__'), 'pkg.__init__'),
+                           Target(os.path.join(self.root, 'mod'), 'pkg.mod'),
+                           Target(os.path.join(self.root, 'sub', 'inner'), 'pkg.sub.inner')]
+        self.assertEqual(correct_targets, docstring2pdf._discover_targets([self.root]))
+
+    def test_files_and_objects(self):
+        correct_targets = [Target(os.path.join(self.root, 'mod'), 'mod'),
+                           Target('/d1/module.Class', 'module.Class')]
+        self.assertEqual(correct_targets,
+                         docstring2pdf._discover_targets([os.path.join(self.root, 'mod.py'), '/d1/module.Class']))
+
+    def test_duplicate_names(self):
+        other = os.path.join(self.tmp.name, 'other')
+        os.makedirs(other)
+        open(os.path.join(other, 'mod.py'), 'w').close()
+        targets = docstring2pdf._discover_targets([os.path.join(self.root, 'mod.py'), os.path.join(other, 'mod.py'),
+                                                   os.path.join(self.root, 'mod.py')])
+        unique, duplicates = docstring2pdf._split_duplicates(targets)
+        self.assertEqual([Target(os.path.join(self.root, 'mod'), 'mod')], unique)
+        self.assertEqual([Target(os.path.join(other, 'mod'), 'mod')], [result.target for result in duplicates])
+        self.assertIn(os.path.join(self.root, 'mod'), duplicates[0].error)
+
+    def test_failure_is_reported(self):
+        options = docstring2pdf.BuildOptions(self.tmp.name, None, None)
+        result = docstring2pdf._document(Target(os.path.join(self.root, 'missing'), 'missing'), options)
+        self.assertIsNotNone(result.error)
+
+
+class TestWatch(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = MemoryInfoCache()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_removed_sources_are_forgotten(self):
+        paths = []
+        for name in ('kept', 'removed'):
+            path = os.path.join(self.tmp.name, name + '.py')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('"""{} docstrings"""\n'.format(name))
+            self.cache.get_module_info(path, name, lambda module_name, code: code)
+            paths.append(path)
+        os.remove(paths[1])
+        docstring2pdf._forget_removed(self.cache, set(paths))
+        self.assertEqual(1, len(self.cache))
+        self.assertEqual('"""kept docstrings"""\n', self.cache.get_module_info(paths[0], 'kept', self.fail))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import os
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import fontmetrics
+from fontmetrics import TIMES_ROMAN, TIMES_BOLD, TIMES_ITALIC
+
+
+class TestWidths(TestCase):
+    def test_afm_widths(self):
+        self.assertEqual(250, TIMES_ROMAN.char_width(' '))
+        self.assertEqual(722, TIMES_ROMAN.char_width('A'))
+        self.assertEqual(444, TIMES_ROMAN.char_width('é'))
+        self.assertEqual(1000, TIMES_ROMAN.char_width('—'))
+        self.assertEqual(556, TIMES_BOLD.char_width('b'))
+        self.assertEqual(500, TIMES_ITALIC.char_width('b'))
+
+    def test_unknown_character(self):
+        self.assertEqual(TIMES_ROMAN.char_width('n'), TIMES_ROMAN.char_width('ж'))
+
+    def test_text_width(self):
+        self.assertEqual(4805, TIMES_ROMAN.text_width('Hello world'))
+        self.assertEqual(TIMES_ROMAN.word_width('Hello') + 2 * 250, TIMES_ROMAN.text_width(' Hello '))
+
+    def test_memo_is_bounded(self):
+        metrics = fontmetrics.FontMetrics('Times-Roman', fontmetrics._TIMES_ROMAN, {})
+        for i in range(fontmetrics.MEMO_SIZE + 10):
+            metrics.word_width(str(i))
+        self.assertLessEqual(len(metrics._word_widths), fontmetrics.MEMO_SIZE)
+
+
+class TestWrap(TestCase):
+    def assertFits(self, lines, width, size):
+        for line in lines:
+            self.assertLessEqual(TIMES_ROMAN.text_width(line) * size / 1000, width)
+
+    def test_short_line(self):
+        self.assertEqual(['short line'], TIMES_ROMAN.wrap('short line', 400, 12))
+
+    def test_words_are_kept(self):
+        line = '    ' + ' '.join('word{}'.format(i) for i in range(100))
+        lines = TIMES_ROMAN.wrap(line, 300, 12)
+        self.assertGreater(len(lines), 1)
+        self.assertFits(lines, 300, 12)
+        self.assertTrue(all(wrapped.startswith('    word') for wrapped in lines))
+        self.assertEqual(line.split(), ' '.join(lines).split())
+
+    def test_long_word(self):
+        lines = TIMES_ROMAN.wrap('see ' + 'x' * 200 + ' end', 100, 12)
+        self.assertFits(lines, 100, 12)
+        self.assertEqual('see', lines[0])
+        self.assertEqual('see' + 'x' * 200 + 'end', ''.join(lines).replace(' ', ''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import sys
+import os
+import ast
+import tempfile
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from astlister import ModuleLister
+from infocache import ModuleInfoCache, MemoryInfoCache
+
+
+def extract(module_name, code):
+    return ModuleLister(module_name, ast.parse(code)).module_info
+
+
+class TestModuleInfoCache(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        self.source = os.path.join(self.tmp.name, 'module.py')
+        self.write_source('"""Module docstrings"""\n')
+        self.cache = ModuleInfoCache(self.cache_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_source(self, code, mtime=None):
+        with open(self.source, 'w', encoding='utf-8') as f:
+            f.write(code)
+        if mtime is not None:
+            os.utime(self.source, ns=(mtime, mtime))
+
+    def test_hit(self):
+        first = self.cache.get_module_info(self.source, 'module', extract)
+        second = ModuleInfoCache(self.cache_dir).get_module_info(self.source, 'module', self.fail)
+        self.assertEqual(first, second)
+
+    def test_touched_but_unchanged_source(self):
+        self.cache.get_module_info(self.source, 'module', extract)
+        self.write_source('"""Module docstrings"""\n', mtime=10 ** 9)
+        info = self.cache.get_module_info(self.source, 'module', self.fail)
+        self.assertEqual('Module docstrings', info.docstrings)
+
+    def test_changed_source(self):
+        self.cache.get_module_info(self.source, 'module', extract)
+        self.write_source('"""New docstrings"""\n', mtime=10 ** 9)
+        info = self.cache.get_module_info(self.source, 'module', extract)
+        self.assertEqual('New docstrings', info.docstrings)
+        self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+
+    def test_eviction(self):
+        cache = ModuleInfoCache(self.cache_dir, max_size=1)
+        cache.get_module_info(self.source, 'module', extract)
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+
+class TestMemoryInfoCache(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'module.py')
+        with open(self.source, 'w', encoding='utf-8') as f:
+            f.write('"""Module docstrings"""\n')
+        self.cache = MemoryInfoCache()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit(self):
+        first = self.cache.get_module_info(self.source, 'module', extract)
+        self.assertIs(first, self.cache.get_module_info(self.source, 'module', self.fail))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test_changed_source(self):
+        self.cache.get_module_info(self.source, 'module', extract)
+        with open(self.source, 'w', encoding='utf-8') as f:
+            f.write('"""Changed docstrings"""\n')
+        self.assertEqual('Changed docstrings', self.cache.get_module_info(self.source, 'module', extract).docstrings)
+
+    def test_max_entries(self):
+        cache = MemoryInfoCache(max_entries=2)
+        sources = []
+        for name in ('first', 'second', 'third'):
+            source = os.path.join(self.tmp.name, name + '.py')
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write('"""{} docstrings"""\n'.format(name))
+            sources.append(source)
+        cache.get_module_info(sources[0], 'first', extract)
+        cache.get_module_info(sources[1], 'second', extract)
+        cache.get_module_info(sources[0], 'first', self.fail)
+        cache.get_module_info(sources[2], 'third', extract)
+        self.assertEqual(2, len(cache))
+        cache.get_module_info(sources[0], 'first', self.fail)
+        self.assertEqual('second docstrings', cache.get_module_info(sources[1], 'second', extract).docstrings)
+        self.assertEqual({}, cache._key_locks)
+
+    def test_forget(self):
+        self.cache.get_module_info(self.source, 'module', extract)
+        self.cache.forget(self.source)
+        self.assertEqual(0, len(self.cache))
+
+    def test_fallback(self):
+        cache_dir = os.path.join(self.tmp.name, 'cache')
+        MemoryInfoCache(ModuleInfoCache(cache_dir)).get_module_info(self.source, 'module', extract)
+        fallback = ModuleInfoCache(cache_dir)
+        MemoryInfoCache(fallback).get_module_info(self.source, 'module', self.fail)
+        self.assertEqual(1, fallback.hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import sys
+import os
+import io
+import json
+import glob
+import unittest
+from unittest import TestCase, mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import ir
+from astlister import ModuleInfo, ClassInfo, FuncInfo
+from docstring2pdf import PDF_Doc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
+
+
+def documents():
+    paths = sorted(glob.glob(os.path.join(ROOT, '*.py')))
+    docs = [PDF_Doc().get_document(path[:-3]) for path in paths]
+    docs.append(PDF_Doc().get_document(os.path.join(ROOT, 'astlister.SymbolIndex.lookup')))
+    docs.append(Document('unicode', 'unicode', 'unicode', None,
+                         ModuleInfo('unicode', 'Строка\n\ud800 (lone surrogate)', [], [])))
+    return docs
+
+
+Document = ir.Document
+
+
+class TestRoundTrip(TestCase):
+    def setUp(self):
+        self.documents = documents()
+
+    def round_trip(self, binary):
+        stream = io.BytesIO()
+        self.assertEqual(len(self.documents), ir.write(stream, self.documents, binary))
+        stream.seek(0)
+        return list(ir.read(stream)), stream.getvalue()
+
+    def test_json_lines(self):
+        read, data = self.round_trip(False)
+        self.assertEqual(self.documents, read)
+        header = json.loads(data.split(b'\n')[0])
+        self.assertEqual({'format': ir.FORMAT_NAME, 'version': ir.IR_VERSION}, header)
+
+    def test_binary(self):
+        read, data = self.round_trip(True)
+        self.assertEqual(self.documents, read)
+        self.assertTrue(data.startswith(ir.BINARY_MAGIC))
+        self.assertLess(len(data), len(self.round_trip(False)[1]) / 2)
+
+    def test_binary_is_read_incrementally(self):
+        _, data = self.round_trip(True)
+        stream = io.BytesIO(data)
+        with mock.patch('ir.READ_SIZE', 64):
+            documents = ir.read(stream)
+            self.assertEqual(self.documents[0], next(documents))
+            self.assertLess(stream.tell(), len(data))
+            self.assertEqual(self.documents[1:], list(documents))
+
+    def test_truncated_binary(self):
+        _, data = self.round_trip(True)
+        with self.assertRaises(ir.IRError):
+            list(ir.read(io.BytesIO(data[:len(data) // 2])))
+
+    def test_rendering_is_the_same(self):
+        read, _ = self.round_trip(True)
+        document = read[-2]
+        self.assertEqual('astlister.SymbolIndex.lookup', document.name)
+        self.assertEqual('SymbolIndex', document.class_name)
+        self.assertEqual(str(PDF_Doc().get_pdf_doc(os.path.join(ROOT, 'astlister.SymbolIndex.lookup'))),
+                         str(PDF_Doc().render_document(document)))
+
+
+class TestVersions(TestCase):
+    def test_newer_version_is_rejected(self):
+        stream = io.BytesIO(json.dumps({'format': ir.FORMAT_NAME, 'version': ir.IR_VERSION + 1}).encode())
+        with self.assertRaises(ir.IRError):
+            list(ir.read(stream))
+
+    def test_not_ir(self):
+        with self.assertRaises(ir.IRError):
+            list(ir.read(io.BytesIO(b'%PDF-1.2\n')))
+
+    def test_unknown_record(self):
+        with self.assertRaises(ir.IRError):
+            ir.decode_info({'type': 'package', 'name': 'p'})
+
+    def test_encode_info(self):
+        info = ClassInfo('Point', 'Point(x, y)', None)
+        self.assertEqual({'type': 'class', 'name': 'Point', 'docstrings': 'Point(x, y)', 'functions': None,
+                          'classes': []},
+                         ir.encode_info(info))
+        func = FuncInfo('f', ('a', 'b'), None)
+        self.assertEqual(func, ir.decode_info(ir.encode_info(func)))
+
+    def test_version_1_classes(self):
+        # Classes of version 1 have no nested classes
+        info = ClassInfo('Class', None, [FuncInfo('f', ('self',), None)])
+        self.assertEqual(info, ir.decode_info({'type': 'class', 'name': 'Class', 'docstrings': None,
+                                               'functions': [{'type': 'function', 'name': 'f',
+                                                              'signature': ['self'], 'docstrings': None}]}))
+        data = bytes((ir._RECORD, ir._KIND_CODES['class'], 3, ir._NEW_STRING, 5)) + b'Class' + bytes((ir._NONE, ir._NONE))
+        self.assertEqual(ClassInfo('Class', None, None), ir._BinaryDecoder(data).value())
+
+    def test_nested_classes(self):
+        inner = ClassInfo('Inner', 'Inner docstrings', [FuncInfo('g', (), None)])
+        info = ClassInfo('Outer', None, [FuncInfo('f', ('self',), None)], [inner])
+        self.assertEqual(info, ir.decode_info(ir.encode_info(info)))
+        encoder = ir._BinaryEncoder()
+        encoder.value(info)
+        self.assertEqual(info, ir._BinaryDecoder(encoder.take()).value())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import sys
+import os
+import pickle
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from lrucache import LRUCache
+
+
+class TestLRUCache(TestCase):
+    def setUp(self):
+        self.cache = LRUCache(max_entries=2)
+
+    def test_get(self):
+        self.assertEqual('a', self.cache.get(1, lambda: 'a'))
+        self.assertEqual('a', self.cache.get(1, self.fail))
+        self.assertEqual({'entries': 1, 'hits': 1, 'misses': 1}, self.cache.stats())
+
+    def test_least_recently_used_are_dropped(self):
+        self.cache.get(1, lambda: 'a')
+        self.cache.get(2, lambda: 'b')
+        self.cache.get(1, self.fail)
+        self.cache.get(3, lambda: 'c')
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual('a', self.cache.get(1, self.fail))
+        self.assertEqual('B', self.cache.get(2, lambda: 'B'))
+
+    def test_pickled_cache_is_empty(self):
+        self.cache.get(1, lambda: 'a')
+        copy = pickle.loads(pickle.dumps(self.cache))
+        self.assertEqual({'entries': 0, 'hits': 0, 'misses': 0}, copy.stats())
+        self.assertEqual(2, copy.max_entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
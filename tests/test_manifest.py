@@ -0,0 +1,70 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from manifest import Manifest
+
+
+class TestManifest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.tmp.name, 'out')
+        self.source = os.path.join(self.tmp.name, 'module.py')
+        self.write(self.source, '"""Module docstrings"""\n')
+        self.write(os.path.join(self.out, 'module.pdf'), '%PDF')
+        outputs = Manifest(self.out)
+        outputs.record('module', 'module', self.source)
+        outputs.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def write(path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_up_to_date(self):
+        self.assertTrue(Manifest(self.out).is_up_to_date('module', 'module', self.source))
+
+    def test_changed_source(self):
+        self.write(self.source, '"""New docstrings"""\n')
+        self.assertFalse(Manifest(self.out).is_up_to_date('module', 'module', self.source))
+
+    def test_other_object(self):
+        self.assertFalse(Manifest(self.out).is_up_to_date('module', 'module.Class', self.source))
+
+    def test_other_options(self):
+        outputs = Manifest(self.out)
+        outputs.record('module', 'module', self.source, {'compress_level': None})
+        outputs.save()
+        self.assertTrue(Manifest(self.out).is_up_to_date('module', 'module', self.source, {'compress_level': None}))
+        self.assertFalse(Manifest(self.out).is_up_to_date('module', 'module', self.source, {'compress_level': 0}))
+
+    def test_object_streams(self):
+        options = {'compress_level': None, 'object_streams': False}
+        outputs = Manifest(self.out)
+        outputs.record('module', 'module', self.source, options)
+        outputs.save()
+        self.assertFalse(Manifest(self.out).is_up_to_date('module', 'module', self.source,
+                                                          dict(options, object_streams=True)))
+
+    def test_missing_output(self):
+        os.remove(os.path.join(self.out, 'module.pdf'))
+        self.assertFalse(Manifest(self.out).is_up_to_date('module', 'module', self.source))
+
+    def test_remove_orphans(self):
+        os.remove(self.source)
+        outputs = Manifest(self.out)
+        self.assertEqual(['module'], outputs.remove_orphans())
+        self.assertFalse(os.path.exists(os.path.join(self.out, 'module.pdf')))
+        self.assertEqual({}, outputs.entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
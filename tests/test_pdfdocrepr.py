@@ -0,0 +1,185 @@
+import sys
+import os
+import re
+import ast
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from astlister import ModuleLister, ModuleInfo, ClassInfo, FuncInfo
+import pdfformater
+from pdfdocrepr import PDF_Doc_Repr, FragmentCache, MAX_INDENT_LEVEL
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
+
+
+def project_modules():
+    modules = []
+    for filename in sorted(os.listdir(ROOT)):
+        if filename.endswith('.py'):
+            with open(os.path.join(ROOT, filename), 'r', encoding='utf-8') as f:
+                tree = ast.parse(f.read())
+            modules.append(ModuleLister(filename[:-3], tree).module_info)
+    return modules
+
+
+class TestRenderTwice(TestCase):
+    def test_same_output(self):
+        module_info = ModuleInfo('module', 'Module docstrings',
+                                 [ClassInfo('Class', 'Class docstrings',
+                                            [FuncInfo('func', ['self'], 'Func docstrings')])],
+                                 [FuncInfo('func', ['a'], 'Func docstrings')])
+        renderer = PDF_Doc_Repr()
+        first = str(renderer.module_to_pdf(module_info))
+        renderer.class_to_pdf(module_info.classes[0], 'module')
+        self.assertEqual(first, str(renderer.module_to_pdf(module_info)))
+
+
+class TestNestedClasses(TestCase):
+    def setUp(self):
+        deepest = ClassInfo('Deepest', 'Deepest docstrings', [FuncInfo('deepest', ['self'], None)])
+        inner = ClassInfo('Inner', 'Inner docstrings', [FuncInfo('inner_method', ['self'], 'Inner method')],
+                          [deepest, ClassInfo('_Private', None, [], [ClassInfo('Hidden', None, [])])])
+        self.outer = ClassInfo('Outer', 'Outer docstrings', [FuncInfo('method', ['self'], None)], [inner])
+        self.module_info = ModuleInfo('module', None, [self.outer], [])
+
+    @staticmethod
+    def subheads(pdf):
+        """Names of the subheadings with their absolute shifts"""
+        shift = 0
+        subheads = []
+        for fragment in pdf:
+            for line in fragment.split('\n'):
+                if line.endswith(' Td'):
+                    shift += float(line.split()[0])
+                elif line.endswith(' Tj') and '/FBold 12 Tf' in fragment:
+                    text = re.match(r'\((.*)\) Tj$', line).group(1)
+                    subheads.append((text.replace('\\(', '(').replace('\\)', ')'), shift))
+        return subheads
+
+    def test_module_page(self):
+        pdf = PDF_Doc_Repr().module_to_pdf(self.module_info)
+        h = pdfformater.HORIZONTAL_SHIFT
+        self.assertEqual([('module', 2 * h), ('Outer', 2 * h), ('Inner', 3 * h), ('Deepest', 4 * h)],
+                         self.subheads(pdf))
+        self.assertEqual([(0, 'Outer'), (1, 'Inner'), (2, 'Deepest')], [mark[1:] for mark in pdf.marks])
+
+    def test_class_page(self):
+        pdf = PDF_Doc_Repr().class_to_pdf(self.outer, 'module')
+        h = pdfformater.HORIZONTAL_SHIFT
+        self.assertEqual([('METHODS:', 2 * h), ('method(self)', 2 * h), ('CLASSES:', 2 * h), ('Inner', 2 * h),
+                          ('inner_method(self)', 3 * h), ('Deepest', 3 * h), ('deepest(self)', 4 * h)],
+                         self.subheads(pdf))
+        self.assertIn('Inner method', str(pdf))
+        self.assertNotIn('Hidden', str(pdf))
+
+    def test_top_level_output_is_unchanged(self):
+        flat = ClassInfo('Class', 'Class docstrings', [FuncInfo('func', ['self'], 'Func docstrings')])
+        pdf = PDF_Doc_Repr().class_to_pdf(flat, 'module')
+        self.assertNotIn('CLASSES:', str(pdf))
+        self.assertEqual(str(pdf), str(PDF_Doc_Repr().class_to_pdf(flat._replace(classes=[ClassInfo('_P', None, [])]),
+                                                                   'module')))
+
+    def test_deep_nesting(self):
+        info = ClassInfo('C', None, [])
+        for level in range(2000):
+            info = ClassInfo('C', None, [FuncInfo('m', ['self'], None)], [info])
+        pdf = PDF_Doc_Repr(FragmentCache()).class_to_pdf(info, 'module')
+        shifts = {shift for _, shift in self.subheads(pdf)}
+        self.assertEqual((2 + MAX_INDENT_LEVEL) * pdfformater.HORIZONTAL_SHIFT, max(shifts))
+        self.assertEqual(1999, max(mark[1] for mark in pdf.marks))
+
+
+class TestConcurrentRendering(TestCase):
+    """Render hundreds of documents from a thread pool with one renderer"""
+
+    def setUp(self):
+        self.renderer = PDF_Doc_Repr()
+        self.jobs = []
+        for module_info in project_modules():
+            self.jobs.append((self.renderer.module_to_pdf, (module_info,)))
+            for class_info in module_info.classes:
+                self.jobs.append((self.renderer.class_to_pdf, (class_info, module_info.name)))
+                for fnc_info in class_info.functions or []:
+                    self.jobs.append((self.renderer.function_to_pdf, (fnc_info, class_info.name, module_info.name)))
+            for fnc_info in module_info.functions:
+                self.jobs.append((self.renderer.function_to_pdf, (fnc_info, None, module_info.name)))
+        self.jobs *= max(1, 300 // len(self.jobs) + 1)
+
+    def render(self, job):
+        method, args = job
+        return str(method(*args))
+
+    def test_parallel_equals_serial(self):
+        serial = [self.render(job) for job in self.jobs]
+        switch_interval = sys.getswitchinterval()
+        # Switch threads as often as possible to interleave the renders
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                parallel = list(executor.map(self.render, self.jobs))
+        finally:
+            sys.setswitchinterval(switch_interval)
+        self.assertGreaterEqual(len(self.jobs), 300)
+        self.assertEqual(serial, parallel)
+
+
+class TestFragmentCache(TestCase):
+    def setUp(self):
+        self.methods = [FuncInfo('method_{}'.format(i), ['self', 'a'], 'Method {} docstrings'.format(i))
+                        for i in range(20)]
+        self.module_info = ModuleInfo('module', 'Module docstrings',
+                                      [ClassInfo('Big', 'Big class', self.methods)],
+                                      [FuncInfo('func', ['a'], 'Func docstrings')])
+        self.fragments = FragmentCache()
+        self.renderer = PDF_Doc_Repr(self.fragments)
+
+    def assertSameOutput(self, expected, pdf):
+        self.assertEqual(str(expected), str(pdf))
+        self.assertEqual(expected.marks, pdf.marks)
+        self.assertEqual(expected.lines, pdf.lines)
+
+    def test_same_output_as_uncached(self):
+        uncached = PDF_Doc_Repr()
+        for module_info in project_modules():
+            for _ in range(2):
+                self.assertSameOutput(uncached.module_to_pdf(module_info), self.renderer.module_to_pdf(module_info))
+            for class_info in module_info.classes:
+                self.assertSameOutput(uncached.class_to_pdf(class_info, module_info.name),
+                                      self.renderer.class_to_pdf(class_info, module_info.name))
+        self.assertGreater(self.fragments.hits, 0)
+
+    def test_only_changed_member_is_rendered(self):
+        self.renderer.class_to_pdf(self.module_info.classes[0], 'module')
+        self.assertEqual({'entries': 20, 'hits': 0, 'misses': 20}, self.fragments.stats())
+        self.methods[7] = self.methods[7]._replace(docstrings='Changed docstrings')
+        changed = ClassInfo('Big', 'Big class', self.methods)
+        pdf = self.renderer.class_to_pdf(changed, 'module')
+        self.assertEqual({'entries': 21, 'hits': 19, 'misses': 21}, self.fragments.stats())
+        self.assertIn('Changed docstrings', str(pdf))
+        self.assertSameOutput(PDF_Doc_Repr().class_to_pdf(changed, 'module'), pdf)
+
+    def test_class_entry_ignores_methods(self):
+        self.renderer.module_to_pdf(self.module_info)
+        self.methods[0] = self.methods[0]._replace(signature=['self'])
+        self.renderer.module_to_pdf(self.module_info._replace(classes=[ClassInfo('Big', 'Big class', self.methods)]))
+        self.assertEqual(2, self.fragments.hits)
+
+    def test_least_recently_used_are_dropped(self):
+        fragments = FragmentCache(max_entries=5)
+        PDF_Doc_Repr(fragments).class_to_pdf(self.module_info.classes[0], 'module')
+        self.assertEqual(5, len(fragments))
+        self.assertEqual(20, fragments.misses)
+
+    def test_pickled_cache_is_empty(self):
+        self.renderer.module_to_pdf(self.module_info)
+        copy = pickle.loads(pickle.dumps(self.fragments))
+        self.assertEqual({'entries': 0, 'hits': 0, 'misses': 0}, copy.stats())
+        self.assertEqual(self.fragments.max_entries, copy.max_entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import sys
+import os
+import unittest
+from unittest import TestCase, mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import pdfformater
+import fontmetrics
+import textencoding
+
+FONT_PATH = next((path for path in textencoding.FONT_PATHS if os.path.exists(path)), None)
+
+
+class TestFragments(TestCase):
+    def setUp(self):
+        self.fragments = pdfformater.Fragments()
+        self.fragments.append(pdfformater.to_head('NAME', 40))
+        self.fragments.extend(pdfformater.text_lines('first\nsecond (2)\nthird', 40))
+
+    def test_lines(self):
+        self.assertEqual(4, self.fragments.lines)
+        self.assertEqual(4, len(self.fragments))
+
+    def test_str(self):
+        self.assertEqual(pdfformater.to_head('NAME', 40) + pdfformater.to_text('first\nsecond (2)\nthird', 40),
+                         str(self.fragments))
+
+    def test_paginate_fragments_as_text(self):
+        self.assertEqual(list(pdfformater.paginate(str(self.fragments))),
+                         list(pdfformater.paginate(self.fragments)))
+
+    def test_marks_outline(self):
+        pdf = pdfformater.Fragments()
+        pdf.append(pdfformater.to_page_description('Description', pdfformater.PAGE_HEIGHT))
+        pdf.extend(self.fragments)
+        pdf.mark(0, 'Later')
+        pdf.extend(pdfformater.text_lines('\n'.join(['line'] * 40), 40))
+        outline = []
+        pages = list(pdfformater.paginate(pdf, outline))
+        self.assertEqual(2, len(pages))
+        self.assertEqual([(0, 655, 0, 'Later')], outline)
+
+
+class TestToText(TestCase):
+    def test_one_line(self):
+        self.assertEqual('/FClassic 12 Tf\n40 -25 Td\n(text) Tj\n', pdfformater.to_text('text', 40))
+
+    def test_many_lines(self):
+        self.assertEqual('/FClassic 12 Tf\n40 -25 Td\n(a\\(b\\)) Tj\n'
+                         '/FClassic 12 Tf\n0 -25 Td\n(c) Tj\n', pdfformater.to_text('a(b)\nc', 40))
+
+
+    def test_long_line_is_wrapped(self):
+        text = ' '.join(['word'] * 200)
+        lines = list(pdfformater.text_lines(text, 40))
+        self.assertGreater(len(lines), 1)
+        self.assertTrue(lines[0].startswith('/FClassic 12 Tf\n40 -25 Td\n'))
+        self.assertTrue(all(line.startswith('/FClassic 12 Tf\n0 -25 Td\n') for line in lines[1:]))
+        self.assertEqual(200, sum(line.count('word') for line in lines))
+
+    def test_wrapped_lines_are_escaped(self):
+        text = ' '.join(['(word)\\'] * 100)
+        lines = list(pdfformater.text_lines(text, 40))
+        self.assertGreater(len(lines), 1)
+        self.assertEqual(100, sum(line.count('\\(word\\)\\\\') for line in lines))
+
+
+class TestHeadings(TestCase):
+    def setUp(self):
+        self.signature = 'method(' + ', '.join('argument_{}'.format(i) for i in range(30)) + ')'
+
+    def test_short_head(self):
+        self.assertEqual('/FBold 15 Tf\n0 -25 Td\n(NAME) Tj\n', pdfformater.to_head('NAME', 40))
+
+    def test_long_head_is_wrapped(self):
+        code = pdfformater.to_head(self.signature, 120)
+        lines = code.split(' Tj\n')[:-1]
+        self.assertGreater(len(lines), 1)
+        self.assertTrue(lines[0].startswith('/FBold 15 Tf\n-80 -25 Td\n'))
+        self.assertTrue(all(line.startswith('/FBold 15 Tf\n0 -25 Td\n') for line in lines[1:]))
+        for line in lines:
+            text = line[line.index('(') + 1:-1]
+            self.assertLessEqual(fontmetrics.TIMES_BOLD.text_width(text) * 15 / 1000, 520)
+
+    def test_long_subhead_is_wrapped(self):
+        code = pdfformater.to_subhead(self.signature, 40, level=2)
+        self.assertTrue(code.startswith('/FBold 12 Tf\n120 -25 Td\n'))
+        self.assertEqual(30, code.count('argument_'))
+        self.assertGreater(code.count(' Td\n'), 1)
+
+    def test_long_page_description_is_wrapped(self):
+        code = pdfformater.to_page_description('Docstrings to ' + self.signature, 800)
+        self.assertTrue(code.startswith('/FItalic 12 Tf\n40 780 Td\n'))
+        self.assertIn('/FItalic 12 Tf\n0 -25 Td\n', code)
+
+
+class TestEncoding(TestCase):
+    def test_win_ansi(self):
+        self.assertEqual('/FClassic 12 Tf\n40 -25 Td\n(café €) Tj\n', pdfformater.to_text('café €', 40))
+
+    def test_without_unicode_font(self):
+        with mock.patch('textencoding.unicode_font', return_value=None):
+            self.assertEqual('/FClassic 12 Tf\n40 -25 Td\n(Да \\(a\\)) Tj\n', pdfformater.to_text('Да (a)', 40))
+            self.assertEqual('/FBold 15 Tf\n0 -25 Td\n(Да) Tj\n', pdfformater.to_head('Да', 40))
+
+    @unittest.skipIf(FONT_PATH is None, 'no TrueType font')
+    def test_unicode_font(self):
+        font = textencoding.UnicodeFont(textencoding.truetype.read_font(FONT_PATH))
+        with mock.patch('textencoding.unicode_font', return_value=font):
+            self.assertEqual('/FUnicode 12 Tf\n40 -25 Td\n<041404300020002800610029> Tj\n'
+                             '/FClassic 12 Tf\n0 -25 Td\n(\\(a\\)) Tj\n', pdfformater.to_text('Да (a)\n(a)', 40))
+            self.assertEqual('/FUnicode 15 Tf\n0 -25 Td\n<04140430> Tj\n', pdfformater.to_head('Да', 40))
+            lines = list(pdfformater.text_lines(' '.join(['Слово'] * 100), 40))
+        self.assertGreater(len(lines), 1)
+        self.assertTrue(all(line.startswith('/FUnicode 12 Tf\n') for line in lines))
+
+    def test_lone_surrogates(self):
+        font = textencoding.UnicodeFont(textencoding.truetype.read_font(FONT_PATH)) if FONT_PATH else None
+        with mock.patch('textencoding.unicode_font', return_value=font):
+            text = pdfformater.to_text('x \ud800', 40) + pdfformater.to_head('\udfff', 40)
+        self.assertEqual(2, text.count('FFFD>' if font else '\ufffd)'))
+        textencoding.encode(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
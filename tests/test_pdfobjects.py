@@ -0,0 +1,47 @@
+import sys
+import os
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from pdfobjects import Name, Ref, serialize, indirect_object, text_string, byte_string
+
+
+class TestSerialize(TestCase):
+    def test_simple_values(self):
+        self.assertEqual(b'null', serialize(None))
+        self.assertEqual(b'true false', b' '.join(serialize(value) for value in (True, False)))
+        self.assertEqual(b'-12', serialize(-12))
+        self.assertEqual(b'12', serialize(12.0))
+        self.assertEqual(b'0.5', serialize(0.5))
+        self.assertEqual(b'0.000001', serialize(1e-6))
+        self.assertEqual(b'3 0 R', serialize(Ref(3)))
+
+    def test_names(self):
+        self.assertEqual(b'/Type', serialize(Name('Type')))
+        self.assertEqual(b'/A#20B#2F#23', serialize(Name('A B/#')))
+        self.assertEqual(b'/#D0#98', serialize(Name('И')))
+
+    def test_strings(self):
+        self.assertEqual(b'(a \\(b\\) c\\\\)', serialize('a (b) c\\'))
+        self.assertEqual(b'<FEFF0418>', serialize('И'))
+        self.assertEqual(b'<FEFF0061000A>', text_string('a\n'))
+        self.assertEqual(b'(\\n\xff)', byte_string(b'\n\xff'))
+        self.assertEqual(b'<FEFF0078FFFD>', text_string('x\ud800'))
+
+    def test_containers(self):
+        self.assertEqual(b'[0 0 600 800]', serialize([0, 0, 600, 800]))
+        self.assertEqual(b'<<\n/Type /Page\n/Kids [1 0 R 2 0 R]\n>>',
+                         serialize({'Type': Name('Page'), 'Kids': [Ref(1), Ref(2)]}))
+        self.assertEqual(b'<<\n/Font\n<<\n/F /Times\n>>\n>>', serialize({'Font': {'F': Name('Times')}}))
+
+    def test_indirect_object(self):
+        self.assertEqual(b'7 0 obj\n42\nendobj\n', indirect_object(7, 42))
+
+    def test_unsupported(self):
+        self.assertRaises(TypeError, serialize, object())
+
+
+if __name__ == '__main__':
+    unittest.main()
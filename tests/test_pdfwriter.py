@@ -0,0 +1,246 @@
+import sys
+import os
+import io
+import re
+import zlib
+import unittest
+from unittest import TestCase, mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import pdfformater
+import pdfwriter
+import textencoding
+
+FONT_PATH = next((path for path in textencoding.FONT_PATHS if os.path.exists(path)), None)
+
+
+def xref_offsets(data):
+    start = int(re.search(rb'startxref\n(\d+)\n%%EOF', data).group(1))
+    lines = data[start:].split(b'\n')
+    count = int(lines[1].split()[1])
+    return [int(line.split()[0]) for line in lines[3:2 + count]]
+
+
+class TestWriteDocument(TestCase):
+    def setUp(self):
+        text = pdfformater.to_head('NAME', 40) + pdfformater.to_text('Многострочный\ntext (with) brackets', 40)
+        stream = io.BytesIO()
+        pdfwriter.write_document(stream, pdfformater.paginate(text))
+        self.data = stream.getvalue()
+
+    def test_header(self):
+        self.assertTrue(self.data.startswith(b'%PDF-1.2\n%'))
+
+    def test_xref_offsets(self):
+        offsets = xref_offsets(self.data)
+        self.assertTrue(offsets)
+        for number, offset in enumerate(offsets, 1):
+            self.assertTrue(self.data[offset:].startswith('{} 0 obj'.format(number).encode()))
+
+    def test_stream_length(self):
+        match = re.search(rb'/Length (\d+) 0 R\n>>\nstream\n', self.data)
+        length_obj = int(match.group(1))
+        length = int(re.search('{} 0 obj\n(\\d+)\n'.format(length_obj).encode(), self.data).group(1))
+        stream_start = match.end()
+        self.assertEqual(b'\nendstream', self.data[stream_start + length:stream_start + length + 10])
+
+
+class TestPagination(TestCase):
+    def setUp(self):
+        self.text = pdfformater.to_page_description('Description', pdfformater.PAGE_HEIGHT)
+        self.text += pdfformater.to_head('NAME', 40)
+        self.text += pdfformater.to_text('\n'.join('line {}'.format(i) for i in range(1000)), 40)
+        self.pages = list(pdfformater.paginate(self.text))
+
+    def test_page_count(self):
+        per_page = (pdfformater.PAGE_HEIGHT - pdfformater.TOP_MARGIN - pdfformater.BOTTOM_MARGIN) \
+            // pdfformater.VERTICAL_SHIFT + 1
+        self.assertEqual(-(-1002 // per_page), len(self.pages))
+
+    def test_pages_start_at_absolute_position(self):
+        top = pdfformater.PAGE_HEIGHT - pdfformater.TOP_MARGIN
+        for page in self.pages:
+            lines = page.split('\n')
+            self.assertTrue(lines[0].endswith(' Tf'))
+            self.assertEqual(top, int(lines[1].split()[1]))
+        self.assertEqual('80 {} Td'.format(top), self.pages[1].split('\n')[1])
+
+    def test_nothing_lost(self):
+        self.assertEqual(self.text.count('Tj'), sum(page.count('Tj') for page in self.pages))
+
+    def test_page_tree(self):
+        stream = io.BytesIO()
+        pdfwriter.write_document(stream, self.pages)
+        data = stream.getvalue()
+        self.assertEqual(len(self.pages), data.count(b'/Type /Page\n'))
+        root = int(re.search(rb'/Pages (\d+) 0 R', data).group(1))
+        root_body = re.search('\n{} 0 obj\n(.*?)endobj'.format(root).encode(), data, re.S).group(1)
+        self.assertIn('/Count {}\n'.format(len(self.pages)).encode(), root_body)
+        self.assertLessEqual(root_body.count(b' 0 R'), pdfwriter.PAGE_TREE_KIDS)
+
+
+class TestCompression(TestCase):
+    def setUp(self):
+        self.page = pdfformater.to_text('\n'.join('line {}'.format(i) for i in range(30)), 40)
+
+    def write(self, pages, compress_level):
+        stream = io.BytesIO()
+        pdfwriter.write_document(stream, pages, compress_level)
+        return stream.getvalue()
+
+    def test_flate_decode(self):
+        data = self.write([self.page], 9)
+        match = re.search(rb'/Filter /FlateDecode\n>>\nstream\n', data)
+        self.assertIsNotNone(match)
+        self.assertEqual(b'BT\n' + self.page.encode() + b'ET', zlib.decompressobj().decompress(data[match.end():]))
+
+    def test_disabled(self):
+        self.assertNotIn(b'/FlateDecode', self.write([self.page], 0))
+
+    def test_small_pages_are_not_compressed_by_default(self):
+        self.assertIn(b'/FlateDecode', self.write([self.page], None))
+        self.assertNotIn(b'/FlateDecode', self.write([pdfformater.to_head('NAME', 40)], None))
+
+
+class TestBook(TestCase):
+    def setUp(self):
+        self.chapters = []
+        for name in ('first', 'second'):
+            pdf = pdfformater.Fragments()
+            pdf.append(pdfformater.to_head(name, 40))
+            for cls in ('Class', 'Класс'):
+                pdf.mark(0, cls)
+                pdf.append(pdfformater.to_subhead(cls, 40))
+            self.chapters.append((name, pdf))
+        stream = io.BytesIO()
+        self.size = pdfwriter.write_book(stream, self.chapters)
+        self.data = stream.getvalue()
+
+    def test_size(self):
+        self.assertEqual(len(self.data), self.size)
+
+    def test_chapters_start_new_pages(self):
+        self.assertEqual(2, self.data.count(b'/Type /Page\n'))
+
+    def test_shared_resources(self):
+        self.assertEqual(1, self.data.count(b'/Font\n<<'))
+        self.assertEqual(1, len(set(re.findall(rb'/Resources (\d+) 0 R', self.data))))
+
+    def test_xref_offsets(self):
+        for number, offset in enumerate(xref_offsets(self.data), 1):
+            self.assertTrue(self.data[offset:].startswith('{} 0 obj'.format(number).encode()))
+
+    def test_outline(self):
+        self.assertIn(b'/Outlines', self.data)
+        self.assertIn(b'/Title (first)', self.data)
+        self.assertIn(b'/Title (Class)', self.data)
+        self.assertIn('/Title <FEFF{}>'.format('Класс'.encode('utf-16-be').hex().upper()).encode(), self.data)
+        self.assertEqual(2, self.data.count(b'/Count -2\n'))
+        self.assertIn(b'/Type /Outlines\n', self.data)
+
+
+class TestObjectStreams(TestCase):
+    def setUp(self):
+        self.chapters = []
+        for chapter in range(20):
+            pdf = pdfformater.Fragments()
+            pdf.append(pdfformater.to_head('chapter {}'.format(chapter), 40))
+            for cls in range(5):
+                pdf.mark(0, 'Class {}'.format(cls))
+                pdf.append(pdfformater.to_subhead('Class {}'.format(cls), 40))
+            self.chapters.append(('chapter {}'.format(chapter), pdf))
+        stream = io.BytesIO()
+        self.size = pdfwriter.write_book(stream, self.chapters, object_streams=True)
+        self.data = stream.getvalue()
+
+    def stream_data(self, offset):
+        match = re.compile(rb'\d+ 0 obj\n<<\n(.*?)>>\nstream\n', re.S).match(self.data, offset)
+        length = int(re.search(rb'/Length (\d+)', match.group(1)).group(1))
+        data = self.data[match.end():match.end() + length]
+        if b'/FlateDecode' in match.group(1):
+            data = zlib.decompress(data)
+        return match.group(1), data
+
+    def xref_entries(self):
+        start = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', self.data).group(1))
+        dictionary, data = self.stream_data(start)
+        self.assertIn(b'/Type /XRef', dictionary)
+        widths = [int(width) for width in re.search(rb'/W \[(\d+) (\d+) (\d+)\]', dictionary).groups()]
+        size = int(re.search(rb'/Size (\d+)', dictionary).group(1))
+        entries = []
+        position = 0
+        for _ in range(size):
+            entry = []
+            for width in widths:
+                entry.append(int.from_bytes(data[position:position + width], 'big'))
+                position += width
+            entries.append(entry)
+        self.assertEqual(len(data), position)
+        return entries
+
+    def test_header_and_size(self):
+        self.assertTrue(self.data.startswith(b'%PDF-1.5\n%'))
+        self.assertEqual(len(self.data), self.size)
+        self.assertNotIn(b'\ntrailer\n', self.data)
+
+    def test_cross_reference_stream(self):
+        entries = self.xref_entries()
+        packed = 0
+        for number, (kind, field, index) in enumerate(entries):
+            if kind == 1:
+                self.assertTrue(self.data[field:].startswith('{} 0 obj'.format(number).encode()))
+            elif kind == 2:
+                packed += 1
+                dictionary, data = self.stream_data(entries[field][1])
+                self.assertIn(b'/Type /ObjStm', dictionary)
+                header = data.split(b'\n', 1)[0].split()
+                self.assertEqual(number, int(header[2 * index]))
+            else:
+                self.assertEqual(0, number)
+        # Pages, outline items, lengths and the catalog are packed
+        self.assertGreater(packed, pdfwriter.OBJECT_STREAM_SIZE)
+
+    def test_smaller_than_plain(self):
+        stream = io.BytesIO()
+        self.assertLess(self.size, pdfwriter.write_book(stream, self.chapters))
+
+
+class TestEncoding(TestCase):
+    def write(self, text):
+        stream = io.BytesIO()
+        pdfwriter.write_document(stream, pdfformater.paginate(pdfformater.to_text(text, 40)), 0)
+        return stream.getvalue()
+
+    def test_win_ansi(self):
+        data = self.write('café € \\')
+        self.assertIn(b'(caf\xe9 \x80 \\\\) Tj', data)
+        self.assertEqual(3, data.count(b'/Encoding /WinAnsiEncoding'))
+        self.assertNotIn(b'/FUnicode', data)
+
+    def test_without_unicode_font(self):
+        with mock.patch('textencoding.unicode_font', return_value=None):
+            data = self.write('Да')
+        self.assertIn(b'(??) Tj', data)
+        self.assertNotIn(b'/FUnicode', data)
+
+    @unittest.skipIf(FONT_PATH is None, 'no TrueType font')
+    def test_unicode_font(self):
+        font = textencoding.UnicodeFont(textencoding.truetype.read_font(FONT_PATH))
+        with mock.patch('textencoding.unicode_font', return_value=font):
+            data = self.write('Да\nнет')
+        self.assertIn(b'<04140430> Tj', data)
+        for key in (b'/Subtype /Type0', b'/Encoding /Identity-H', b'/Subtype /CIDFontType2', b'/FontFile2',
+                    b'/CIDToGIDMap', b'/ToUnicode'):
+            self.assertEqual(1, data.count(key), key)
+        self.assertRegex(data, rb'/BaseFont /[A-Z]{6}\+' + font.font.name.encode('ascii'))
+        self.assertIn(b'/FUnicode ', data[data.index(b'/Font\n'):])
+        widths = ' '.join('{} [{}]'.format(ord(char), font.font.widths[font.font.glyph_ids[char]]) for char in 'Даент')
+        self.assertIn('/W [{}]'.format(widths).encode('ascii'), data)
+        cmap = re.search(rb'beginbfchar\n(.*?)endbfchar', data, re.S).group(1)
+        self.assertEqual([b'<0414> <0414>', b'<0430> <0430>', b'<0435> <0435>', b'<043D> <043D>', b'<0442> <0442>'],
+                         cmap.split(b'\n')[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
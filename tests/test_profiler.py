@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import profiler
+from docstring2pdf import PDF_Doc
+
+SOURCE = '''"""Profiled module"""
+
+
+class Profiled:
+    """Profiled class"""
+
+    def method(self, a):
+        """Profiled method"""
+
+
+def function(b):
+    """Profiled function"""
+'''
+
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'profiled.py')
+        with open(self.path, 'w') as f:
+            f.write(SOURCE)
+        self.profiler = profiler.Profiler()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stages_and_counters(self):
+        PDF_Doc(recorder=self.profiler).get_pdf_doc(self.path[:-3])
+        summary = self.profiler.summary()['profiled']
+        self.assertEqual({'read', 'parse', 'extract', 'render'}, set(summary['stages']))
+        self.assertEqual(4, summary['counters']['members'])
+        self.assertGreater(summary['counters']['nodes'], 0)
+        self.assertGreater(summary['counters']['lines'], 0)
+
+    def test_hooks(self):
+        events = []
+        self.profiler.add_hook(events.append)
+        with self.profiler.stage('stage', 'module'):
+            pass
+        self.profiler.count('bytes', 'module', 10)
+        self.assertEqual(self.profiler.events, events)
+        self.assertEqual(['stage', 'count'], [event['type'] for event in events])
+
+    def test_trace_events(self):
+        with self.profiler.stage('stage', 'module'):
+            pass
+        self.profiler.count('bytes', 'module', 10)
+        path = os.path.join(self.tmp.name, 'profile.json')
+        self.profiler.save(path)
+        with open(path) as f:
+            trace = json.load(f)
+        self.assertEqual(['X', 'C'], [event['ph'] for event in trace['traceEvents']])
+        self.assertEqual({'module': 10}, trace['traceEvents'][1]['args'])
+        self.assertEqual(10, trace['summary']['module']['counters']['bytes'])
+
+    def test_disabled(self):
+        recorder = profiler.NULL_PROFILER
+        PDF_Doc(recorder=recorder).get_pdf_doc(self.path[:-3] + '.Profiled')
+        self.assertFalse(recorder.enabled)
+        self.assertEqual((), recorder.events)
+
+
+if __name__ == '__main__':
+    unittest.main()
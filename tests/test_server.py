@@ -0,0 +1,99 @@
+import sys
+import os
+import json
+import socket
+import tempfile
+import threading
+import http.client
+import unittest
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import server
+import infocache
+import docstring2pdf
+
+SOURCE = '''"""Served module"""
+
+
+class Served:
+    """Served class"""
+
+    def method(self, a):
+        """Served method"""
+'''
+
+
+class TestServer(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.module = os.path.join(self.tmp.name, 'served')
+        with open(self.module + '.py', 'w') as f:
+            f.write(SOURCE)
+        self.cache = infocache.MemoryInfoCache()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def start(self, address):
+        def render(object_path):
+            return docstring2pdf._render_pdf(object_path, self.cache)
+
+        def stats():
+            return {'hits': self.cache.hits, 'misses': self.cache.misses}
+
+        render_server = server.make_server(address, render, stats, jobs=4)
+        thread = threading.Thread(target=render_server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(render_server.server_close)
+        self.addCleanup(render_server.shutdown)
+        return render_server
+
+    def get(self, port, path):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def test_render(self):
+        port = self.start('127.0.0.1:0').server_address[1]
+        status, data = self.get(port, '/render?object={}.Served.method'.format(self.module))
+        self.assertEqual(200, status)
+        self.assertTrue(data.startswith(b'%PDF'))
+        self.assertEqual(404, self.get(port, '/render?object={}.Missing'.format(self.module))[0])
+        self.assertEqual(400, self.get(port, '/render')[0])
+
+    def test_concurrent_requests_share_extracted_info(self):
+        port = self.start('127.0.0.1:0').server_address[1]
+        paths = ['/render?object={}{}'.format(self.module, member) for member in ('', '.Served', '.Served.method')]
+        with ThreadPoolExecutor(8) as executor:
+            responses = list(executor.map(lambda path: self.get(port, path), paths * 10))
+        self.assertEqual({200}, {status for status, _ in responses})
+        self.assertEqual(3, len({data for _, data in responses}))
+        status, data = self.get(port, '/stats')
+        self.assertEqual({'hits': 29, 'misses': 1}, json.loads(data))
+
+    def test_unix_socket(self):
+        path = os.path.join(self.tmp.name, 'render.sock')
+        self.start(path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall('GET /render?object={}.Served HTTP/1.0\r\n\r\n'.format(self.module).encode())
+            response = b''.join(iter(lambda: client.recv(65536), b''))
+        self.assertTrue(response.startswith(b'HTTP/1.0 200'))
+        self.assertIn(b'\r\n\r\n%PDF', response)
+
+    def test_parse_address(self):
+        self.assertEqual(('127.0.0.1', 8000), server.parse_address('8000'))
+        self.assertEqual(('localhost', 8000), server.parse_address('localhost:8000'))
+        self.assertEqual('/tmp/render.sock', server.parse_address('/tmp/render.sock'))
+
+
+if __name__ == '__main__':
+    unittest.main()
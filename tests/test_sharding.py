@@ -0,0 +1,144 @@
+import sys
+import os
+import json
+import random
+import tempfile
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import argparser
+import docstring2pdf
+import manifest
+import profiler
+import sharding
+
+
+class TestPartition(TestCase):
+    def setUp(self):
+        generator = random.Random(0)
+        self.items = ['module{}'.format(i) for i in range(200)]
+        self.sizes = [generator.randint(1, 100000) for _ in self.items]
+
+    def test_every_item_once(self):
+        shards = sharding.partition(self.items, self.sizes, 7)
+        self.assertEqual(sorted(self.items), sorted(item for shard in shards for item in shard))
+        for shard in shards:
+            self.assertEqual(sorted(shard, key=self.items.index), shard)
+
+    def test_deterministic(self):
+        self.assertEqual(sharding.partition(self.items, self.sizes, 5),
+                         sharding.partition(list(self.items), list(self.sizes), 5))
+        self.assertEqual(sharding.partition(self.items, self.sizes, 5)[2],
+                         sharding.select(self.items, self.sizes, 3, 5))
+
+    def test_balanced(self):
+        size_of = dict(zip(self.items, self.sizes))
+        loads = [sum(size_of[item] for item in shard) for shard in sharding.partition(self.items, self.sizes, 4)]
+        # Greedy placement of the largest items first keeps shards within the largest item of each other
+        self.assertLessEqual(max(loads) - min(loads), max(self.sizes))
+
+    def test_more_shards_than_items(self):
+        self.assertEqual([['a'], ['b'], []], sharding.partition(['a', 'b'], [1, 1], 3))
+
+
+class TestMerge(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'module.py')
+        with open(self.source, 'w') as f:
+            f.write('"""Module"""\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_shard(self, index, count, names):
+        directory = os.path.join(self.tmp.name, 'shard{}'.format(index))
+        outputs = manifest.Manifest(directory)
+        for name in names:
+            outputs.record(name, self.source[:-3], self.source)
+            os.makedirs(directory, exist_ok=True)
+            with open(outputs.output_path(name), 'w') as f:
+                f.write(name)
+        outputs.shard = {'index': index, 'count': count}
+        outputs.save()
+        return directory
+
+    def test_merge(self):
+        target = os.path.join(self.tmp.name, 'merged')
+        os.makedirs(target)
+        with open(os.path.join(target, 'stale.pdf'), 'w') as f:
+            f.write('stale')
+        with open(os.path.join(target, manifest.MANIFEST_NAME), 'w') as f:
+            json.dump({'outputs': {'stale': {}}}, f)
+
+        shards = [self.make_shard(1, 2, ['a', 'b']), self.make_shard(2, 2, ['c'])]
+        sharding.merge(target, shards)
+        self.assertEqual(['a.pdf', 'b.pdf', 'c.pdf', manifest.MANIFEST_NAME], sorted(os.listdir(target)))
+        with open(os.path.join(target, 'c.pdf')) as f:
+            self.assertEqual('c', f.read())
+        combined = manifest.Manifest(target)
+        self.assertEqual({'a', 'b', 'c'}, set(combined.entries))
+        self.assertIsNone(combined.shard)
+
+    def test_missing_shard(self):
+        with self.assertRaises(sharding.MergeError):
+            sharding.merge(os.path.join(self.tmp.name, 'merged'), [self.make_shard(1, 2, ['a'])])
+
+    def test_name_in_two_shards(self):
+        shards = [self.make_shard(1, 2, ['a']), self.make_shard(2, 2, ['a'])]
+        with self.assertRaises(sharding.MergeError):
+            sharding.merge(os.path.join(self.tmp.name, 'merged'), shards)
+
+    def test_retain(self):
+        directory = self.make_shard(1, 1, ['a', 'b'])
+        outputs = manifest.Manifest(directory)
+        self.assertEqual(['b'], outputs.retain(['a']))
+        self.assertFalse(os.path.exists(outputs.output_path('b')))
+        self.assertEqual({'index': 1, 'count': 1}, outputs.shard)
+
+
+class TestRerunAfterMerge(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sources = []
+        for name in ('first', 'second'):
+            self.sources.append(os.path.join(self.tmp.name, name))
+            with open(self.sources[-1] + '.py', 'w') as f:
+                f.write('"""{} module"""\n'.format(name))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_shard(self, index, *flags):
+        directory = os.path.join(self.tmp.name, 'shard{}'.format(index))
+        args = argparser.parse_args(self.sources + ['--shard', '{}/2'.format(index), '--to', directory] + list(flags))
+        options = docstring2pdf.BuildOptions(args.to, None, args.compress_level)
+        self.assertEqual([], docstring2pdf._run(args, options, profiler.NULL_PROFILER))
+        return directory
+
+    def test_merged_files_are_not_changed(self):
+        shards = [self.run_shard(1), self.run_shard(2)]
+        target = os.path.join(self.tmp.name, 'merged')
+        merged = sharding.merge(target, shards)
+        contents = {}
+        for name in merged.entries:
+            with open(merged.output_path(name), 'rb') as f:
+                contents[name] = f.read()
+
+        for source in self.sources:
+            # The same sizes keep the partition
+            with open(source + '.py', 'w') as f:
+                f.write('"""{} MODULE"""\n'.format(os.path.basename(source)))
+        self.run_shard(1, '--force')
+        self.run_shard(2, '--force')
+        for name, data in contents.items():
+            with open(merged.output_path(name), 'rb') as f:
+                self.assertEqual(data, f.read())
+        self.assertEqual([manifest.MANIFEST_NAME], [name for name in os.listdir(shards[0])
+                                                    if not name.endswith('.pdf')])
+
+
+if __name__ == '__main__':
+    unittest.main()
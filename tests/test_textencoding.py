@@ -0,0 +1,83 @@
+import sys
+import os
+import unittest
+from unittest import TestCase, mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import textencoding
+from textencoding import escape, encode, is_win_ansi, hex_string, used_codes, replace_surrogates
+
+FONT_PATH = next((path for path in textencoding.FONT_PATHS if os.path.exists(path)), None)
+
+
+class TestEscape(TestCase):
+    def test_escape(self):
+        self.assertEqual('text', escape('text'))
+        self.assertEqual('a \\(b\\) c\\\\d\\r\nДа \\(é\\)', escape('a (b) c\\d\r\nДа (é)'))
+
+    def test_replace_surrogates(self):
+        self.assertEqual('x \ufffd Да \ufffd\ufffd', replace_surrogates('x \ud800 Да \ud83d\ude00'))
+        self.assertEqual('<00780020FFFD>', hex_string(replace_surrogates('x \udfff')))
+
+    def test_encode(self):
+        self.assertEqual(b'caf\xe9 \x80 \x93quote\x94', encode('café € “quote”'))
+        self.assertEqual(bytes(range(128)), encode(''.join(map(chr, range(128)))))
+
+    def test_not_win_ansi(self):
+        self.assertEqual(b'?? ? ?', encode('Да \x81 \x80'))
+        self.assertTrue(is_win_ansi('café € “quote”'))
+        for text in ('Да', '\x81', '\x80', '\U0001f600'):
+            self.assertFalse(is_win_ansi(text), text)
+
+    def test_same_as_codec(self):
+        for code in range(0x3000):
+            char = chr(code)
+            try:
+                char.encode('cp1252')
+            except UnicodeEncodeError:
+                self.assertFalse(is_win_ansi(char))
+            else:
+                self.assertTrue(is_win_ansi(char))
+                self.assertEqual(char.encode('cp1252'), encode(char))
+
+
+class TestHexStrings(TestCase):
+    def test_hex_string(self):
+        self.assertEqual('<04220061>', hex_string('Тa'))
+
+    def test_used_codes(self):
+        page = '/FUnicode 12 Tf\n0 -25 Td\n<04220061> Tj\n/FClassic 12 Tf\n0 -25 Td\n(<0041> Tj) Tj\n'
+        self.assertEqual({0x422, 0x61}, used_codes(page))
+
+
+class TestUnicodeFont(TestCase):
+    def setUp(self):
+        textencoding.unicode_font.cache_clear()
+        self.addCleanup(textencoding.unicode_font.cache_clear)
+
+    def test_disabled(self):
+        with mock.patch.dict(os.environ, {textencoding.FONT_ENV: ''}):
+            self.assertIsNone(textencoding.unicode_font())
+
+    def test_missing_file(self):
+        with mock.patch.dict(os.environ, {textencoding.FONT_ENV: os.path.join(os.path.dirname(__file__), 'no.ttf')}):
+            with self.assertWarns(UserWarning):
+                self.assertIsNone(textencoding.unicode_font())
+
+    def test_not_a_font(self):
+        with mock.patch.dict(os.environ, {textencoding.FONT_ENV: os.path.abspath(__file__)}):
+            with self.assertWarns(UserWarning):
+                self.assertIsNone(textencoding.unicode_font())
+
+    @unittest.skipIf(FONT_PATH is None, 'no TrueType font')
+    def test_font(self):
+        with mock.patch.dict(os.environ, {textencoding.FONT_ENV: FONT_PATH}):
+            font = textencoding.unicode_font()
+        self.assertIs(font, textencoding.unicode_font())
+        self.assertGreater(font.metrics.text_width('Ж'), 0)
+        self.assertEqual(font.metrics.text_width('ab'), font.metrics.text_width('a') + font.metrics.text_width('b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+import sys
+import os
+import ast
+import glob
+import tempfile
+import unittest
+from unittest import TestCase, mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+from astlister import ModuleLister
+from tokenlister import ModuleScanner, ScanError, list_module, read_module
+from docstring2pdf import PDF_Doc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
+STDLIB = os.path.dirname(os.path.abspath(ast.__file__))
+
+TRICKY = '''#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+r"""Module docstring with \\"quotes\\" and a
+class Fake:
+    def fake(self): pass
+"""
+
+from collections import namedtuple
+
+Pair = namedtuple('Pair', 'first second')
+Point = namedtuple('Point', ['x', 'y'])
+alias = other = namedtuple('Alias', 'a, b')
+if True:
+    Hidden = namedtuple('Hidden', 'a')
+
+@decorator(lambda x: x)
+def decorated(a, b=(1, 2), *args, c=lambda d, e=1: d, **kwargs) -> 'Dict[str, int]':
+    """Decorated"""
+    text = """
+def not_a_function():
+    pass
+"""
+    return text
+
+def one_liner(x): "Docstring on the header line"; return x
+
+async def coroutine():
+    """Listed like functions"""
+
+def annotated(a: 'x: y' = {'k': 1},
+              b=[i for i in range(3)]):
+    # Comment before the docstring is fine
+    \'\'\'Docstring after a comment\'\'\'
+
+def no_docstring():
+    x = "not a docstring"
+
+def f_string():
+    f"""Not a docstring {1}"""
+
+def implicit():
+    ("Implicit "
+     "concatenation")
+
+def continued(a, \\
+              b):
+    "Continued header"
+
+class Empty: pass
+
+class Documented(Base, metaclass=Meta):
+    """Class docstring"""
+
+    attribute: int = 1
+    mapping = {
+'key': 'value at column 0'}
+
+    def method(self, value=None):
+        """Method docstring"""
+        def inner():
+            pass
+
+        class InnerOfMethod:
+            def hidden(self):
+                pass
+
+    @property
+    def prop(self):
+        return 1
+
+    if sys.version_info > (3,):
+        def conditional(self):
+            """In a block"""
+    else:
+        def conditional(self):
+            pass
+
+    try:
+        def in_try(self):
+            pass
+    except ImportError:
+        def in_except(self):
+            pass
+    finally:
+        pass
+
+    class Nested:
+        """Nested docstring"""
+        Pair = namedtuple('Pair', 'a b')
+
+        def nested_method(self):
+            pass
+
+        class Deeper(object): "One-liner"; Triple = namedtuple('Triple', 'a b c')
+
+        if True:
+            Hidden = namedtuple('Hidden', 'a')
+
+            class InBlock:
+                async def in_block(self):
+                    pass
+        def after_block(self):
+            pass
+
+    async def coroutine(self):
+        def inside_coroutine():
+            pass
+
+    def last(self): pass
+def after_class():
+    pass
+'''
+
+
+def differences(source):
+    """ModuleInfo of both engines"""
+    return ModuleLister('module', ast.parse(source)).module_info, ModuleScanner('module', source).module_info
+
+
+class TestModuleScanner(TestCase):
+    def test_tricky_source(self):
+        expected, info = differences(TRICKY)
+        self.assertEqual(expected, info)
+        self.assertEqual(['Pair', 'Point', 'alias', 'Empty', 'Documented'], [cls.name for cls in info.classes])
+
+    def test_nested_classes(self):
+        _, info = differences(TRICKY)
+        documented = info.classes[-1]
+        self.assertEqual(['Nested'], [cls.name for cls in documented.classes])
+        self.assertIn('coroutine', [func.name for func in documented.functions])
+        self.assertNotIn('inside_coroutine', [func.name for func in documented.functions])
+        nested = documented.classes[0]
+        self.assertEqual(['nested_method', 'after_block'], [func.name for func in nested.functions])
+        self.assertEqual(['Pair', 'Deeper', 'InBlock'], [cls.name for cls in nested.classes])
+        self.assertEqual(['Triple'], [cls.name for cls in nested.classes[1].classes])
+        self.assertEqual(['in_block'], [func.name for func in nested.classes[2].functions])
+
+    def test_deeply_nested_classes(self):
+        source = ''.join('{0}class C{1}:\n{0}    def m{1}(self): pass\n'.format('    ' * level, level)
+                         for level in range(90))
+        expected, info = differences(source)
+        self.assertEqual(expected, info)
+
+    def test_bytes_source(self):
+        expected = ModuleLister('module', ast.parse(TRICKY)).module_info
+        self.assertEqual(expected, ModuleScanner('module', TRICKY.encode('utf-8')).module_info)
+        self.assertEqual(expected, ModuleScanner('module', b'\xef\xbb\xbf' + TRICKY.encode('utf-8')).module_info)
+
+    def test_crlf(self):
+        source = TRICKY.replace('\n', '\r\n')
+        self.assertEqual(*differences(source))
+
+    def test_without_trailing_newline(self):
+        self.assertEqual(*differences('class A:\n    def f(self):\n        "doc"'))
+        self.assertEqual(*differences('"""Only a docstring"""'))
+        self.assertEqual(*differences(''))
+
+    def test_symbol_index(self):
+        index = ModuleScanner('module', TRICKY).symbol_index
+        self.assertEqual('Method docstring', index.lookup('Documented.method').docstrings)
+        self.assertIsNone(index.lookup('Documented.hidden'))
+
+    def test_unsupported_sources(self):
+        for source in ('class A:\n\tdef f(self):\n\t\tpass\n',
+                       'x = 1\rclass A:\r    pass\r',
+                       'x = (1,\n',
+                       "x = 'unterminated\n",
+                       'def f(a) -> lambda: 1:\n    pass\n'):
+            with self.subTest(source=source):
+                self.assertRaises(ScanError, ModuleScanner, 'module', source)
+
+    def test_fallback(self):
+        source = 'class A:\n\t"""Tabs"""\n\tdef f(self):\n\t\tpass\n'
+        lister = list_module('module', source)
+        self.assertNotIsInstance(lister, ModuleScanner)
+        self.assertEqual(ModuleLister('module', ast.parse(source)).module_info, lister.module_info)
+        self.assertEqual(lister.module_info, list_module('module', source.encode('utf-8')).module_info)
+
+    def test_read_module(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'module.py')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(TRICKY)
+            self.assertEqual(ModuleLister('module', ast.parse(TRICKY)).module_info,
+                             read_module('module', path).module_info)
+            open(path, 'w').close()
+            self.assertEqual((None, (), ()), tuple(read_module('module', path).module_info)[1:])
+
+
+class TestDifferential(TestCase):
+    """Both engines give the same info of real modules"""
+
+    def check_files(self, paths):
+        checked = 0
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            try:
+                tree = ast.parse(data.decode('utf-8'))
+            except (SyntaxError, UnicodeDecodeError, ValueError):
+                continue
+            expected = ModuleLister('module', tree).module_info
+            with self.subTest(path=path):
+                self.assertEqual(expected, list_module('module', data.decode('utf-8')).module_info)
+                self.assertEqual(expected, read_module('module', path).module_info)
+            checked += 1
+        return checked
+
+    def test_repository(self):
+        self.assertGreater(self.check_files(sorted(glob.glob(os.path.join(ROOT, '**', '*.py'), recursive=True))), 0)
+
+    def test_standard_library(self):
+        self.assertGreater(self.check_files(sorted(glob.glob(os.path.join(STDLIB, '*.py')))), 0)
+
+    def test_scanner_handles_the_standard_library(self):
+        # Fallback is for rare forms only
+        for path in sorted(glob.glob(os.path.join(STDLIB, '*.py'))):
+            with open(path, 'rb') as f:
+                data = f.read()
+            with self.subTest(path=path):
+                self.assertIsInstance(list_module('module', data), ModuleScanner)
+
+
+class TestEngine(TestCase):
+    def test_documents_are_equal(self):
+        for name in ('tokenlister', 'astlister.SymbolIndex', 'astlister.SymbolIndex.lookup', 'ir.Document'):
+            object_path = os.path.join(ROOT, name)
+            with self.subTest(object_path=object_path):
+                self.assertEqual(PDF_Doc().get_document(object_path),
+                                 PDF_Doc(engine='tokens').get_document(object_path))
+
+    def test_objects_are_scanned(self):
+        object_path = os.path.join(ROOT, 'astlister.SymbolIndex.lookup')
+        with mock.patch('astlister.find_object_info', side_effect=AssertionError('parsed with ast')):
+            document = PDF_Doc(engine='tokens').get_document(object_path)
+        self.assertEqual('lookup', document.info.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
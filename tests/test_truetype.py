@@ -0,0 +1,72 @@
+import sys
+import os
+import struct
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import textencoding
+import truetype
+
+FONT_PATH = next((path for path in textencoding.FONT_PATHS if os.path.exists(path)), None)
+
+
+def tables(data):
+    count, = struct.unpack_from('>H', data, 4)
+    result = {}
+    for index in range(count):
+        tag, checksum, offset, length = struct.unpack_from('>4sIII', data, 12 + 16 * index)
+        result[tag.decode('latin-1')] = (checksum, data[offset:offset + length])
+    return result
+
+
+class TestErrors(TestCase):
+    def test_not_a_font(self):
+        self.assertRaises(truetype.TrueTypeError, truetype.TrueTypeFont, b'%PDF-1.2\n')
+        self.assertRaises(truetype.TrueTypeError, truetype.TrueTypeFont, b'\x00\x01\x00\x00\x00\x05')
+        self.assertRaises(truetype.TrueTypeError, truetype.TrueTypeFont, b'OTTO' + bytes(100))
+
+
+@unittest.skipIf(FONT_PATH is None, 'no TrueType font')
+class TestFont(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.font = truetype.read_font(FONT_PATH)
+
+    def test_metrics(self):
+        font = self.font
+        self.assertTrue(font.name)
+        self.assertEqual(font.num_glyphs, len(font.widths))
+        self.assertGreater(font.ascent, 0)
+        self.assertLess(font.descent, 0)
+        self.assertLess(font.widths[font.glyph_ids['i']], font.widths[font.glyph_ids['W']])
+        self.assertIn('Ж', font.glyph_ids)
+
+    def test_subset(self):
+        glyph_ids = [self.font.glyph_ids[char] for char in 'Жй']
+        components = set(self.font._components(self.font._glyph(glyph_ids[1])))
+        # й is a composite glyph
+        self.assertTrue(components)
+        data = self.font.subset(glyph_ids)
+        self.assertLess(len(data), len(self.font.data))
+        self.assertEqual(truetype._CHECKSUM_MAGIC, truetype._checksum(data))
+        font_tables = tables(data)
+        self.assertLessEqual(set(font_tables), set(truetype.SUBSET_TABLES))
+        for name, (checksum, table) in font_tables.items():
+            if name != 'head':
+                self.assertEqual(checksum, truetype._checksum(table))
+
+        loca = struct.unpack('>{}I'.format(self.font.num_glyphs + 1), font_tables['loca'][1])
+        glyf = font_tables['glyf'][1]
+        kept = {0} | set(glyph_ids) | components
+        for gid in range(self.font.num_glyphs):
+            glyph = glyf[loca[gid]:loca[gid + 1]]
+            if gid in kept:
+                original = self.font._glyph(gid)
+                self.assertEqual(original, glyph[:len(original)])
+            else:
+                self.assertEqual(b'', glyph)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+
+import watcher
+
+
+class WatcherTests:
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'pkg')
+        os.makedirs(os.path.join(self.root, 'sub'))
+        os.makedirs(os.path.join(self.root, '__pycache__'))
+        self.module = self.write(os.path.join(self.root, 'module.py'), '"""Module"""\n')
+        self.single = self.write(os.path.join(self.tmp.name, 'single.py'), '"""Single"""\n')
+        self.other = self.write(os.path.join(self.tmp.name, 'other.py'), '"""Other"""\n')
+        self.watch = self.make_watcher([self.root], [self.single])
+
+    def tearDown(self):
+        self.watch.close()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def write(path, code):
+        with open(path, 'w') as f:
+            f.write(code)
+        return path
+
+    def test_burst_of_changes(self):
+        for i in range(5):
+            self.write(self.module, '"""Module {}"""\n'.format(i))
+        self.write(self.single, '"""Single changed"""\n')
+        self.assertEqual({self.module, self.single}, self.watch.wait())
+
+    def test_new_and_removed_files(self):
+        created = self.write(os.path.join(self.root, 'sub', 'created.py'), '"""Created"""\n')
+        os.remove(self.module)
+        self.assertEqual({created, self.module}, self.watch.wait())
+
+    def test_unwatched_files_are_ignored(self):
+        self.write(self.other, '"""Other changed"""\n')
+        self.write(os.path.join(self.root, 'notes.txt'), 'notes')
+        self.write(os.path.join(self.root, '__pycache__', 'cached.py'), '')
+        self.write(self.single, '"""Single changed"""\n')
+        self.assertEqual({self.single}, self.watch.wait())
+
+
+class TestPollingWatcher(WatcherTests, TestCase):
+    def make_watcher(self, directories, files):
+        return watcher.PollingWatcher(directories, files, debounce=0.05, interval=0.05)
+
+
+@unittest.skipIf(watcher._inotify_libc() is None, 'inotify is not available')
+class TestInotifyWatcher(WatcherTests, TestCase):
+    def make_watcher(self, directories, files):
+        return watcher.InotifyWatcher(directories, files, debounce=0.05)
+
+    def test_new_directory(self):
+        directory = os.path.join(self.root, 'new')
+        os.makedirs(directory)
+        created = self.write(os.path.join(directory, 'created.py'), '"""Created"""\n')
+        self.assertIn(created, self.watch.wait())
+        self.write(created, '"""Created and changed"""\n')
+        self.assertEqual({created}, self.watch.wait())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Module encodes text for the pdf-code: literal strings in WinAnsiEncoding
+of the standard fonts and hex strings in UTF-16 of the embedded TrueType
+font, which shows the characters WinAnsiEncoding doesn't have
+"""
+
+import os
+import re
+import codecs
+import warnings
+import functools
+import fontmetrics
+import truetype
+
+# Environment variable with the path of the TrueType font for the other characters
+FONT_ENV = 'DOCSTRING2PDF_FONT'
+# TrueType fonts looked for if the variable isn't set, serif ones go well with Times
+FONT_PATHS = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSerif.ttf',
+    '/usr/share/fonts/TTF/DejaVuSerif.ttf',
+    '/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf',
+    '/usr/share/fonts/truetype/freefont/FreeSerif.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+    'C:\\Windows\\Fonts\\times.ttf',
+)
+
+_HEX_STRING = re.compile(r'^<([0-9A-F]*)> Tj$', re.M)
+# Lone surrogates of string escapes like '\ud800' can't be encoded in UTF-16
+_SURROGATES = re.compile('[\ud800-\udfff]')
+
+
+def _win_ansi_chars():
+    """Characters of WinAnsiEncoding by byte, '\\ufffe' for the bytes with no character"""
+    chars = []
+    for code in range(256):
+        try:
+            chars.append(bytes((code,)).decode('cp1252'))
+        except UnicodeDecodeError:
+            chars.append('\ufffe')
+    return ''.join(chars)
+
+
+_WIN_ANSI_CHARS = _win_ansi_chars()
+# Encoding table of the standard fonts, characters it doesn't have are encoded as '?'
+WIN_ANSI = codecs.charmap_build(_WIN_ANSI_CHARS)
+_NOT_WIN_ANSI = re.compile('[^{}]'.format(re.escape(_WIN_ANSI_CHARS.replace('\ufffe', ''))))
+
+
+def escape(text):
+    """Text escaped for a literal string, the whole docstring can be escaped at once"""
+    if '\\' in text:
+        text = text.replace('\\', '\\\\')
+    if '\r' in text:
+        text = text.replace('\r', '\\r')
+    return text.replace('(', '\\(').replace(')', '\\)')
+
+
+def encode(pdf_code):
+    """Bytes of the pdf-code with the literal strings in WinAnsiEncoding, in a single pass"""
+    return codecs.charmap_encode(pdf_code, 'replace', WIN_ANSI)[0]
+
+
+def replace_surrogates(text):
+    """Text with the surrogates replaced by U+FFFD REPLACEMENT CHARACTER"""
+    return _SURROGATES.sub('\ufffd', text)
+
+
+def is_win_ansi(text):
+    """Whether every character of the text is in WinAnsiEncoding"""
+    return text.isascii() or _NOT_WIN_ANSI.search(text) is None
+
+
+def hex_string(text):
+    """Hex string of the text in UTF-16, the character codes of the Unicode font"""
+    return '<' + text.encode('utf-16-be').hex().upper() + '>'
+
+
+def used_codes(page):
+    """Character codes of the hex strings shown by the page's pdf-code"""
+    codes = set()
+    for match in _HEX_STRING.finditer(page):
+        data = bytes.fromhex(match.group(1))
+        codes.update(int.from_bytes(data[i:i + 2], 'big') for i in range(0, len(data), 2))
+    return codes
+
+
+class UnicodeFont:
+    """TrueType font for the characters WinAnsiEncoding doesn't have, with its metrics"""
+
+    def __init__(self, font):
+        """Constructor gets a truetype.TrueTypeFont"""
+        self.font = font
+        widths = {char: font.widths[gid] for char, gid in font.glyph_ids.items()}
+        table = [widths.get(chr(code), font.widths[0]) for code in range(32, 256)]
+        self.metrics = fontmetrics.FontMetrics(font.name, table, widths)
+
+
+@functools.lru_cache(maxsize=None)
+def unicode_font():
+    """
+    UnicodeFont of the file in DOCSTRING2PDF_FONT or of the first of FONT_PATHS,
+    None if there is no such font and unknown characters are shown as '?'
+    """
+    path = os.environ.get(FONT_ENV)
+    if path is not None:
+        paths = (path,) if path else ()
+    else:
+        paths = [path for path in FONT_PATHS if os.path.exists(path)][:1]
+    for path in paths:
+        try:
+            return UnicodeFont(truetype.read_font(path))
+        except (OSError, truetype.TrueTypeError) as e:
+            warnings.warn('Font {} is not used: {}'.format(path, e))
+    return None
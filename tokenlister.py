@@ -0,0 +1,318 @@
+"""
+Module get info from modules like astlister.ModuleLister does,
+but without parsing whole modules. The source is split into
+logical lines by a scanner of strings, comments and brackets,
+only headers of definitions and their first statements are parsed.
+"""
+
+import re
+import ast
+import mmap
+import astlister
+from collections import namedtuple
+
+_STRING = r'''(?P<string>
+    \'\'\'[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*\'\'\'
+  | """[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""
+  | '[^'\\\n]*(?:\\.[^'\\\n]*)*'
+  | "[^"\\\n]*(?:\\.[^"\\\n]*)*")'''
+# Every match skips the text up to the next token changing the structure of logical lines
+_TOKENS = r'''[^'"\#()\[\]{}\\\r\n]*(?:''' + _STRING + r'''
+| (?P<newline>\r?\n(?P<indent>\ *))
+| (?P<open>[(\[{])
+| (?P<close>[)\]}])
+| (?P<comment>\#[^\r\n]*)
+| (?P<continuation>\\\r?\n)
+| (?P<quote>['"\\])
+| (?P<end>\Z))'''
+# Tokens of a header up to its colon
+_HEADER_TOKENS = r'''[^'"\#()\[\]{}:]*(?:''' + _STRING + r'''
+| (?P<open>[(\[{])
+| (?P<close>[)\]}])
+| (?P<colon>:)
+| (?P<other>.))'''
+_HEADER = r'(?:(async)\s+)?(def|class)\s'
+# Docstrings may be in brackets
+_STRING_START = r'''(?:\(\s*)*[bBrRuUfF]{0,2}['"]'''
+_INDENT = r'[ \t\f]*'
+_BLANK_LINE = r'[ \t\f]*(?:\#[^\r\n]*)?(?:\r?\n|\Z)'
+_LONE_CR = r'\r(?!\n)'
+
+# Compiled patterns and words for str or bytes sources
+_Syntax = namedtuple('_Syntax', 'tokens header_tokens header string_start indent blank_line lone_cr '
+                                'def_word namedtuple_word tabs no_statement')
+
+
+def _syntax(convert):
+    verbose = [re.compile(convert(pattern), re.S | re.X) for pattern in (_TOKENS, _HEADER_TOKENS)]
+    plain = [re.compile(convert(pattern)) for pattern in (_HEADER, _STRING_START, _INDENT, _BLANK_LINE, _LONE_CR)]
+    return _Syntax(*verbose, *plain, convert('def'), convert('namedtuple'), convert('\t\f'),
+                   {convert(char) for char in ('', '\r', '\n', '#')})
+
+
+_STR_SYNTAX = _syntax(str)
+_BYTES_SYNTAX = _syntax(lambda text: text.encode('ascii'))
+
+
+class ScanError(ValueError):
+    """Source can't be listed by scanning, it needs the AST-lister"""
+
+
+class ModuleScanner:
+    """
+    Read module to get info, the same info as astlister.ModuleLister
+    gets from the AST-node. The source is str, or bytes or a buffer,
+    e.g. mmap, of UTF-8 encoded text like the sources are read.
+    ScanError is raised if the source has a form the scanner doesn't handle.
+    """
+
+    def __init__(self, module_name, source):
+        """Constructor gets module name as a string and the source"""
+        self.module_name = module_name
+        self._source = source
+        self._syntax = _STR_SYNTAX if isinstance(source, str) else _BYTES_SYNTAX
+        self._lines = None
+        self._module_info = None
+        self._symbol_index = None
+        try:
+            self._set_module_info()
+        finally:
+            # The source may be a memory map closed after scanning
+            self._source = self._lines = None
+
+    @property
+    def module_info(self):
+        """Return ModuleInfo instance"""
+        return self._module_info
+
+    @property
+    def symbol_index(self):
+        """Return SymbolIndex of the module_info"""
+        return self._symbol_index
+
+    def _set_module_info(self):
+        source = self._source
+        syntax = self._syntax
+        if syntax.lone_cr.search(source):
+            raise ScanError('Lone carriage returns')
+        self._lines = lines = self._logical_lines()
+
+        docstrings = None
+        if lines and syntax.string_start.match(source, lines[0][1]):
+            docstrings = ast.get_docstring(self._parse(lines[0][1], lines[0][2]))
+
+        classes = []
+        functions = []
+        index = 0
+        while index < len(lines):
+            indent, start, end = lines[index]
+            index += 1
+            if indent:
+                # Statements of a top-level block
+                continue
+            match = syntax.header.match(source, start)
+            if match is None:
+                namedtuple_info = self._namedtuple_info(start, end)
+                if namedtuple_info is not None:
+                    classes.append(namedtuple_info)
+            elif match.group(2) == syntax.def_word:
+                functions.append(astlister._func_info(self._definition(index - 1)))
+            else:
+                class_info, index = self._class_info(index - 1)
+                classes.append(class_info)
+
+        info = astlister.ModuleInfo(self.module_name, docstrings, classes, functions)
+        self._module_info = info
+        self._symbol_index = astlister.SymbolIndex(info)
+
+    def _logical_lines(self):
+        """List of (indent, start, end) of every logical line"""
+        source = self._source
+        syntax = self._syntax
+        tabs = syntax.tabs
+        no_statement = syntax.no_statement
+        lines = []
+        depth = 0
+        begin = 3 if source[:3] == b'\xef\xbb\xbf' else 0
+        start = self._line_start(begin)
+        indent = start - begin if start is not None else 0
+        for match in syntax.tokens.finditer(source, begin):
+            kind = match.lastgroup
+            if kind == 'newline':
+                if depth:
+                    continue
+                if start is not None:
+                    lines.append((indent, start, match.start(kind)))
+                line_start = match.start('indent')
+                start = match.end()
+                char = source[start:start + 1]
+                if char in no_statement:
+                    start = None
+                elif char in tabs:
+                    start = self._line_start(line_start)
+                if start is not None:
+                    indent = start - line_start
+            elif kind == 'open':
+                depth += 1
+            elif kind == 'close':
+                depth -= 1
+                if depth < 0:
+                    raise ScanError('Unbalanced bracket at {}'.format(match.start(kind)))
+            elif kind == 'quote':
+                raise ScanError('Unterminated string at {}'.format(match.start(kind)))
+            elif kind == 'end':
+                break
+        if depth:
+            raise ScanError('Unclosed bracket')
+        if start is not None:
+            lines.append((indent, start, len(source)))
+        return lines
+
+    def _line_start(self, line_start):
+        """
+        Start of the statement of the line, None for empty lines and comments.
+        Indentation with tabs and form feeds is left to the AST-lister.
+        """
+        if self._syntax.blank_line.match(self._source, line_start):
+            return None
+        start = self._syntax.indent.match(self._source, line_start).end()
+        if any(char in self._source[line_start:start] for char in self._syntax.tabs):
+            raise ScanError('Indentation with tabs at {}'.format(line_start))
+        return start
+
+    def _text(self, start, end):
+        text = self._source[start:end]
+        if isinstance(text, str):
+            return text
+        try:
+            return text.decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise ScanError(str(e))
+
+    def _parse(self, start, end, body=None):
+        """Module node of the text, the text is followed by the body text if it's given"""
+        text = self._text(start, end)
+        if body is not None:
+            text += body
+        try:
+            return ast.parse(text)
+        except (SyntaxError, ValueError) as e:
+            raise ScanError('Unparsable statement at {}: {}'.format(start, e))
+
+    def _header_end(self, start, end):
+        """Position of the colon ending the header between start and end"""
+        depth = 0
+        for match in self._syntax.header_tokens.finditer(self._source, start, end):
+            kind = match.lastgroup
+            if kind == 'open':
+                depth += 1
+            elif kind == 'close':
+                depth -= 1
+            elif kind == 'colon' and not depth:
+                return match.start(kind)
+        raise ScanError('No colon in the header at {}'.format(start))
+
+    def _definition(self, index):
+        """
+        Node of the function or class of the logical line with the index,
+        with only the first statement of its body
+        """
+        lines = self._lines
+        indent, start, end = lines[index]
+        if index + 1 < len(lines) and lines[index + 1][0] > indent:
+            _, body_start, body_end = lines[index + 1]
+            if self._syntax.string_start.match(self._source, body_start):
+                body = '\n ' + self._text(body_start, body_end)
+            else:
+                body = ' pass'
+            node = self._parse(start, self._header_end(start, end) + 1, body).body[0]
+        else:
+            # The body is on the same line
+            node = self._parse(start, end).body[0]
+        if type(node) not in (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef):
+            raise ScanError('Unexpected {} at {}'.format(type(node).__name__, start))
+        return node
+
+    def _class_info(self, index):
+        """
+        ClassInfo of the class of the logical line with the index and the index
+        of the line after the class. Members are found like astlister._class_info
+        finds them: functions and nested classes in nested blocks, but not in functions,
+        namedtuples in the body only.
+        """
+        lines = self._lines
+        syntax = self._syntax
+        node = self._definition(index)
+        indent = lines[index][0]
+        index += 1
+        if index == len(lines) or lines[index][0] <= indent:
+            # The body is on the same line and the node is whole
+            return astlister._class_info(node), index
+        # Frames of the classes being listed: node, indent, indent of the body, functions, classes
+        frames = [(node, indent, lines[index][0], [], [])]
+        skipped = None
+        while True:
+            node, indent, body_indent, functions, classes = frames[-1]
+            if index == len(lines) or lines[index][0] <= indent:
+                frames.pop()
+                info = astlister.ClassInfo(node.name, ast.get_docstring(node), functions, classes)
+                if not frames:
+                    return info, index
+                frames[-1][4].append(info)
+                continue
+            line_indent, start, end = lines[index]
+            index += 1
+            if skipped is not None:
+                if line_indent > skipped:
+                    continue
+                skipped = None
+            match = syntax.header.match(self._source, start)
+            if match is None:
+                if line_indent == body_indent:
+                    namedtuple_info = self._namedtuple_info(start, end)
+                    if namedtuple_info is not None:
+                        classes.append(namedtuple_info)
+            elif match.group(2) == syntax.def_word:
+                functions.append(astlister._func_info(self._definition(index - 1)))
+                skipped = line_indent
+            elif index < len(lines) and lines[index][0] > line_indent:
+                frames.append((self._definition(index - 1), line_indent, lines[index][0], [], []))
+            else:
+                classes.append(astlister._class_info(self._definition(index - 1)))
+
+    def _namedtuple_info(self, start, end):
+        if self._syntax.namedtuple_word not in self._source[start:end]:
+            return None
+        try:
+            node = self._parse(start, end).body[0]
+        except ScanError:
+            # Headers of compound statements aren't parsable alone
+            return None
+        if type(node) != ast.Assign:
+            return None
+        return astlister._namedtuple_info(node)
+
+
+def list_module(module_name, source):
+    """
+    ModuleScanner of the source, or astlister.ModuleLister
+    of the parsed source if the scanner can't handle it
+    """
+    try:
+        return ModuleScanner(module_name, source)
+    except ScanError:
+        if not isinstance(source, str):
+            source = bytes(source).decode('utf-8')
+        return astlister.ModuleLister(module_name, ast.parse(source))
+
+
+def read_module(module_name, file_path):
+    """list_module of the file's source read through a memory map"""
+    with open(file_path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return list_module(module_name, b'')
+    with buffer:
+        return list_module(module_name, buffer)
@@ -0,0 +1,245 @@
+"""
+Module reads TrueType fonts to embed them into pdf:
+glyphs and widths of the characters, metrics of the font
+and font files with the outlines of the used glyphs only
+"""
+
+import struct
+
+# Tables a pdf viewer needs from an embedded TrueType font
+SUBSET_TABLES = ('cvt ', 'fpgm', 'glyf', 'head', 'hhea', 'hmtx', 'loca', 'maxp', 'prep')
+# fsType bit of the fonts whose license doesn't allow embedding
+_RESTRICTED_LICENSE = 0x0002
+# Flags of the components of composite glyphs
+_ARG_1_AND_2_ARE_WORDS = 0x0001
+_WE_HAVE_A_SCALE = 0x0008
+_MORE_COMPONENTS = 0x0020
+_WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+_WE_HAVE_A_TWO_BY_TWO = 0x0080
+_CHECKSUM_MAGIC = 0xB1B0AFBA
+
+
+class TrueTypeError(ValueError):
+    """File isn't a TrueType font that can be embedded"""
+
+
+class TrueTypeFont:
+    """
+    TrueType font: PostScript name, glyph ids of the characters,
+    widths of the glyphs and metrics in 1/1000 of the font size
+    """
+
+    def __init__(self, data):
+        """Constructor gets the font file as bytes, TrueTypeError is raised for other files"""
+        self.data = data
+        try:
+            self._read(data)
+        except (struct.error, KeyError, IndexError, ZeroDivisionError) as e:
+            raise TrueTypeError('Broken TrueType font: {}'.format(e)) from None
+
+    def _read(self, data):
+        version, = struct.unpack_from('>I', data)
+        if version not in (0x00010000, 0x74727565):
+            raise TrueTypeError('Not a TrueType font with glyph outlines')
+        count, = struct.unpack_from('>H', data, 4)
+        self._tables = {}
+        for index in range(count):
+            tag, _, offset, length = struct.unpack_from('>4sIII', data, 12 + 16 * index)
+            self._tables[tag.decode('latin-1')] = (offset, length)
+        for name in ('cmap', 'glyf', 'head', 'hhea', 'hmtx', 'loca', 'maxp'):
+            if name not in self._tables:
+                raise TrueTypeError('No {!r} table in the font'.format(name))
+
+        os2 = self._table('OS/2') if 'OS/2' in self._tables else None
+        if os2 is not None and struct.unpack_from('>H', os2, 8)[0] & _RESTRICTED_LICENSE == _RESTRICTED_LICENSE:
+            raise TrueTypeError('Font license restricts embedding')
+
+        head = self._table('head')
+        units_per_em, = struct.unpack_from('>H', head, 18)
+        scale = 1000 / units_per_em
+        self.bbox = [round(value * scale) for value in struct.unpack_from('>4h', head, 36)]
+        self._long_loca = struct.unpack_from('>h', head, 50)[0] == 1
+        self.num_glyphs, = struct.unpack_from('>H', self._table('maxp'), 4)
+
+        hhea = self._table('hhea')
+        ascent, descent = struct.unpack_from('>hh', hhea, 4)
+        self.ascent = round(ascent * scale)
+        self.descent = round(descent * scale)
+        metrics_count, = struct.unpack_from('>H', hhea, 34)
+        advances = struct.unpack_from('>' + 'Hxx' * metrics_count, self._table('hmtx'))
+        self.widths = [round(advance * scale) for advance in advances]
+        self.widths.extend([self.widths[-1]] * (self.num_glyphs - metrics_count))
+
+        self.cap_height = self.ascent
+        if os2 is not None and struct.unpack_from('>H', os2)[0] >= 2:
+            self.cap_height = round(struct.unpack_from('>h', os2, 88)[0] * scale)
+        self.italic_angle = 0
+        if 'post' in self._tables:
+            self.italic_angle = struct.unpack_from('>i', self._table('post'), 4)[0] / 65536
+        self.name = self._postscript_name() or 'Unicode'
+        self.glyph_ids = self._read_cmap()
+
+    def _table(self, name):
+        offset, length = self._tables[name]
+        return self.data[offset:offset + length]
+
+    def _postscript_name(self):
+        if 'name' not in self._tables:
+            return None
+        table = self._table('name')
+        count, strings = struct.unpack_from('>HH', table, 2)
+        for index in range(count):
+            platform, _, _, name_id, length, offset = struct.unpack_from('>6H', table, 6 + 12 * index)
+            if name_id != 6:
+                continue
+            raw = table[strings + offset:strings + offset + length]
+            name = raw.decode('utf-16-be' if platform in (0, 3) else 'latin-1', 'replace')
+            # PostScript names are printable ASCII without delimiters
+            name = ''.join(char for char in name if '!' <= char <= '~' and char not in '()<>[]{}/%#')
+            if name:
+                return name
+        return None
+
+    def _read_cmap(self):
+        """Glyph ids by character from the Unicode subtable of the cmap"""
+        table = self._table('cmap')
+        count, = struct.unpack_from('>H', table, 2)
+        subtables = {}
+        for index in range(count):
+            platform, encoding, offset = struct.unpack_from('>HHI', table, 4 + 8 * index)
+            subtables[platform, encoding] = offset
+        for key in ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+            offset = subtables.get(key)
+            if offset is None:
+                continue
+            subtable_format, = struct.unpack_from('>H', table, offset)
+            if subtable_format == 4:
+                return _cmap_format_4(table, offset)
+            if subtable_format == 12:
+                return _cmap_format_12(table, offset)
+        raise TrueTypeError('No Unicode cmap of format 4 or 12 in the font')
+
+    def _glyph(self, gid):
+        offset, _ = self._tables['loca']
+        if self._long_loca:
+            start, end = struct.unpack_from('>II', self.data, offset + 4 * gid)
+        else:
+            start, end = (2 * value for value in struct.unpack_from('>HH', self.data, offset + 2 * gid))
+        glyf_offset, _ = self._tables['glyf']
+        return self.data[glyf_offset + start:glyf_offset + end]
+
+    def _components(self, glyph):
+        """Glyph ids of the components of a composite glyph"""
+        if len(glyph) < 10 or struct.unpack_from('>h', glyph)[0] >= 0:
+            return
+        position = 10
+        flags = _MORE_COMPONENTS
+        while flags & _MORE_COMPONENTS:
+            flags, gid = struct.unpack_from('>HH', glyph, position)
+            yield gid
+            position += 4 + (4 if flags & _ARG_1_AND_2_ARE_WORDS else 2)
+            if flags & _WE_HAVE_A_SCALE:
+                position += 2
+            elif flags & _WE_HAVE_AN_X_AND_Y_SCALE:
+                position += 4
+            elif flags & _WE_HAVE_A_TWO_BY_TWO:
+                position += 8
+
+    def subset(self, glyphs):
+        """
+        Font file with the outlines of the glyphs, their components and .notdef only.
+        Glyph ids are kept, the outlines of other glyphs are empty.
+        """
+        keep = set()
+        stack = [0] + [gid for gid in glyphs if gid < self.num_glyphs]
+        while stack:
+            gid = stack.pop()
+            if gid in keep or gid >= self.num_glyphs:
+                continue
+            keep.add(gid)
+            stack.extend(self._components(self._glyph(gid)))
+
+        glyf = bytearray()
+        loca = []
+        for gid in range(self.num_glyphs):
+            loca.append(len(glyf))
+            if gid in keep:
+                glyf += self._glyph(gid)
+                glyf += bytes(-len(glyf) % 4)
+        loca.append(len(glyf))
+
+        tables = {name: self._table(name) for name in SUBSET_TABLES if name in self._tables}
+        head = bytearray(tables['head'])
+        head[8:12] = bytes(4)
+        struct.pack_into('>h', head, 50, 1)
+        tables['head'] = head
+        tables['glyf'] = glyf
+        tables['loca'] = struct.pack('>{}I'.format(len(loca)), *loca)
+        return _font_file(tables)
+
+
+def _cmap_format_4(table, offset):
+    segments = struct.unpack_from('>H', table, offset + 6)[0] // 2
+    ends = struct.unpack_from('>{}H'.format(segments), table, offset + 14)
+    starts = struct.unpack_from('>{}H'.format(segments), table, offset + 16 + 2 * segments)
+    deltas = struct.unpack_from('>{}h'.format(segments), table, offset + 16 + 4 * segments)
+    range_offsets_position = offset + 16 + 6 * segments
+    range_offsets = struct.unpack_from('>{}H'.format(segments), table, range_offsets_position)
+    glyph_ids = {}
+    for index, (start, end, delta, range_offset) in enumerate(zip(starts, ends, deltas, range_offsets)):
+        for code in range(start, min(end, 0xfffe) + 1):
+            if range_offset:
+                position = range_offsets_position + 2 * index + range_offset + 2 * (code - start)
+                gid, = struct.unpack_from('>H', table, position)
+                gid = (gid + delta) & 0xffff if gid else 0
+            else:
+                gid = (code + delta) & 0xffff
+            if gid:
+                glyph_ids[chr(code)] = gid
+    return glyph_ids
+
+
+def _cmap_format_12(table, offset):
+    groups, = struct.unpack_from('>I', table, offset + 12)
+    glyph_ids = {}
+    for index in range(groups):
+        start, end, gid = struct.unpack_from('>III', table, offset + 16 + 12 * index)
+        for code in range(start, min(end, 0x10ffff) + 1):
+            if not 0xd800 <= code <= 0xdfff:
+                glyph_ids[chr(code)] = gid + code - start
+    return glyph_ids
+
+
+def _checksum(data):
+    data = bytes(data) + bytes(-len(data) % 4)
+    return sum(struct.unpack('>{}I'.format(len(data) // 4), data)) & 0xffffffff
+
+
+def _font_file(tables):
+    """Font file of the tables by tag, with the checksums and the directory"""
+    names = sorted(tables)
+    count = len(names)
+    selector = count.bit_length() - 1
+    search_range = 16 << selector
+    header = struct.pack('>IHHHH', 0x00010000, count, search_range, selector, 16 * count - search_range)
+    offset = len(header) + 16 * count
+    directory = []
+    bodies = []
+    head_offset = None
+    for name in names:
+        data = bytes(tables[name])
+        if name == 'head':
+            head_offset = offset
+        directory.append(struct.pack('>4sIII', name.encode('latin-1'), _checksum(data), offset, len(data)))
+        data += bytes(-len(data) % 4)
+        bodies.append(data)
+        offset += len(data)
+    font = bytearray(header + b''.join(directory) + b''.join(bodies))
+    struct.pack_into('>I', font, head_offset + 8, (_CHECKSUM_MAGIC - _checksum(font)) & 0xffffffff)
+    return bytes(font)
+
+
+def read_font(path):
+    """TrueTypeFont of the file, OSError or TrueTypeError is raised if it can't be read"""
+    with open(path, 'rb') as f:
+        return TrueTypeFont(f.read())
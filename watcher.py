@@ -0,0 +1,243 @@
+"""
+Module waits for changes of python sources
+in directories and files
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_INTERVAL = 1.0
+
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_Q_OVERFLOW = 0x4000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+_EVENT = struct.Struct('iIII')
+
+
+def _is_skipped(name):
+    return name.startswith('.') or name == '__pycache__'
+
+
+class _Watcher:
+    """
+    Watcher of .py files in the directories, with their subdirectories,
+    and of the single files. Subclasses implement _poll(timeout)
+    returning the paths changed within the timeout.
+    """
+
+    def __init__(self, directories, files, debounce=DEFAULT_DEBOUNCE):
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.files = {os.path.abspath(file_path) for file_path in files}
+        self.debounce = debounce
+
+    def wait(self):
+        """
+        Block until sources change and return the set of their paths,
+        a burst of changes is returned at once when no more changes
+        come for debounce seconds
+        """
+        changed = set()
+        while not changed:
+            changed = self._poll(None)
+        while True:
+            more = self._poll(self.debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        """Stop watching"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _poll(self, timeout):
+        raise NotImplementedError
+
+    def _scan(self):
+        """Return mtime and size of every watched file by path"""
+        found = {}
+        stack = list(self.directories)
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if _is_skipped(entry.name):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith('.py'):
+                            found[entry.path] = self._version(entry)
+            except OSError:
+                continue
+        for file_path in self.files:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            found[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    @staticmethod
+    def _version(entry):
+        try:
+            stat = entry.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+class PollingWatcher(_Watcher):
+    """Watcher comparing mtime and size of the files every interval seconds"""
+
+    def __init__(self, directories, files, debounce=DEFAULT_DEBOUNCE, interval=DEFAULT_INTERVAL):
+        super().__init__(directories, files, debounce)
+        self.interval = interval
+        self._versions = self._scan()
+
+    def _poll(self, timeout):
+        while True:
+            time.sleep(self.interval if timeout is None else timeout)
+            versions = self._scan()
+            changed = {path for path in versions.keys() | self._versions.keys()
+                       if versions.get(path) != self._versions.get(path)}
+            self._versions = versions
+            if changed or timeout is not None:
+                return changed
+
+
+class InotifyWatcher(_Watcher):
+    """Watcher of inotify events of the directories, Linux only"""
+
+    def __init__(self, directories, files, debounce=DEFAULT_DEBOUNCE):
+        super().__init__(directories, files, debounce)
+        self._libc = _inotify_libc()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        # Watched directory by watch descriptor, with a flag of watching its subdirectories
+        self._watches = {}
+        try:
+            for directory in self.directories:
+                self._add_tree(directory)
+            for file_path in self.files:
+                self._add_watch(os.path.dirname(file_path), False)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add_watch(self, directory, recursive):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            return False
+        known = self._watches.get(wd)
+        self._watches[wd] = (directory, recursive or (known is not None and known[1]))
+        return True
+
+    def _add_tree(self, directory):
+        """Watch the directory and its subdirectories, return the .py files found in them"""
+        found = set()
+        stack = [directory]
+        while stack:
+            path = stack.pop()
+            if not self._add_watch(path, True):
+                continue
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if _is_skipped(entry.name):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith('.py'):
+                            found.add(entry.path)
+            except OSError:
+                continue
+        return found
+
+    def _poll(self, timeout):
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            changed |= self._parse_events(data)
+
+    def _parse_events(self, data):
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost, every file may have changed
+                changed |= set(self._scan())
+                continue
+            if wd not in self._watches:
+                continue
+            directory, recursive = self._watches[wd]
+            if mask & _IN_DELETE_SELF:
+                del self._watches[wd]
+                continue
+            path = os.path.join(directory, name)
+            if mask & _IN_ISDIR:
+                if not recursive or _is_skipped(name):
+                    continue
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    changed |= self._add_tree(path)
+                else:
+                    # Files of a moved away directory are gone without events
+                    changed.add(path)
+                continue
+            if name.endswith('.py') and (recursive or path in self.files):
+                changed.add(path)
+        return changed
+
+
+def _inotify_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def make_watcher(directories, files, debounce=DEFAULT_DEBOUNCE, interval=DEFAULT_INTERVAL):
+    """Watcher of the directories and files, on inotify where it's available, otherwise polling"""
+    try:
+        return InotifyWatcher(directories, files, debounce)
+    except OSError:
+        return PollingWatcher(directories, files, debounce, interval)